@@ -0,0 +1,23 @@
+from __future__ import annotations
+
+import sys
+from multiprocessing.shared_memory import SharedMemory
+
+
+def attach(name: str) -> SharedMemory:
+    """Attach to a segment owned by the parent process.
+
+    Before Python 3.13 attaching always registers the segment with the resource tracker. Workers share the tracker of
+    the parent, where registration is idempotent, so the segment is still unlinked exactly once by the parent.
+    """
+    if sys.version_info >= (3, 13):
+        return SharedMemory(name=name, track=False)
+    return SharedMemory(name=name)
+
+
+def buffer(shm: SharedMemory) -> memoryview:
+    """The buffer of a segment, which must not be closed."""
+    buf = shm.buf
+    if buf is None:
+        raise RuntimeError(f"Shared memory segment {shm.name} is closed.")
+    return buf
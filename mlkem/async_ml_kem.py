@@ -0,0 +1,207 @@
+from __future__ import annotations
+
+import asyncio
+from concurrent.futures import Executor
+from secrets import token_bytes
+from typing import Any, Callable, Generic, TypeVar
+
+from mlkem.ml_kem import ML_KEM, default_executor
+from mlkem.parameter_set import ML_KEM_768, ParameterSet
+
+A = TypeVar("A")
+R = TypeVar("R")
+
+
+class _Batcher(Generic[A, R]):
+    """Collects queued requests into batches and runs each batch on an executor."""
+
+    def __init__(
+        self,
+        run_batch: Callable[[list[A]], list[R]],
+        executor: Executor,
+        max_batch_size: int,
+        max_wait: float,
+        max_pending: int,
+    ) -> None:
+        self.run_batch = run_batch
+        self.executor = executor
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.queue: asyncio.Queue[tuple[A, asyncio.Future[R]]] = asyncio.Queue(
+            maxsize=max_pending
+        )
+        # set whenever a request is queued, so that _run can wait for one with a timeout without taking it
+        self.ready = asyncio.Event()
+        self.task: asyncio.Task[None] | None = None
+        self.closed = False
+
+    async def submit(self, arg: A) -> R:
+        if self.closed:
+            raise RuntimeError("Cannot submit a request after aclose().")
+        if self.task is None:
+            self.task = asyncio.get_running_loop().create_task(self._run())
+
+        future: asyncio.Future[R] = asyncio.get_running_loop().create_future()
+        # blocks once max_pending requests are queued, which pushes back on the callers
+        await self.queue.put((arg, future))
+        if self.closed:
+            # room in the queue was made by close(), nothing will run the request
+            future.cancel()
+        self.ready.set()
+        return await future
+
+    async def close(self) -> None:
+        self.closed = True
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+            self.task = None
+
+        while not self.queue.empty():
+            _, future = self.queue.get_nowait()
+            future.cancel()
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            batch = [await self.queue.get()]
+            deadline = loop.time() + self.max_wait
+
+            while len(batch) < self.max_batch_size:
+                if not self.queue.empty():
+                    batch.append(self.queue.get_nowait())
+                    continue
+
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                # a timeout of wait_for(queue.get()) can drop an item that was just taken on Python 3.11, while
+                # a timed out wait for the event leaves any request in the queue
+                self.ready.clear()
+                try:
+                    await asyncio.wait_for(self.ready.wait(), timeout)
+                except TimeoutError:
+                    break
+
+            try:
+                results = await loop.run_in_executor(
+                    self.executor, self.run_batch, [arg for arg, _ in batch]
+                )
+            except asyncio.CancelledError:
+                for _, future in batch:
+                    future.cancel()
+                raise
+            except Exception as e:
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            else:
+                for (_, future), result in zip(batch, results):
+                    if not future.done():
+                        future.set_result(result)
+
+
+class AsyncML_KEM:
+    """An asyncio front end for :class:`mlkem.ml_kem.ML_KEM` that batches concurrent requests.
+
+    Calls to :func:`encaps` and :func:`decaps` are queued rather than run on the event loop. Requests that arrive
+    within :code:`max_wait_us` microseconds of each other (up to :code:`max_batch_size` of them) are run as one batch on
+    an executor, and each caller is resumed with its own result once the batch finishes. At most :code:`max_pending`
+    requests are queued per operation; further callers wait until there is room in the queue.
+    """
+
+    ml_kem: ML_KEM
+
+    def __init__(
+        self,
+        parameters: ParameterSet = ML_KEM_768,
+        randomness: Callable[[int], bytes] = token_bytes,
+        fast: bool = True,
+        max_batch_size: int = 64,
+        max_wait_us: int = 500,
+        max_pending: int = 4096,
+        executor: Executor | None = None,
+    ):
+        r"""Initialize the front end.
+
+        Args:
+            | parameters (:class:`mlkem.parameter_set.ParameterSet`): The ML-KEM parameter set.
+            | randomness (:type:`Callable[[int], bytes]`): The source of randomness, see :class:`mlkem.ml_kem.ML_KEM`.
+            | fast (:type:`bool`): Whether to use the C extensions, see :class:`mlkem.ml_kem.ML_KEM`.
+            | max_batch_size (:type:`int`): The largest number of requests run as one batch.
+            | max_wait_us (:type:`int`): How long to wait for more requests after the first one of a batch, in microseconds.
+            | max_pending (:type:`int`): The largest number of queued requests per operation.
+            | executor (:type:`concurrent.futures.Executor | None`): Where batches are run, :func:`mlkem.ml_kem.default_executor` if not given.
+        """
+        if max_batch_size < 1:
+            raise ValueError(f"max_batch_size must be positive (got {max_batch_size}).")
+        if max_wait_us < 0:
+            raise ValueError(f"max_wait_us must be non-negative (got {max_wait_us}).")
+        if max_pending < 1:
+            raise ValueError(f"max_pending must be positive (got {max_pending}).")
+
+        self.ml_kem = ML_KEM(parameters, randomness, fast)
+        executor = executor or default_executor()
+        max_wait = max_wait_us / 1_000_000
+
+        self._encaps: _Batcher[bytes, tuple[bytes, bytes]] = _Batcher(
+            self._encaps_batch, executor, max_batch_size, max_wait, max_pending
+        )
+        self._decaps: _Batcher[tuple[bytes, bytes], bytes] = _Batcher(
+            self._decaps_batch, executor, max_batch_size, max_wait, max_pending
+        )
+
+    async def __aenter__(self) -> AsyncML_KEM:
+        return self
+
+    async def __aexit__(self, *_: Any) -> None:
+        await self.aclose()
+
+    async def encaps(self, ek: bytes) -> tuple[bytes, bytes]:
+        r"""Take an encapsulation key and produce a shared key and ciphertext.
+
+        See :func:`mlkem.ml_kem.ML_KEM.encaps`. The key is validated before it is queued, so invalid keys raise
+        :type:`ValueError` without affecting other requests in the same batch.
+
+        Args:
+            | ek (:type:`bytes`): The encapsulation key.
+
+        Returns:
+            :type:`tuple[bytes, bytes]`: The (shared key, ciphertext) pair.
+        """
+        self.ml_kem._check_encaps_input(ek)
+        return await self._encaps.submit(ek)
+
+    async def decaps(self, dk: bytes, c: bytes) -> bytes:
+        r"""Take a decapsulation key and ciphertext and produce the shared key.
+
+        See :func:`mlkem.ml_kem.ML_KEM.decaps`. The inputs are validated before they are queued, so invalid inputs
+        raise :type:`ValueError` without affecting other requests in the same batch.
+
+        Args:
+            | dk (:type:`bytes`): The decapsulation key.
+            | c (:type:`bytes`): The ciphertext.
+
+        Returns:
+            :type:`bytes`: The shared key.
+        """
+        self.ml_kem._check_decaps_input(dk, c)
+        return await self._decaps.submit((dk, c))
+
+    async def aclose(self) -> None:
+        r"""Stop batching. Requests that are still queued are cancelled, and later requests raise :type:`RuntimeError`."""
+        await self._encaps.close()
+        await self._decaps.close()
+
+    def _encaps_batch(self, eks: list[bytes]) -> list[tuple[bytes, bytes]]:
+        # the inputs were validated when they were queued
+        return self.ml_kem.encaps_batch(eks, validate=False)
+
+    def _decaps_batch(self, requests: list[tuple[bytes, bytes]]) -> list[bytes]:
+        return self.ml_kem.decaps_batch(
+            [dk for dk, _ in requests], [c for _, c in requests], validate=False
+        )
@@ -1,4 +1,10 @@
+from __future__ import annotations
+
 from hashlib import sha3_256, sha3_512, shake_128, shake_256
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from _hashlib import HASHXOF
 
 
 def prf(eta: int, s: bytes, b: bytes) -> bytes:
@@ -24,6 +30,45 @@ def prf(eta: int, s: bytes, b: bytes) -> bytes:
     return shake_256(s + b).digest(64 * eta)
 
 
+def prf_state(s: bytes) -> HASHXOF:
+    r"""Absorb the seed of :func:`prf` once, for use with :func:`prf_from`.
+
+    Calls to :func:`prf` with the same seed and different counters then copy the absorbed state rather than
+    concatenating and absorbing the seed each time.
+
+    Args:
+        | s (:type:`bytes`): A seed of 32 bytes.
+
+    Returns:
+        :type:`HASHXOF`: The SHAKE-256 state after absorbing the seed.
+    """
+    if len(s) != 32:
+        raise ValueError(f"len(s) must be 32 (got {len(s)})")
+
+    return shake_256(s)
+
+
+def prf_from(state: HASHXOF, eta: int, b: bytes) -> bytes:
+    r"""Same as :code:`prf(eta, s, b)`, with the seed absorbed by :func:`prf_state`.
+
+    Args:
+        | state (:type:`HASHXOF`): The state returned by :func:`prf_state`. It is not modified.
+        | eta (:type:`int`): A parameter of the ML-KEM instance.
+        | b (:type:`bytes`): The byte encoding of a counter.
+
+    Returns:
+        :type:`bytes`: :code:`64 * eta` pseudorandom bytes.
+    """
+    if eta not in {2, 3}:
+        raise ValueError(f"eta must be 2 or 3 (got {eta})")
+    if len(b) != 1:
+        raise ValueError(f"len(b) must be 1 (got {len(b)})")
+
+    xof = state.copy()
+    xof.update(b)
+    return xof.digest(64 * eta)
+
+
 def h(s: bytes) -> bytes:
     r"""An alias for the SHA3-256 hash function.
 
@@ -49,6 +94,33 @@ def j(s: bytes) -> bytes:
     return shake_256(s).digest(32)
 
 
+def j_state(prefix: bytes) -> HASHXOF:
+    r"""Absorb a fixed prefix of the input to :func:`j` once, for use with :func:`j_from`.
+
+    Args:
+        | prefix (:type:`bytes`): The prefix, e.g. the implicit rejection value z of a decapsulation key.
+
+    Returns:
+        :type:`HASHXOF`: The SHAKE-256 state after absorbing the prefix.
+    """
+    return shake_256(prefix)
+
+
+def j_from(state: HASHXOF, suffix: bytes) -> bytes:
+    r"""Same as :code:`j(prefix + suffix)`, with the prefix absorbed by :func:`j_state`.
+
+    Args:
+        | state (:type:`HASHXOF`): The state returned by :func:`j_state`. It is not modified.
+        | suffix (:type:`bytes`): The rest of the input to be hashed.
+
+    Returns:
+        :type:`bytes`: A 32 byte digest of the input.
+    """
+    xof = state.copy()
+    xof.update(suffix)
+    return xof.digest(32)
+
+
 def g(c: bytes) -> tuple[bytes, bytes]:
     r"""An alias for the SHA3-512 hash function.
 
@@ -65,20 +137,27 @@ def g(c: bytes) -> tuple[bytes, bytes]:
 
 
 class XOF:
-    r"""An eXtendable-Output Function that provides an incremental API for SHAKE-128."""
+    r"""An eXtendable-Output Function that provides an incremental API for SHAKE-128.
+
+    Python's SHAKE-128 can only return a prefix of the output, :code:`digest(length)`, so the output is computed ahead
+    of time and read from an offset. When more is needed the prefix is computed again at twice the length (the first
+    :code:`length` bytes are the same), so reading :math:`N` bytes in total costs :math:`O(N)`.
+
+    Data can be absorbed until the first call to :func:`squeeze`. Absorbing after that raises a :type:`ValueError`.
+    """
 
     def __init__(self) -> None:
         r"""Initialize an instance of the function.
 
-        We use a chunk size of 840 as python's implementation of SHAKE-128 does not allow
-        convenient reading of the output of SHAKE-128.
+        The first :code:`chunk_size` = 840 bytes of output are computed on the first squeeze. This is enough to sample a
+        polynomial with :func:`mlkem.auxiliary.sampling.sample_ntt` in almost all cases.
         See https://cryptojedi.org/papers/terminate-20230516.pdf for why this size was chosen.
         """
-        #
         self.chunk_size = 840
         self.shake = shake_128()
         self.data = b""
         self.idx = 0
+        self.squeezing = False
 
     def absorb(self, string: bytes) -> None:
         r"""Inject data into SHAKE-128 and update the context.
@@ -86,8 +165,10 @@ class XOF:
         Args:
             | string (:type:`bytes`): The data being injected.
         """
+        if self.squeezing:
+            raise ValueError("Cannot absorb data after output has been squeezed.")
+
         self.shake.update(string)
-        self.data += self.shake.digest(self.chunk_size)
 
     def squeeze(self, length: int) -> bytes:
         r"""Extract output bytes from SHAKE-128 and update the context.
@@ -96,11 +177,14 @@ class XOF:
             | length (:type:`int`): The number of bytes to extract.
 
         returns:
-            :type:`bytes`:n The extracted bytes.
+            :type:`bytes`: The extracted bytes, which follow those of the previous call.
         """
-        while self.idx + length > len(self.data):
-            self.data += self.shake.digest(self.chunk_size)
+        self.squeezing = True
+
+        end = self.idx + length
+        if end > len(self.data):
+            self.data = self.shake.digest(max(self.chunk_size, 2 * len(self.data), end))
 
-        result = self.data[self.idx : self.idx + length]
-        self.idx += length
+        result = self.data[self.idx : end]
+        self.idx = end
         return result
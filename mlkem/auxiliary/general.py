@@ -1,9 +1,16 @@
+from collections.abc import Sequence
+
 from mlkem.math.constants import n, q
 from mlkem.math.field import Zm
+from mlkem.math.polynomial_ring import PolynomialRing, RingRepresentation
 
 BITS_IN_BYTE = 8
 MAX_D = q.bit_length()
 
+# compress and decompress results for every input, built on first use of each d
+_COMPRESS_TABLES: dict[int, list[Zm]] = {}
+_DECOMPRESS_TABLES: dict[int, list[int]] = {}
+
 
 def bits_to_bytes(bits: list[int]) -> list[int]:
     """Converts a bit array (of a length that is a multiple of 8) into an array of bytes.
@@ -57,6 +64,24 @@ def _round_fraction(x: int, y: int) -> int:
     return (2 * x + y) // (2 * y)
 
 
+def _compress_table(d: int) -> list[Zm]:
+    table = _COMPRESS_TABLES.get(d)
+    if table is None:
+        m = 1 << d
+        table = [Zm(_round_fraction(m * x, q) % m, m) for x in range(q)]
+        _COMPRESS_TABLES[d] = table
+    return table
+
+
+def _decompress_table(d: int) -> list[int]:
+    table = _DECOMPRESS_TABLES.get(d)
+    if table is None:
+        m = 1 << d
+        table = [_round_fraction(q * y, m) for y in range(m)]
+        _DECOMPRESS_TABLES[d] = table
+    return table
+
+
 def compress(d: int, x: Zm) -> Zm:
     r"""Map an element from :math:`\mathbb{Z}_q` to :math:`\mathbb{Z}_{2^d}`.
 
@@ -75,9 +100,7 @@ def compress(d: int, x: Zm) -> Zm:
     if x.m != q:
         raise ValueError(f"Element being compressed must be in Z_q (got Z_{x.m}).")
 
-    m = 1 << d
-    val = _round_fraction(m * x.val, q) % m
-    return Zm(val, m)
+    return _compress_table(d)[x.val]
 
 
 def decompress(d: int, y: Zm) -> Zm:
@@ -93,19 +116,63 @@ def decompress(d: int, y: Zm) -> Zm:
     if not d < MAX_D:
         raise ValueError(f"d must be less than {MAX_D} (got {d}).")
 
-    m = 1 << d
-    val = _round_fraction(q * y.val, m)
-    return Zm(val, q)
+    table = _decompress_table(d)
+    if y.val < len(table):
+        return Zm(table[y.val], q)
+
+    # y is not an element of Z_{2^d}, which is accepted but not tabulated
+    return Zm(_round_fraction(q * y.val, 1 << d), q)
 
 
-def byte_encode(d: int, f: list[Zm]) -> bytes:
+def compress_poly(d: int, f: PolynomialRing) -> list[Zm]:
+    r"""Apply :func:`compress` to every coefficient of a polynomial.
+
+    Args:
+        | d (:type:`int`): The number of bits (0 < d < 12) to compress the coefficients to.
+        | f (:class:`mlkem.math.polynomial_ring.PolynomialRing`): The polynomial.
+
+    Returns:
+        :type:`list[mlkem.math.field.Zm]`: The compressed coefficients, elements of :math:`\mathbb{Z}_{2^d}`.
+    """
+    if not 0 < d < MAX_D:
+        raise ValueError(f"d must be greater than 0 and less than {MAX_D} (got {d}).")
+
+    table = _compress_table(d)
+    return [table[x] for x in f.values]
+
+
+def decompress_poly(d: int, y: list[Zm]) -> PolynomialRing:
+    r"""Apply :func:`decompress` to a list of :math:`n` elements of :math:`\mathbb{Z}_{2^d}`.
+
+    Args:
+        | d (:type:`int`): The number of bits (0 < d < 12) to decompress the elements from.
+        | y (:type:`list[mlkem.math.field.Zm]`): The elements of :math:`\mathbb{Z}_{2^d}`.
+
+    Returns:
+        :class:`mlkem.math.polynomial_ring.PolynomialRing`: The polynomial in standard representation with the
+        decompressed elements as coefficients.
+    """
+    if not 0 < d < MAX_D:
+        raise ValueError(f"d must be greater than 0 and less than {MAX_D} (got {d}).")
+    if any(x.m != 1 << d for x in y):
+        raise ValueError(f"Elements being decompressed must be in Z_{1 << d}.")
+
+    table = _decompress_table(d)
+    return PolynomialRing.from_values(
+        [table[x.val] for x in y], RingRepresentation.STANDARD
+    )
+
+
+def byte_encode(d: int, f: Sequence[Zm]) -> bytes:
     r"""Encode a list of integers into bytes.
 
-    The integers are all interpreted as d-bits in size, with :math:`1 \le d \le 12`.
+    The integers are all interpreted as d-bits in size, with :math:`1 \le d \le 12`. Bits above the lowest d bits of an
+    integer are ignored. The encoding is that of the little-endian integer made of the d-bit integers, the first one in
+    the lowest bits.
 
     Args:
         | d (:type:`int`): The bit size of the integers in the list.
-        | f (:type:`list[mlkem.math.field.Zm]`): The integer list. If d=12 then the field order is :code:`mlkem.math.constants.q`, otherwise it is :code:`2**d`.
+        | f (:type:`Sequence[mlkem.math.field.Zm]`): The integer list. If d=12 then the field order is :code:`mlkem.math.constants.q`, otherwise it is :code:`2**d`.
 
     Returns:
         :type:`bytes`: The byte-encoding of the integer list.
@@ -116,22 +183,18 @@ def byte_encode(d: int, f: list[Zm]) -> bytes:
     if d > MAX_D or d < 1:
         raise ValueError(f"d may not be greater than {MAX_D} or less than 1 (got {d}).")
 
-    b = [0 for _ in range(n * d)]
-    for i in range(n):
-        a = f[i].val
-
-        for j in range(d):
-            x = a & 1
-            b[i * d + j] = x
-            a = (a - x) // 2
+    mask = (1 << d) - 1
+    x = 0
+    for a in reversed(f):
+        x = (x << d) | (a.val & mask)
 
-    return bytes(bits_to_bytes(b))
+    return x.to_bytes(n * d // BITS_IN_BYTE, "little")
 
 
 def byte_decode(d: int, b: bytes) -> list[Zm]:
     r"""Decode bytes into a list of integers.
 
-    Bytes are parsed as d-bit integers, with :math:`1 \le d \le 12`.
+    Bytes are parsed as d-bit integers, with :math:`1 \le d \le 12`. Only the first :code:`32 * d` bytes are read.
 
     Args:
         | d (:type:`int`): The bit size of the integers in the list.
@@ -143,13 +206,17 @@ def byte_decode(d: int, b: bytes) -> list[Zm]:
     if d > MAX_D or d < 1:
         raise ValueError(f"d may not be greater than {MAX_D} or less than 1 (got {d}).")
 
+    length = n * d // BITS_IN_BYTE
+    if len(b) < length:
+        raise ValueError(f"b must have at least {length} bytes (got {len(b)}).")
+
     m = q if d == MAX_D else 1 << d
-    bits = bytes_to_bits([x for x in b])
+    mask = (1 << d) - 1
+    x = int.from_bytes(b[:length], "little")
 
     f = []
-    for i in range(n):
-        fi = sum([bits[i * d + j] * (1 << j) for j in range(d)])
-        fi_m = Zm(fi, m)
-        f.append(fi_m)
+    for _ in range(n):
+        f.append(Zm(x & mask, m))
+        x >>= d
 
     return f
@@ -47,12 +47,19 @@ GAMMA_LOOKUP = [
     ]
 ]  # fmt: skip
 
+# the tables as plain ints, for the int-list engine
+ZETAS = [zeta.val for zeta in ZETA_LOOKUP]
+GAMMAS = [gamma.val for gamma in GAMMA_LOOKUP]
+
+N_INV = 3303  # 3303 = 128^{-1} mod q
+
 
 def ntt(f: PolynomialRing) -> PolynomialRing:
     r"""Computes the NTT representation :math:`\hat{f}` of the given polynomial :math:`f \in R_q`.
 
     Note that :code:`f.representation` must be :code:`RingRepresentation.STANDARD`, otherwise a
-    :type:`ValueError` will be raised.
+    :type:`ValueError` will be raised. :code:`f` is not modified, but remembers the result, see
+    :class:`mlkem.math.polynomial_ring.PolynomialRing`.
 
     Args:
         | f (:type:`mlkem.math.polynomial_ring.PolynomialRing`): The polynomial to perform the transform on.
@@ -65,30 +72,15 @@ def ntt(f: PolynomialRing) -> PolynomialRing:
             "NTT can only be applied to polynomials in standard representation."
         )
 
-    f_ = PolynomialRing(f.coefficients, RingRepresentation.NTT)
-    i = 1
-    length = 128
-
-    while length >= 2:
-        for start in range(0, n, 2 * length):
-            zeta = ZETA_LOOKUP[i]
-            i += 1
-
-            for j in range(start, start + length):
-                t = zeta * f_[j + length]
-                f_[j + length] = f_[j] - t
-                f_[j] += t
-
-        length //= 2
-
-    return f_
+    return f.to_ntt()
 
 
 def ntt_inv(f_: PolynomialRing) -> PolynomialRing:
     r"""Computes the polynomial :math:`f \in R_q` that corresponds to the NTT representation :math:`\hat{f} \in T_q`.
 
     Note that :code:`f_.representation` must be :code:`RingRepresentation.NTT`, otherwise a
-    :type:`ValueError` will be raised.
+    :type:`ValueError` will be raised. :code:`f_` is not modified, but remembers the result, see
+    :class:`mlkem.math.polynomial_ring.PolynomialRing`.
 
     Args:
         | f\_ (:type:`mlkem.math.polynomial_ring.PolynomialRing`): The polynomial to perform the transform on.
@@ -101,27 +93,7 @@ def ntt_inv(f_: PolynomialRing) -> PolynomialRing:
             "Inverse NTT can only be applied to polynomials in NTT representation."
         )
 
-    f = PolynomialRing(f_.coefficients, RingRepresentation.STANDARD)
-    i = 127
-    length = 2
-
-    while length <= 128:
-        for start in range(0, n, 2 * length):
-            zeta = ZETA_LOOKUP[i]
-            i -= 1
-
-            for j in range(start, start + length):
-                t = f[j]
-                f[j] = t + f[j + length]
-                f[j + length] = zeta * (f[j + length] - t)
-
-        length *= 2
-
-    scale = Zm(3303, q)  # 3303 = 128^{-1} mod q
-    for i, fi in enumerate(f.coefficients):
-        f[i] = fi * scale
-
-    return f
+    return f_.to_standard()
 
 
 def multiply_ntt(f_: PolynomialRing, g_: PolynomialRing) -> PolynomialRing:
@@ -145,18 +117,157 @@ def multiply_ntt(f_: PolynomialRing, g_: PolynomialRing) -> PolynomialRing:
             "NTT multiplication can only be applied to polynomials in NTT representation."
         )
 
-    h_ = PolynomialRing(representation=RingRepresentation.NTT)
+    return PolynomialRing.from_values(
+        multiply_ntt_ints(f_.values, g_.values), RingRepresentation.NTT
+    )
+
+
+def ntt_ints(f: list[int]) -> list[int]:
+    r"""Same as :func:`ntt`, on the coefficients of a polynomial as a list of ints.
+
+    Args:
+        | f (:type:`list[int]`): The coefficients of :math:`f \in R_q`. The list is not modified.
+
+    Returns:
+        :type:`list[int]`: The coefficients of :math:`\hat{f} \in T_q`, reduced mod q.
+    """
+    a = list(f)
+    ntt_ints_inplace(a)
+    return a
+
+
+def ntt_ints_inplace(f: list[int]) -> None:
+    r"""Same as :func:`ntt_ints`, overwriting the coefficients of :math:`f` with those of :math:`\hat{f}`.
+
+    Args:
+        | f (:type:`list[int]`): The coefficients of :math:`f \in R_q`, each of absolute value less than q.
+    """
+    if len(f) != n:
+        raise ValueError(f"f must have {n} elements (got {len(f)}).")
+
+    i = 1
+    length = 128
+
+    # only the products are reduced, the sums and differences grow by less than q per layer and are reduced once
+    # at the end
+    while length >= 2:
+        for start in range(0, n, 2 * length):
+            zeta = ZETAS[i]
+            i += 1
+
+            for j in range(start, start + length):
+                t = zeta * f[j + length] % q
+                f[j + length] = f[j] - t
+                f[j] += t
 
-    for i in range(128):
-        gamma = GAMMA_LOOKUP[i]
-        h_[2 * i], h_[2 * i + 1] = _base_case_multiply(
-            f_[2 * i], f_[2 * i + 1], g_[2 * i], g_[2 * i + 1], gamma
+        length //= 2
+
+    for j in range(n):
+        f[j] %= q
+
+
+def ntt_inv_ints(f_: list[int]) -> list[int]:
+    r"""Same as :func:`ntt_inv`, on the coefficients of a polynomial as a list of ints.
+
+    Args:
+        | f\_ (:type:`list[int]`): The coefficients of :math:`\hat{f} \in T_q`. The list is not modified.
+
+    Returns:
+        :type:`list[int]`: The coefficients of :math:`f \in R_q`, reduced mod q.
+    """
+    a = list(f_)
+    ntt_inv_ints_inplace(a)
+    return a
+
+
+def ntt_inv_ints_inplace(f_: list[int]) -> None:
+    r"""Same as :func:`ntt_inv_ints`, overwriting the coefficients of :math:`\hat{f}` with those of :math:`f`.
+
+    Args:
+        | f\_ (:type:`list[int]`): The coefficients of :math:`\hat{f} \in T_q`, each of absolute value less than q.
+    """
+    if len(f_) != n:
+        raise ValueError(f"f_ must have {n} elements (got {len(f_)}).")
+
+    i = 127
+    length = 2
+
+    # only the products are reduced, the sums at most double per layer and are reduced by the final scaling
+    while length <= 128:
+        for start in range(0, n, 2 * length):
+            zeta = ZETAS[i]
+            i -= 1
+
+            for j in range(start, start + length):
+                t = f_[j]
+                f_[j] = t + f_[j + length]
+                f_[j + length] = zeta * (f_[j + length] - t) % q
+
+        length *= 2
+
+    for j in range(n):
+        f_[j] = f_[j] * N_INV % q
+
+
+def multiply_ntt_ints(f_: list[int], g_: list[int]) -> list[int]:
+    r"""Same as :func:`multiply_ntt`, on the coefficients of two polynomials as lists of ints.
+
+    Args:
+        | f\_ (:type:`list[int]`): The coefficients of a multiplication operand in :math:`T_q`.
+        | g\_ (:type:`list[int]`): The coefficients of a multiplication operand in :math:`T_q`.
+
+    Returns:
+        :type:`list[int]`: The coefficients of :math:`\hat{f} \cdot \hat{g}`, reduced mod q.
+    """
+    if len(f_) != n or len(g_) != n:
+        raise ValueError(
+            f"f_ and g_ must have {n} elements (got {len(f_)} and {len(g_)})."
         )
 
+    # the base case multiplications of every pair of coefficients (a0, a1) and (b0, b1) at once
+    f0, f1, g0, g1 = f_[0::2], f_[1::2], g_[0::2], g_[1::2]
+    h_ = [0] * n
+    h_[0::2] = [
+        (a0 * b0 + a1 * b1 % q * gamma) % q
+        for a0, a1, b0, b1, gamma in zip(f0, f1, g0, g1, GAMMAS)
+    ]
+    h_[1::2] = [(a0 * b1 + a1 * b0) % q for a0, a1, b0, b1 in zip(f0, f1, g0, g1)]
     return h_
 
 
-def _base_case_multiply(a0: Zm, a1: Zm, b0: Zm, b1: Zm, gamma: Zm) -> tuple[Zm, Zm]:
-    c0 = a0 * b0 + a1 * b1 * gamma
-    c1 = a0 * b1 + a1 * b0
-    return c0, c1
+def sum_of_products_ntt_ints(fs: list[list[int]], gs: list[list[int]]) -> list[int]:
+    r"""Compute :math:`\sum_i \hat{f}_i \cdot \hat{g}_i` (in the ring :math:`T_q`) on lists of ints.
+
+    The base case multiplications of all pairs are accumulated unreduced and the sums are reduced once at the end.
+
+    Args:
+        | fs (:type:`list[list[int]]`): The coefficients of the left hand operands in :math:`T_q`.
+        | gs (:type:`list[list[int]]`): The coefficients of the right hand operands in :math:`T_q`.
+
+    Returns:
+        :type:`list[int]`: The coefficients of the sum of the products, reduced mod q.
+    """
+    if len(fs) != len(gs):
+        raise ValueError(
+            f"fs and gs must have the same length (got {len(fs)} and {len(gs)})."
+        )
+
+    c0 = [0] * (n // 2)
+    c1 = [0] * (n // 2)
+    for f_, g_ in zip(fs, gs):
+        if len(f_) != n or len(g_) != n:
+            raise ValueError(
+                f"f_ and g_ must have {n} elements (got {len(f_)} and {len(g_)})."
+            )
+
+        f0, f1, g0, g1 = f_[0::2], f_[1::2], g_[0::2], g_[1::2]
+        c0 = [
+            c + a0 * b0 + a1 * b1 % q * gamma
+            for c, a0, a1, b0, b1, gamma in zip(c0, f0, f1, g0, g1, GAMMAS)
+        ]
+        c1 = [c + a0 * b1 + a1 * b0 for c, a0, a1, b0, b1 in zip(c1, f0, f1, g0, g1)]
+
+    h_ = [0] * n
+    h_[0::2] = [c % q for c in c0]
+    h_[1::2] = [c % q for c in c1]
+    return h_
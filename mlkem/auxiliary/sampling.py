@@ -1,10 +1,20 @@
 from mlkem.auxiliary.crypto import XOF
-from mlkem.auxiliary.general import bytes_to_bits
 from mlkem.math.constants import n, q
-from mlkem.math.field import Zm
 from mlkem.math.polynomial_ring import PolynomialRing, RingRepresentation
 
 
+def _centered_difference(bits: int, eta: int) -> int:
+    """The difference of the number of ones in the low and high eta bits of 2 * eta bits, reduced mod q."""
+    return ((bits & ((1 << eta) - 1)).bit_count() - (bits >> eta).bit_count()) % q
+
+
+# for eta = 2 every byte holds two coefficients, in its low and high four bits
+_CBD2_LOW = [_centered_difference(x & 0xF, 2) for x in range(256)]
+_CBD2_HIGH = [_centered_difference(x >> 4, 2) for x in range(256)]
+# for eta = 3 every three bytes hold four coefficients of six bits each
+_CBD3 = [_centered_difference(x, 3) for x in range(64)]
+
+
 def sample_ntt(b: bytes) -> PolynomialRing:
     r"""Take a seed and two indices and sample a pseudorandom elements in :math:`T_q`.
 
@@ -19,7 +29,7 @@ def sample_ntt(b: bytes) -> PolynomialRing:
             f"Input must be 34 bytes (32-byte seed and two indices). Got {len(b)}."
         )
 
-    a = PolynomialRing(representation=RingRepresentation.NTT)
+    a = [0] * n
     xof = XOF()
     xof.absorb(b)
 
@@ -30,14 +40,14 @@ def sample_ntt(b: bytes) -> PolynomialRing:
         d2 = c[1] // 16 + 16 * c[2]
 
         if d1 < q:
-            a[j] = Zm(d1, q)
+            a[j] = d1
             j += 1
 
         if d2 < q and j < n:
-            a[j] = Zm(d2, q)
+            a[j] = d2
             j += 1
 
-    return a
+    return PolynomialRing.from_values(a, RingRepresentation.NTT)
 
 
 def sample_poly_cbd(eta: int, b: bytes) -> PolynomialRing:
@@ -57,12 +67,23 @@ def sample_poly_cbd(eta: int, b: bytes) -> PolynomialRing:
     if len(b) != 64 * eta:
         raise ValueError(f"Input must be {64 * eta} bytes (got {len(b)}).")
 
-    f = PolynomialRing(representation=RingRepresentation.STANDARD)
-    bits = bytes_to_bits([x for x in b])
-
-    for i in range(n):
-        x = sum([bits[2 * i * eta + j] for j in range(eta)])
-        y = sum([bits[2 * i * eta + eta + j] for j in range(eta)])
-        f[i] = Zm(x - y, q)
-
-    return f
+    if eta == 2:
+        f = [0] * n
+        f[0::2] = [_CBD2_LOW[x] for x in b]
+        f[1::2] = [_CBD2_HIGH[x] for x in b]
+    elif eta == 3:
+        f = []
+        for i in range(0, len(b), 3):
+            x = b[i] | b[i + 1] << 8 | b[i + 2] << 16
+            f += (
+                _CBD3[x & 63],
+                _CBD3[x >> 6 & 63],
+                _CBD3[x >> 12 & 63],
+                _CBD3[x >> 18],
+            )
+    else:
+        x = int.from_bytes(b, "little")
+        mask = (1 << 2 * eta) - 1
+        f = [_centered_difference(x >> (2 * eta * i) & mask, eta) for i in range(n)]
+
+    return PolynomialRing.from_values(f, RingRepresentation.STANDARD)
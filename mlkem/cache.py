@@ -0,0 +1,475 @@
+from __future__ import annotations
+
+from collections import OrderedDict
+from hashlib import sha3_256
+from multiprocessing import get_context
+from multiprocessing.context import BaseContext
+from multiprocessing.shared_memory import SharedMemory
+from multiprocessing.synchronize import Lock as LockType
+from struct import pack_into, unpack_from
+from sys import getsizeof
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable
+
+from mlkem import _shm
+from mlkem.fastmath import byte_decode_matrix, byte_encode_matrix  # type: ignore
+from mlkem.math.constants import n
+
+# approximate memory use of one polynomial stored as a list of python ints (reduced coefficients are < 2^30)
+_POLYNOMIAL_SIZE = getsizeof([0] * n) + n * getsizeof(2**29)
+# size of one polynomial byte encoded with 12 bits per coefficient
+_COMPACT_POLYNOMIAL_SIZE = 32 * 12
+
+# layout of a SharedMatrixCache segment: a header followed by fixed size slots, each holding a slot header and up to
+# 4 * 4 byte encoded polynomials
+_SEGMENT_MAGIC = b"MLKA"
+# magic, number of slots, global write counter
+_SEGMENT_HEADER = "<4sIQ"
+_SEGMENT_HEADER_SIZE = 64
+# sequence number (odd while being written), write stamp, k (0 if empty), rho
+_SLOT_HEADER = "<QQB32s"
+_SLOT_SEQUENCE = "<Q"
+_SLOT_FIELDS = "<8xQB32s"
+_SLOT_HEADER_SIZE = 64
+_SLOT_SIZE = _SLOT_HEADER_SIZE + 16 * _COMPACT_POLYNOMIAL_SIZE
+# number of consecutive slots a seed may be stored in
+_PROBES = 4
+
+
+class MatrixCache:
+    r"""A thread-safe least recently used (LRU) cache of the matrix :math:`\hat{A}` keyed by its seed :math:`\rho`.
+
+    Matrix :math:`\hat{A}` is expanded from the seed :math:`\rho` in the encapsulation key on every key generation,
+    encryption and decapsulation. Passing a cache to :class:`mlkem.k_pke.K_PKE`, :class:`mlkem.fast_k_pke.Fast_K_PKE`
+    or :class:`mlkem.ml_kem.ML_KEM` skips the expansion for keys that are used repeatedly. The least recently used
+    entries are evicted once either :code:`max_entries` or :code:`max_bytes` is exceeded.
+
+    Entries are the :math:`k^2` polynomials of :math:`\hat{A}` in row major order as lists of integer coefficients.
+    In compact mode they are stored byte encoded instead, which needs about 20x less memory at the cost of decoding
+    the matrix on every hit. Pickling a cache keeps its configuration but not its entries.
+    """
+
+    max_entries: int
+    max_bytes: int | None
+    compact: bool
+    hits: int
+    misses: int
+
+    def __init__(
+        self,
+        max_entries: int = 128,
+        max_bytes: int | None = None,
+        compact: bool = False,
+    ):
+        r"""Initialize an empty cache.
+
+        Args:
+            | max_entries (:type:`int`): The largest number of matrices kept.
+            | max_bytes (:type:`int | None`): The (approximate) largest number of bytes used by the matrices, unbounded if not given.
+            | compact (:type:`bool`): Whether to store the matrices byte encoded.
+        """
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be positive (got {max_entries}).")
+        if max_bytes is not None and max_bytes < 1:
+            raise ValueError(f"max_bytes must be positive (got {max_bytes}).")
+
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.compact = compact
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[int, bytes], Any] = OrderedDict()
+        self._bytes = 0
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+            "compact": self.compact,
+        }
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__init__(**state)  # type: ignore[misc]
+
+    @property
+    def size(self) -> int:
+        r"""The (approximate) number of bytes used by the cached matrices."""
+        return self._bytes
+
+    def get(self, k: int, rho: bytes) -> list[list[int]] | None:
+        r"""Look up the matrix for a seed and mark it as most recently used.
+
+        The returned lists are shared with the cache and must not be modified.
+
+        Args:
+            | k (:type:`int`): The number of rows and columns of the matrix.
+            | rho (:type:`bytes`): The seed the matrix was expanded from.
+
+        Returns:
+            :type:`list[list[int]] | None`: The polynomials of the matrix in row major order, :code:`None` if not cached.
+        """
+        key = (k, rho)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        if self.compact:
+            return byte_decode_matrix(entry, 12, k * k)  # type: ignore[no-any-return]
+        return entry  # type: ignore[no-any-return]
+
+    def put(self, k: int, rho: bytes, a: list[list[int]]) -> None:
+        r"""Store the matrix for a seed, evicting the least recently used matrices if the cache is full.
+
+        Args:
+            | k (:type:`int`): The number of rows and columns of the matrix.
+            | rho (:type:`bytes`): The seed the matrix was expanded from.
+            | a (:type:`list[list[int]]`): The polynomials of the matrix in row major order.
+        """
+        if self.compact:
+            entry: Any = byte_encode_matrix(a, 12)
+            size = k * k * _COMPACT_POLYNOMIAL_SIZE
+        else:
+            entry = a
+            size = k * k * _POLYNOMIAL_SIZE
+
+        if self.max_bytes is not None and size > self.max_bytes:
+            return
+
+        key = (k, rho)
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+
+            self._entries[key] = entry
+            self._bytes += size
+            while len(self._entries) > self.max_entries or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                (evicted_k, _), _ = self._entries.popitem(last=False)
+                self._bytes -= (
+                    evicted_k
+                    * evicted_k
+                    * (_COMPACT_POLYNOMIAL_SIZE if self.compact else _POLYNOMIAL_SIZE)
+                )
+
+    def clear(self) -> None:
+        r"""Remove all matrices and reset the hit and miss counters."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+
+class DecapsulationCache:
+    r"""A thread-safe cache of shared keys returned by decapsulation, for retried requests.
+
+    Passing a cache to :class:`mlkem.ml_kem.ML_KEM` makes :func:`mlkem.ml_kem.ML_KEM.decaps` return the shared key it
+    derived before for the same decapsulation key and ciphertext, without decrypting and re-encrypting again. This
+    includes the implicitly rejected key for an invalid ciphertext, so results are the same with and without a cache.
+
+    Entries are keyed by the SHA3-256 hash of the key identifier and the ciphertext, the ciphertexts themselves are
+    not kept. The cache does hold shared keys, each until it expires after :code:`ttl` seconds or is evicted because
+    there are more than :code:`max_entries`. Pickling a cache keeps its configuration but not its entries.
+    """
+
+    max_entries: int
+    ttl: float
+    clock: Callable[[], float]
+    hits: int
+    misses: int
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        ttl: float = 10.0,
+        clock: Callable[[], float] = monotonic,
+    ):
+        r"""Initialize an empty cache.
+
+        Args:
+            | max_entries (:type:`int`): The largest number of shared keys kept.
+            | ttl (:type:`float`): The number of seconds a shared key is kept for.
+            | clock (:type:`Callable[[], float]`): The source of the current time in seconds.
+        """
+        if max_entries < 1:
+            raise ValueError(f"max_entries must be positive (got {max_entries}).")
+        if ttl <= 0:
+            raise ValueError(f"ttl must be positive (got {ttl}).")
+
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.clock = clock
+        self.hits = 0
+        self.misses = 0
+        # entries are kept in the order they expire in, as they all live for the same time
+        self._entries: OrderedDict[bytes, tuple[float, bytes]] = OrderedDict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __getstate__(self) -> dict[str, Any]:
+        return {"max_entries": self.max_entries, "ttl": self.ttl, "clock": self.clock}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__init__(**state)  # type: ignore[misc]
+
+    def get(self, key_id: bytes, c: bytes) -> bytes | None:
+        r"""Look up the shared key for a decapsulation key and ciphertext.
+
+        Args:
+            | key_id (:type:`bytes`): An identifier of the decapsulation key.
+            | c (:type:`bytes`): The ciphertext.
+
+        Returns:
+            :type:`bytes | None`: The shared key, :code:`None` if not cached or expired.
+        """
+        key = sha3_256(key_id + c).digest()
+        with self._lock:
+            self._expire()
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            return entry[1]
+
+    def put(self, key_id: bytes, c: bytes, shared_key: bytes) -> None:
+        r"""Store the shared key for a decapsulation key and ciphertext, evicting the oldest key if the cache is full.
+
+        Args:
+            | key_id (:type:`bytes`): An identifier of the decapsulation key.
+            | c (:type:`bytes`): The ciphertext.
+            | shared_key (:type:`bytes`): The shared key returned by decapsulation.
+        """
+        key = sha3_256(key_id + c).digest()
+        with self._lock:
+            self._expire()
+            self._entries.pop(key, None)
+            self._entries[key] = (self.clock() + self.ttl, shared_key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self) -> None:
+        r"""Remove all shared keys and reset the hit and miss counters."""
+        with self._lock:
+            self._entries.clear()
+            self.hits = 0
+            self.misses = 0
+
+    def _expire(self) -> None:
+        now = self.clock()
+        while self._entries and next(iter(self._entries.values()))[0] <= now:
+            self._entries.popitem(last=False)
+
+
+class SharedMatrixCache:
+    r"""A cache of the matrix :math:`\hat{A}` keyed by its seed :math:`\rho` that is shared between processes.
+
+    The matrices are stored byte encoded in fixed size slots of a :class:`multiprocessing.shared_memory.SharedMemory`
+    segment, so a matrix expanded by one process serves every process attached to the segment. A seed maps to a
+    window of a few consecutive slots. Once all of them are used the oldest entry in the window is replaced.
+
+    Lookups do not lock. Every slot carries a sequence number that is odd while the slot is being written, and a
+    lookup that sees it change while copying the slot counts as a miss. Stores are serialized by a
+    :func:`multiprocessing.Lock`. A process that attaches without the lock only reads from the cache.
+
+    The process that creates the cache owns the segment and removes it in :func:`unlink`. Forked processes inherit the
+    cache with its lock. Pickled copies, e.g. the argument of a spawned :class:`multiprocessing.Process` or an
+    :class:`mlkem.ml_kem.ML_KEM` instance sent to a :class:`concurrent.futures.ProcessPoolExecutor`, attach to the
+    same segment read only. To store from such a process, pass it :attr:`name` and :attr:`lock` and :func:`attach`
+    with both.
+    """
+
+    hits: int
+    misses: int
+
+    def __init__(self, slots: int = 256, mp_context: BaseContext | None = None):
+        r"""Create a cache in a new shared memory segment.
+
+        Args:
+            | slots (:type:`int`): The largest number of matrices kept. Each slot uses about 6 KiB.
+            | mp_context (:class:`multiprocessing.context.BaseContext | None`): The context used to start the processes sharing the cache, the default context if not given.
+        """
+        if slots < 1:
+            raise ValueError(f"slots must be positive (got {slots}).")
+
+        shm = SharedMemory(create=True, size=_SEGMENT_HEADER_SIZE + slots * _SLOT_SIZE)
+        pack_into(_SEGMENT_HEADER, _shm.buffer(shm), 0, _SEGMENT_MAGIC, slots, 0)
+        self._open(shm, (mp_context or get_context()).Lock(), owner=True)
+
+    @classmethod
+    def attach(cls, name: str, lock: LockType | None = None) -> SharedMatrixCache:
+        r"""Attach to a cache created by another process.
+
+        Args:
+            | name (:type:`str`): The name of the shared memory segment, see :attr:`name`.
+            | lock (:type:`multiprocessing.synchronize.Lock | None`): The lock of the cache, the cache is read only if not given.
+
+        Returns:
+            :class:`SharedMatrixCache`: The attached cache.
+        """
+        shm = _shm.attach(name)
+        magic, _, _ = unpack_from(_SEGMENT_HEADER, _shm.buffer(shm), 0)
+        if magic != _SEGMENT_MAGIC:
+            shm.close()
+            raise ValueError(f"Shared memory segment {name} is not a matrix cache.")
+
+        cache = cls.__new__(cls)
+        cache._open(shm, lock, owner=False)
+        return cache
+
+    def _open(self, shm: SharedMemory, lock: LockType | None, owner: bool) -> None:
+        self._shm = shm
+        self._buf = _shm.buffer(shm)
+        self._slots: int = unpack_from(_SEGMENT_HEADER, self._buf, 0)[1]
+        self._lock = lock
+        self._owner = owner
+        self.hits = 0
+        self.misses = 0
+
+    def __enter__(self) -> SharedMatrixCache:
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+        if self._owner:
+            self.unlink()
+
+    def __len__(self) -> int:
+        return sum(
+            1
+            for slot in range(self._slots)
+            if unpack_from(_SLOT_FIELDS, self._buf, self._offset(slot))[1]
+        )
+
+    def __getstate__(self) -> dict[str, Any]:
+        # a process lock can only be pickled while starting a process, so copies never carry it
+        return {"name": self.name}
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self._open(_shm.attach(state["name"]), None, owner=False)
+
+    @property
+    def name(self) -> str:
+        r"""The name of the shared memory segment."""
+        return self._shm.name
+
+    @property
+    def lock(self) -> LockType | None:
+        r"""The lock serializing stores, :code:`None` if the cache is read only."""
+        return self._lock
+
+    @property
+    def read_only(self) -> bool:
+        r"""Whether :func:`put` is ignored because the cache was attached without its lock."""
+        return self._lock is None
+
+    def get(self, k: int, rho: bytes) -> list[list[int]] | None:
+        r"""Look up the matrix for a seed.
+
+        Args:
+            | k (:type:`int`): The number of rows and columns of the matrix.
+            | rho (:type:`bytes`): The seed the matrix was expanded from.
+
+        Returns:
+            :type:`list[list[int]] | None`: The polynomials of the matrix in row major order, :code:`None` if not cached.
+        """
+        for slot in self._window(rho):
+            offset = self._offset(slot)
+            seq = unpack_from(_SLOT_SEQUENCE, self._buf, offset)[0]
+            _, slot_k, slot_rho = unpack_from(_SLOT_FIELDS, self._buf, offset)
+            if seq & 1 or slot_k != k or slot_rho != rho:
+                continue
+
+            start = offset + _SLOT_HEADER_SIZE
+            data = bytes(self._buf[start : start + k * k * _COMPACT_POLYNOMIAL_SIZE])
+            # the slot was overwritten while copying it
+            if unpack_from(_SLOT_SEQUENCE, self._buf, offset)[0] != seq:
+                break
+
+            self.hits += 1
+            return byte_decode_matrix(data, 12, k * k)  # type: ignore[no-any-return]
+
+        self.misses += 1
+        return None
+
+    def put(self, k: int, rho: bytes, a: list[list[int]]) -> None:
+        r"""Store the matrix for a seed, replacing the oldest matrix in its slots if they are all used.
+
+        Args:
+            | k (:type:`int`): The number of rows and columns of the matrix.
+            | rho (:type:`bytes`): The seed the matrix was expanded from.
+            | a (:type:`list[list[int]]`): The polynomials of the matrix in row major order.
+        """
+        if self._lock is None or len(rho) != 32 or not 1 <= k <= 4:
+            return
+
+        data = byte_encode_matrix(a, 12)
+        with self._lock:
+            victim, oldest = 0, None
+            for slot in self._window(rho):
+                _, stamp, slot_k, slot_rho = unpack_from(
+                    _SLOT_HEADER, self._buf, self._offset(slot)
+                )
+                if slot_k == k and slot_rho == rho:
+                    return
+                if not slot_k:
+                    victim = slot
+                    break
+                if oldest is None or stamp < oldest:
+                    victim, oldest = slot, stamp
+
+            _, slots, writes = unpack_from(_SEGMENT_HEADER, self._buf, 0)
+            pack_into(_SEGMENT_HEADER, self._buf, 0, _SEGMENT_MAGIC, slots, writes + 1)
+
+            # everything but the sequence number is written while it is odd
+            offset = self._offset(victim)
+            seq = unpack_from(_SLOT_SEQUENCE, self._buf, offset)[0]
+            pack_into(_SLOT_SEQUENCE, self._buf, offset, seq + 1)
+            pack_into(_SLOT_FIELDS, self._buf, offset, writes + 1, k, rho)
+            start = offset + _SLOT_HEADER_SIZE
+            self._buf[start : start + len(data)] = data
+            pack_into(_SLOT_SEQUENCE, self._buf, offset, seq + 2)
+
+    def clear(self) -> None:
+        r"""Remove all matrices and reset the hit and miss counters of this process."""
+        if self._lock is not None:
+            with self._lock:
+                for slot in range(self._slots):
+                    offset = self._offset(slot)
+                    seq = unpack_from(_SLOT_SEQUENCE, self._buf, offset)[0]
+                    pack_into(_SLOT_SEQUENCE, self._buf, offset, seq + 1)
+                    pack_into(_SLOT_FIELDS, self._buf, offset, 0, 0, bytes(32))
+                    pack_into(_SLOT_SEQUENCE, self._buf, offset, seq + 2)
+        self.hits = 0
+        self.misses = 0
+
+    def close(self) -> None:
+        r"""Detach this process from the shared memory segment."""
+        self._buf.release()
+        self._shm.close()
+
+    def unlink(self) -> None:
+        r"""Remove the shared memory segment. Only the owner should call this, once every process is detached."""
+        self._shm.unlink()
+
+    def _window(self, rho: bytes) -> range:
+        home = int.from_bytes(rho[:8], "little")
+        return range(home, home + min(_PROBES, self._slots))
+
+    def _offset(self, slot: int) -> int:
+        return _SEGMENT_HEADER_SIZE + (slot % self._slots) * _SLOT_SIZE
@@ -16,3 +16,27 @@ class Field(Protocol):
     @abstractmethod
     def __mul__(self, other: Self) -> Self:
         pass
+
+
+# a cache of the matrix A expanded from the seed rho, see mlkem.cache.MatrixCache
+# the matrix is given as its k * k polynomials in row major order
+class MatrixCacheInterface(Protocol):
+    @abstractmethod
+    def get(self, k: int, rho: bytes) -> list[list[int]] | None:
+        pass
+
+    @abstractmethod
+    def put(self, k: int, rho: bytes, a: list[list[int]]) -> None:
+        pass
+
+
+# a cache of shared keys returned by decapsulation, see mlkem.cache.DecapsulationCache
+# key_id identifies the decapsulation key, c is the ciphertext
+class DecapsulationCacheInterface(Protocol):
+    @abstractmethod
+    def get(self, key_id: bytes, c: bytes) -> bytes | None:
+        pass
+
+    @abstractmethod
+    def put(self, key_id: bytes, c: bytes, shared_key: bytes) -> None:
+        pass
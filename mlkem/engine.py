@@ -0,0 +1,415 @@
+from __future__ import annotations
+
+import os
+from collections import defaultdict
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from dataclasses import dataclass
+from itertools import count
+from multiprocessing import Pipe, Process
+from multiprocessing.connection import Connection
+from multiprocessing.shared_memory import SharedMemory
+from queue import SimpleQueue
+from threading import Lock, Thread
+from typing import Any, Sequence
+
+from mlkem import _shm
+from mlkem.ml_kem import ML_KEM
+from mlkem.parameter_set import ML_KEM_768, ParameterSet
+
+KEY_GEN = 0
+ENCAPS = 1
+DECAPS = 2
+
+
+@dataclass(frozen=True)
+class SlotLayout:
+    r"""The layout of a slot in the shared memory ring of a :class:`ProcessEngine` worker.
+
+    Each slot holds a request region followed by a response region. Both are sized for the largest request and
+    response of the parameter set, so any operation fits into any slot.
+    """
+
+    ek_size: int
+    dk_size: int
+    c_size: int
+    request_size: int
+    response_size: int
+
+    @classmethod
+    def from_parameters(cls, parameters: ParameterSet) -> SlotLayout:
+        r"""Derive the slot layout from a parameter set.
+
+        Args:
+            | parameters (:class:`mlkem.parameter_set.ParameterSet`): The ML-KEM parameter set.
+
+        Returns:
+            :class:`SlotLayout`: The layout for the parameter set.
+        """
+        k = parameters.k
+        ek_size = 384 * k + 32
+        dk_size = 768 * k + 96
+        c_size = 32 * (parameters.du * k + parameters.dv)
+
+        return cls(
+            ek_size=ek_size,
+            dk_size=dk_size,
+            c_size=c_size,
+            # key_gen takes no input, encaps takes ek and decaps takes (dk, c)
+            request_size=max(ek_size, dk_size + c_size),
+            # key_gen returns (ek, dk), encaps returns (k, c) and decaps returns k
+            response_size=max(ek_size + dk_size, 32 + c_size),
+        )
+
+    @property
+    def slot_size(self) -> int:
+        return self.request_size + self.response_size
+
+    def request(self, slot: int) -> int:
+        r"""The offset of the request region of :code:`slot`."""
+        return slot * self.slot_size
+
+    def response(self, slot: int) -> int:
+        r"""The offset of the response region of :code:`slot`."""
+        return slot * self.slot_size + self.request_size
+
+
+def _worker_main(
+    name: str,
+    conn: Connection,
+    parameters: ParameterSet,
+    fast: bool,
+    slots: int,
+    cpus: set[int] | None,
+) -> None:
+    if cpus is not None and hasattr(os, "sched_setaffinity"):
+        os.sched_setaffinity(0, cpus)
+
+    shm = _shm.attach(name)
+    buf = _shm.buffer(shm)
+    ml_kem = ML_KEM(parameters, fast=fast)
+    layout = SlotLayout.from_parameters(parameters)
+
+    try:
+        running = True
+        while running:
+            try:
+                message = conn.recv()
+            except EOFError:
+                break
+
+            # drain whatever else is already waiting so that it can be run as one batch
+            batch: list[tuple[int, int]] = []
+            while message is not None:
+                batch.append(message)
+                if len(batch) == slots or not conn.poll():
+                    break
+                message = conn.recv()
+            running = message is not None
+
+            if batch:
+                conn.send(_process(ml_kem, layout, buf, batch))
+    finally:
+        del buf
+        shm.close()
+
+
+def _process(
+    ml_kem: ML_KEM, layout: SlotLayout, buf: memoryview, batch: list[tuple[int, int]]
+) -> list[tuple[int, BaseException | None]]:
+    by_op: defaultdict[int, list[int]] = defaultdict(list)
+    for op, slot in batch:
+        by_op[op].append(slot)
+
+    replies: list[tuple[int, BaseException | None]] = []
+    for op, slots in by_op.items():
+        try:
+            if op == KEY_GEN:
+                for slot, (ek, dk) in zip(slots, ml_kem.key_gen_batch(len(slots))):
+                    offset = layout.response(slot)
+                    buf[offset : offset + len(ek) + len(dk)] = ek + dk
+            elif op == ENCAPS:
+                eks = [
+                    bytes(buf[layout.request(s) : layout.request(s) + layout.ek_size])
+                    for s in slots
+                ]
+                for slot, (k, c) in zip(slots, ml_kem.encaps_batch(eks)):
+                    offset = layout.response(slot)
+                    buf[offset : offset + len(k) + len(c)] = k + c
+            elif op == DECAPS:
+                requests = [
+                    bytes(
+                        buf[
+                            layout.request(s) : layout.request(s)
+                            + layout.dk_size
+                            + layout.c_size
+                        ]
+                    )
+                    for s in slots
+                ]
+                dks = [r[: layout.dk_size] for r in requests]
+                cs = [r[layout.dk_size :] for r in requests]
+                for slot, k in zip(slots, ml_kem.decaps_batch(dks, cs)):
+                    offset = layout.response(slot)
+                    buf[offset : offset + len(k)] = k
+            else:
+                raise ValueError(f"Unknown operation {op}.")
+            replies.extend((slot, None) for slot in slots)
+        except Exception as e:
+            replies.extend((slot, e) for slot in slots)
+
+    return replies
+
+
+class _Worker:
+    def __init__(
+        self,
+        parameters: ParameterSet,
+        fast: bool,
+        layout: SlotLayout,
+        slots: int,
+        cpus: set[int] | None,
+    ) -> None:
+        self.layout = layout
+        self.shm = SharedMemory(create=True, size=slots * layout.slot_size)
+        self.buf = _shm.buffer(self.shm)
+        self.empty_slot = bytes(layout.slot_size)
+        self.free: SimpleQueue[int] = SimpleQueue()
+        for slot in range(slots):
+            self.free.put(slot)
+        self.pending: dict[int, tuple[int, Future[Any]]] = {}
+        self.send_lock = Lock()
+        self.closing = False
+        self.broken = False
+
+        self.conn, child_conn = Pipe()
+        self.process = Process(
+            target=_worker_main,
+            args=(self.shm.name, child_conn, parameters, fast, slots, cpus),
+            daemon=True,
+        )
+        self.process.start()
+        child_conn.close()
+
+        self.reader = Thread(target=self._read, daemon=True)
+
+    def start_reader(self) -> None:
+        # separate from __init__, so that every worker is forked before any reader thread runs
+        self.reader.start()
+
+    def submit(self, op: int, payload: bytes) -> Future[Any]:
+        future: Future[Any] = Future()
+        # blocks while every slot of this worker is in use, a broken worker returns all of its slots
+        slot = self.free.get()
+
+        with self.send_lock:
+            if self.closing:
+                self.free.put(slot)
+                raise RuntimeError("Cannot submit work to a closed engine.")
+            if self.broken:
+                self.free.put(slot)
+                raise BrokenProcessPool("A worker process exited.")
+            offset = self.layout.request(slot)
+            self.buf[offset : offset + len(payload)] = payload
+            self.pending[slot] = (op, future)
+            try:
+                self.conn.send((op, slot))
+            except OSError as e:
+                del self.pending[slot]
+                self._clear(slot)
+                self.free.put(slot)
+                raise BrokenProcessPool("A worker process exited.") from e
+
+        return future
+
+    def close(self) -> None:
+        with self.send_lock:
+            if self.closing:
+                return
+            self.closing = True
+            try:
+                self.conn.send(None)
+            except OSError:
+                pass
+
+        self.process.join()
+        self.reader.join()
+        self.conn.close()
+        self.buf[:] = bytes(len(self.buf))
+        self.buf.release()
+        self.shm.close()
+        self.shm.unlink()
+
+    def _read(self) -> None:
+        while True:
+            try:
+                replies = self.conn.recv()
+            except (EOFError, OSError):
+                break
+
+            for slot, error in replies:
+                op, future = self.pending.pop(slot)
+                result = self._result(op, slot) if error is None else None
+                self._clear(slot)
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+                self.free.put(slot)
+
+        # the worker is gone, so nothing that is still pending will complete
+        with self.send_lock:
+            self.broken = True
+            for slot, (_, future) in self.pending.items():
+                self._clear(slot)
+                future.set_exception(BrokenProcessPool("A worker process exited."))
+                self.free.put(slot)
+            self.pending.clear()
+
+    def _clear(self, slot: int) -> None:
+        # overwrite the keys and shared secrets in the request and response regions
+        offset = self.layout.request(slot)
+        self.buf[offset : offset + self.layout.slot_size] = self.empty_slot
+
+    def _result(self, op: int, slot: int) -> Any:
+        layout = self.layout
+        offset = layout.response(slot)
+        buf = self.buf
+
+        if op == KEY_GEN:
+            ek = bytes(buf[offset : offset + layout.ek_size])
+            dk = bytes(
+                buf[offset + layout.ek_size : offset + layout.ek_size + layout.dk_size]
+            )
+            return ek, dk
+        elif op == ENCAPS:
+            return bytes(buf[offset : offset + 32]), bytes(
+                buf[offset + 32 : offset + 32 + layout.c_size]
+            )
+        else:
+            return bytes(buf[offset : offset + 32])
+
+
+class ProcessEngine:
+    """A process pool for ML-KEM operations that exchanges data through shared memory.
+
+    Every worker process owns a ring of fixed-size slots in a :class:`multiprocessing.shared_memory.SharedMemory`
+    segment (see :class:`SlotLayout`). Requests are written into a free slot and only the operation and slot index
+    are sent to the worker over a pipe. The worker writes its result back into the same slot and answers with the
+    slot index. Requests that are waiting when a worker picks up work are run together through the batch methods of
+    :class:`mlkem.ml_kem.ML_KEM`.
+
+    Slots carry decapsulation keys and shared keys, so a slot is zeroed as soon as its result has been copied out or
+    its request failed, and every slot is zeroed again when the engine is closed.
+    """
+
+    parameters: ParameterSet
+    layout: SlotLayout
+
+    def __init__(
+        self,
+        parameters: ParameterSet = ML_KEM_768,
+        workers: int | None = None,
+        slots_per_worker: int = 64,
+        fast: bool = True,
+        pin_cpus: bool | Sequence[int] = False,
+    ):
+        r"""Start the worker processes.
+
+        Args:
+            | parameters (:class:`mlkem.parameter_set.ParameterSet`): The ML-KEM parameter set.
+            | workers (:type:`int | None`): The number of worker processes, :code:`os.cpu_count()` if not given.
+            | slots_per_worker (:type:`int`): The number of requests each worker can have in flight.
+            | fast (:type:`bool`): Whether the workers use the C extensions, see :class:`mlkem.ml_kem.ML_KEM`.
+            | pin_cpus (:type:`bool | Sequence[int]`): Pin each worker to one CPU. If :code:`True` worker i is pinned to the i-th CPU available to this process, a sequence of CPU ids is used in turn. Ignored on platforms without :code:`os.sched_setaffinity`.
+        """
+        if workers is None:
+            workers = os.cpu_count() or 1
+        if workers < 1:
+            raise ValueError(f"workers must be positive (got {workers}).")
+        if slots_per_worker < 1:
+            raise ValueError(
+                f"slots_per_worker must be positive (got {slots_per_worker})."
+            )
+
+        cpus: list[set[int] | None] = [None] * workers
+        if pin_cpus and hasattr(os, "sched_getaffinity"):
+            available = (
+                sorted(os.sched_getaffinity(0)) if pin_cpus is True else list(pin_cpus)
+            )
+            cpus = [{available[i % len(available)]} for i in range(workers)]
+
+        self.parameters = parameters
+        self.layout = SlotLayout.from_parameters(parameters)
+        self._ml_kem = ML_KEM(parameters, fast=fast)
+        self._workers = [
+            _Worker(parameters, fast, self.layout, slots_per_worker, cpus[i])
+            for i in range(workers)
+        ]
+        # forking while threads run can deadlock the child, so start the readers only after the last fork
+        for worker in self._workers:
+            worker.start_reader()
+        self._next = count()
+
+    def __enter__(self) -> ProcessEngine:
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+    def submit_key_gen(self) -> Future[tuple[bytes, bytes]]:
+        r"""Schedule :func:`mlkem.ml_kem.ML_KEM.key_gen` on a worker.
+
+        Returns:
+            :type:`concurrent.futures.Future[tuple[bytes, bytes]]`: The (encapsulation key, decapsulation key) pair.
+        """
+        return self._worker().submit(KEY_GEN, b"")
+
+    def submit_encaps(self, ek: bytes) -> Future[tuple[bytes, bytes]]:
+        r"""Schedule :func:`mlkem.ml_kem.ML_KEM.encaps` on a worker.
+
+        The key is validated before it is scheduled, so an invalid key raises :type:`ValueError` right away.
+
+        Args:
+            | ek (:type:`bytes`): The encapsulation key.
+
+        Returns:
+            :type:`concurrent.futures.Future[tuple[bytes, bytes]]`: The (shared key, ciphertext) pair.
+        """
+        self._ml_kem._check_encaps_input(ek)
+        return self._worker().submit(ENCAPS, ek)
+
+    def submit_decaps(self, dk: bytes, c: bytes) -> Future[bytes]:
+        r"""Schedule :func:`mlkem.ml_kem.ML_KEM.decaps` on a worker.
+
+        The inputs are validated before they are scheduled, so invalid inputs raise :type:`ValueError` right away.
+
+        Args:
+            | dk (:type:`bytes`): The decapsulation key.
+            | c (:type:`bytes`): The ciphertext.
+
+        Returns:
+            :type:`concurrent.futures.Future[bytes]`: The shared key.
+        """
+        self._ml_kem._check_decaps_input(dk, c)
+        return self._worker().submit(DECAPS, dk + c)
+
+    def key_gen(self) -> tuple[bytes, bytes]:
+        r"""Equivalent to :code:`submit_key_gen().result()`."""
+        return self.submit_key_gen().result()
+
+    def encaps(self, ek: bytes) -> tuple[bytes, bytes]:
+        r"""Equivalent to :code:`submit_encaps(ek).result()`."""
+        return self.submit_encaps(ek).result()
+
+    def decaps(self, dk: bytes, c: bytes) -> bytes:
+        r"""Equivalent to :code:`submit_decaps(dk, c).result()`."""
+        return self.submit_decaps(dk, c).result()
+
+    def close(self) -> None:
+        r"""Finish all scheduled work, then stop the workers and release the shared memory."""
+        for worker in self._workers:
+            worker.close()
+
+    def _worker(self) -> _Worker:
+        return self._workers[next(self._next) % len(self._workers)]
@@ -1,6 +1,9 @@
+from __future__ import annotations
+
 from hashlib import shake_128
+from typing import TYPE_CHECKING
 
-from mlkem.auxiliary.crypto import g, prf
+from mlkem.auxiliary.crypto import g, prf_from, prf_state
 from mlkem.fastmath import (  # type: ignore
     add_matrix,
     add_poly,
@@ -12,37 +15,44 @@ from mlkem.fastmath import (  # type: ignore
     compress_poly,
     decompress_matrix,
     decompress_poly,
+    decrypt_batch,
+    decrypt_prepared,
+    encrypt_batch,
+    encrypt_prepared,
+    key_gen_batch,
     map_ntt_inv_matrix,
     map_ntt_matrix,
     mul_matrix,
     ntt_inv,
+    prepare_decryption_key,
+    prepare_encryption_key,
     sample_ntt,
     sample_poly_cbd,
     sub_poly,
 )
 from mlkem.k_pke import PKE_Interface
-from mlkem.parameter_set import ParameterSet
+
+if TYPE_CHECKING:
+    from _hashlib import HASHXOF
 
 
 class Fast_K_PKE(PKE_Interface):
     """C extension implementation of the PKE Interface."""
 
-    def __init__(self, parameters: ParameterSet):
-        self.parameters = parameters
-
     def key_gen(self, d: bytes) -> tuple[bytes, bytes]:
         k = self.parameters.k
         rho, sigma = g(d + bytes([k]))
         N = 0
         # generate matrix A in (Z^n_q)^{k*k}
         a_ = self._generate_a(rho)
+        prf_sigma = prf_state(sigma)
 
         # generate vector s in (Z^n_q)^{k}
-        s = self._sample_column_vector(self.parameters.eta1, sigma, N)
+        s = self._sample_column_vector(self.parameters.eta1, prf_sigma, N)
         N += k
 
         # generate vector e in (Z^n_q)^{k}
-        e = self._sample_column_vector(self.parameters.eta1, sigma, N)
+        e = self._sample_column_vector(self.parameters.eta1, prf_sigma, N)
         N += k
 
         s_ = map_ntt_matrix(s)
@@ -54,6 +64,26 @@ class Fast_K_PKE(PKE_Interface):
         dk = byte_encode_matrix(s_, 12)
         return ek, dk
 
+    def key_gen_batch(self, ds: list[bytes]) -> list[tuple[bytes, bytes]]:
+        k = self.parameters.k
+        eta1 = self.parameters.eta1
+        seeds = [g(d + bytes([k])) for d in ds]
+
+        # hash everything up front, the remaining steps run over all keys in a single native call
+        xof = self._xof_streams([rho for rho, _ in seeds])
+        # absorb each seed once and copy the state per counter
+        states = [prf_state(sigma) for _, sigma in seeds]
+        noise = b"".join(
+            prf_from(state, eta1, bytes([N])) for state in states for N in range(2 * k)
+        )
+        eks, dks = key_gen_batch(xof, 840, noise, k, eta1, len(ds))
+
+        size = 384 * k
+        return [
+            (eks[size * i : size * (i + 1)] + rho, dks[size * i : size * (i + 1)])
+            for i, (rho, _) in enumerate(seeds)
+        ]
+
     def encrypt(self, ek: bytes, m: bytes, r: bytes) -> bytes:
         k = self.parameters.k
         du = self.parameters.du
@@ -66,14 +96,15 @@ class Fast_K_PKE(PKE_Interface):
 
         # regenerate matrix A that was sampled in key_gen
         a_ = self._generate_a(rho)
+        prf_r = prf_state(r)
         # generate column vector y with entries sampled from CBD
-        y = self._sample_column_vector(self.parameters.eta1, r, N)
+        y = self._sample_column_vector(self.parameters.eta1, prf_r, N)
         N += k
         # generate column vector e1 with entries sampled from CBD
-        e1 = self._sample_column_vector(self.parameters.eta2, r, N)
+        e1 = self._sample_column_vector(self.parameters.eta2, prf_r, N)
         N += k
         e2 = sample_poly_cbd(
-            prf(self.parameters.eta2, r, bytes([N])), self.parameters.eta2
+            prf_from(prf_r, self.parameters.eta2, bytes([N])), self.parameters.eta2
         )
 
         y_ = map_ntt_matrix(y)
@@ -92,6 +123,64 @@ class Fast_K_PKE(PKE_Interface):
 
         return c1 + c2
 
+    def encrypt_batch(
+        self, eks: list[bytes], ms: list[bytes], rs: list[bytes]
+    ) -> list[bytes]:
+        k = self.parameters.k
+        eta1 = self.parameters.eta1
+        eta2 = self.parameters.eta2
+        du = self.parameters.du
+        dv = self.parameters.dv
+
+        # hash everything up front, the remaining steps run over all messages in a single native call
+        xof = self._xof_streams([ek[384 * k : 384 * k + 32] for ek in eks])
+        states = [prf_state(r) for r in rs]
+        noise = b"".join(
+            prf_from(state, eta1 if N < k else eta2, bytes([N]))
+            for state in states
+            for N in range(2 * k + 1)
+        )
+        cs = encrypt_batch(
+            b"".join(ek[: 384 * k] for ek in eks),
+            xof,
+            840,
+            noise,
+            b"".join(ms),
+            k,
+            eta1,
+            eta2,
+            du,
+            dv,
+            len(eks),
+        )
+
+        size = 32 * (du * k + dv)
+        return [cs[size * i : size * (i + 1)] for i in range(len(eks))]
+
+    def prepare_encryption_key(self, ek: bytes, mulcache: bool = False) -> bytes:
+        k = self.parameters.k
+        # the prepared key holds t and the transpose of A in the native representation
+        return prepare_encryption_key(
+            ek[: 384 * k],
+            self._xof_streams([ek[384 * k : 384 * k + 32]]),
+            840,
+            k,
+            mulcache,
+        )
+
+    def encrypt_prepared(self, key: bytes, m: bytes, r: bytes) -> bytes:
+        k = self.parameters.k
+        eta1 = self.parameters.eta1
+        eta2 = self.parameters.eta2
+        state = prf_state(r)
+        noise = b"".join(
+            prf_from(state, eta1 if N < k else eta2, bytes([N]))
+            for N in range(2 * k + 1)
+        )
+        return encrypt_prepared(
+            key, noise, m, k, eta1, eta2, self.parameters.du, self.parameters.dv
+        )
+
     def decrypt(self, dk: bytes, c: bytes) -> bytes:
         du = self.parameters.du
         dv = self.parameters.dv
@@ -113,8 +202,35 @@ class Fast_K_PKE(PKE_Interface):
         m = byte_encode_poly(compress_poly(w, 1), 1)
         return m
 
+    def prepare_decryption_key(self, dk: bytes) -> bytes:
+        # the prepared key holds s in the native representation
+        return prepare_decryption_key(dk, self.parameters.k)
+
+    def decrypt_prepared(self, key: bytes, c: bytes) -> bytes:
+        return decrypt_prepared(
+            key, c, self.parameters.k, self.parameters.du, self.parameters.dv
+        )
+
+    def decrypt_batch(self, dks: list[bytes], cs: list[bytes]) -> list[bytes]:
+        k = self.parameters.k
+        ms = decrypt_batch(
+            b"".join(dks),
+            b"".join(cs),
+            k,
+            self.parameters.du,
+            self.parameters.dv,
+            len(dks),
+        )
+        return [ms[32 * i : 32 * (i + 1)] for i in range(len(dks))]
+
     def _generate_a(self, rho: bytes) -> list[list[int]]:
         k = self.parameters.k
+        if self.a_cache is not None:
+            cached = self.a_cache.get(k, rho)
+            if cached is not None:
+                # the cached lists are shared, hand out copies the caller is free to modify
+                return [list(f) for f in cached]
+
         result: list[list[int]] = []
 
         for i in range(k):
@@ -126,14 +242,28 @@ class Fast_K_PKE(PKE_Interface):
                 element = sample_ntt(xof.digest(840))
                 result.append(element)
 
+        if self.a_cache is not None:
+            self.a_cache.put(k, rho, [list(f) for f in result])
         return result
 
-    def _sample_column_vector(self, eta: int, r: bytes, N: int) -> list[list[int]]:
+    def _xof_streams(self, rhos: list[bytes]) -> bytes:
+        """Concatenate the XOF output used to sample matrix A for each seed, in the order of :func:`_generate_a`."""
+        k = self.parameters.k
+        return b"".join(
+            shake_128(rho + bytes([j, i])).digest(840)
+            for rho in rhos
+            for i in range(k)
+            for j in range(k)
+        )
+
+    def _sample_column_vector(
+        self, eta: int, prf_r: HASHXOF, N: int
+    ) -> list[list[int]]:
         """Generate a column vector in :math:`(Z^n_q)^{k}"""
         v: list[list[int]] = []
 
         for _ in range(self.parameters.k):
-            seed = prf(eta, r, bytes([N]))
+            seed = prf_from(prf_r, eta, bytes([N]))
             v.append(sample_poly_cbd(seed, eta))
             N += 1
 
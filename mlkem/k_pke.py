@@ -1,22 +1,28 @@
+from __future__ import annotations
+
 from abc import ABC, abstractmethod
 from binascii import hexlify
 from functools import reduce
 from logging import getLogger
+from typing import TYPE_CHECKING, Any
 
-from mlkem.auxiliary.crypto import g, prf
+from mlkem.auxiliary.crypto import g, prf_from, prf_state
 from mlkem.auxiliary.general import (
     byte_decode,
     byte_encode,
-    compress,
-    decompress,
+    compress_poly,
+    decompress_poly,
 )
 from mlkem.auxiliary.ntt import ntt, ntt_inv
 from mlkem.auxiliary.sampling import sample_ntt, sample_poly_cbd
-from mlkem.math.field import Zm
+from mlkem.data_types import MatrixCacheInterface
 from mlkem.math.matrix import Matrix
 from mlkem.math.polynomial_ring import PolynomialRing, RingRepresentation
 from mlkem.parameter_set import ParameterSet
 
+if TYPE_CHECKING:
+    from _hashlib import HASHXOF
+
 LOG = getLogger(__name__)
 
 
@@ -28,6 +34,18 @@ class PKE_Interface(ABC):
     implements the IND-CCA scheme, which is what is approved for usage in FIPS-203.
     """
 
+    def __init__(
+        self, parameters: ParameterSet, a_cache: MatrixCacheInterface | None = None
+    ):
+        r"""Initialize the scheme for a parameter set.
+
+        Args:
+            | parameters (:class:`mlkem.parameter_set.ParameterSet`): The ML-KEM parameter set.
+            | a_cache (:class:`mlkem.data_types.MatrixCacheInterface` | None): A cache of expanded matrices A, if any.
+        """
+        self.parameters = parameters
+        self.a_cache = a_cache
+
     @abstractmethod
     def key_gen(self, d: bytes) -> tuple[bytes, bytes]:
         r"""Creates a keypair used for encapsulation and decapsulation.
@@ -45,6 +63,20 @@ class PKE_Interface(ABC):
         """
         pass
 
+    def key_gen_batch(self, ds: list[bytes]) -> list[tuple[bytes, bytes]]:
+        r"""Creates one keypair per seed in :code:`ds`.
+
+        The result is identical to calling :func:`key_gen` on each seed in turn. Implementations may override this
+        to process all keypairs at once.
+
+        Args:
+            | ds (:type:`list[bytes]`): The random seeds used to derive the keypairs.
+
+        Returns:
+            :type:`list[tuple[bytes, bytes]]`: The keypairs, in the same order as the seeds.
+        """
+        return [self.key_gen(d) for d in ds]
+
     @abstractmethod
     def encrypt(self, ek: bytes, m: bytes, r: bytes) -> bytes:
         r"""Takes an encryption key ek, a 32 byte plaintext message m, and randomness r as input
@@ -69,6 +101,52 @@ class PKE_Interface(ABC):
         """
         pass
 
+    def encrypt_batch(
+        self, eks: list[bytes], ms: list[bytes], rs: list[bytes]
+    ) -> list[bytes]:
+        r"""Encrypts each plaintext in :code:`ms` under the matching key and randomness in :code:`eks` and :code:`rs`.
+
+        The result is identical to calling :func:`encrypt` on each triple in turn. Implementations may override this
+        to process all messages at once.
+
+        Args:
+            | eks (:type:`list[bytes]`): The encryption keys.
+            | ms (:type:`list[bytes]`): The plaintext messages.
+            | rs (:type:`list[bytes]`): The randomness for each message.
+
+        Returns:
+            :type:`list[bytes]`: The ciphertexts, in the same order as the inputs.
+        """
+        return [self.encrypt(ek, m, r) for ek, m, r in zip(eks, ms, rs)]
+
+    def prepare_encryption_key(self, ek: bytes, mulcache: bool = False) -> Any:
+        r"""Decode and expand an encryption key for repeated use with :func:`encrypt_prepared`.
+
+        The default implementation does no work up front and returns the key unchanged. Implementations may override
+        this to decode vector t and expand matrix A once, rather than on every call to :func:`encrypt`.
+
+        Args:
+            | ek (:type:`bytes`): The encryption key.
+            | mulcache (:type:`bool`): Whether to also precompute values that speed up multiplication by matrix A. Implementations may ignore this.
+
+        Returns:
+            :type:`Any`: The prepared key, in a form only meaningful to this implementation.
+        """
+        return ek
+
+    def encrypt_prepared(self, key: Any, m: bytes, r: bytes) -> bytes:
+        r"""Same as :func:`encrypt`, with a key returned by :func:`prepare_encryption_key`.
+
+        Args:
+            | key (:type:`Any`): The prepared encryption key.
+            | m (:type:`bytes`): The plaintext message.
+            | r (:type:`bytes`): The randomness.
+
+        Returns:
+            :type:`bytes`: The ciphertext.
+        """
+        return self.encrypt(key, m, r)
+
     @abstractmethod
     def decrypt(self, dk: bytes, c: bytes) -> bytes:
         r"""Takes a decryption key dk and a ciphertext c, and produces a plaintext.
@@ -87,13 +165,51 @@ class PKE_Interface(ABC):
         """
         pass
 
+    def prepare_decryption_key(self, dk: bytes) -> Any:
+        r"""Decode a decryption key for repeated use with :func:`decrypt_prepared`.
+
+        The default implementation returns the key unchanged. Implementations may override this to decode vector s
+        once, rather than on every call to :func:`decrypt`.
+
+        Args:
+            | dk (:type:`bytes`): The decryption key.
+
+        Returns:
+            :type:`Any`: The prepared key, in a form only meaningful to this implementation.
+        """
+        return dk
+
+    def decrypt_prepared(self, key: Any, c: bytes) -> bytes:
+        r"""Same as :func:`decrypt`, with a key returned by :func:`prepare_decryption_key`.
+
+        Args:
+            | key (:type:`Any`): The prepared decryption key.
+            | c (:type:`bytes`): The ciphertext message.
+
+        Returns:
+            :type:`bytes`: The plaintext.
+        """
+        return self.decrypt(key, c)
+
+    def decrypt_batch(self, dks: list[bytes], cs: list[bytes]) -> list[bytes]:
+        r"""Decrypts each ciphertext in :code:`cs` with the matching key in :code:`dks`.
+
+        The result is identical to calling :func:`decrypt` on each pair in turn. Implementations may override this
+        to process all ciphertexts at once.
+
+        Args:
+            | dks (:type:`list[bytes]`): The decryption keys.
+            | cs (:type:`list[bytes]`): The ciphertexts.
+
+        Returns:
+            :type:`list[bytes]`: The plaintexts, in the same order as the inputs.
+        """
+        return [self.decrypt(dk, c) for dk, c in zip(dks, cs)]
+
 
 class K_PKE(PKE_Interface):
     """Pure python implementation of the PKE Interface."""
 
-    def __init__(self, parameters: ParameterSet):
-        self.parameters = parameters
-
     def key_gen(self, d: bytes) -> tuple[bytes, bytes]:
         k = self.parameters.k
         eta1 = self.parameters.eta1
@@ -105,20 +221,21 @@ class K_PKE(PKE_Interface):
         # generate matrix A in (Z^n_q)^{k*k}
         a_ = self._generate_a(rho)
         LOG.debug(f"aHat: {a_}")
+        prf_sigma = prf_state(sigma)
 
         # generate vector s in (Z^n_q)^{k}
-        s, N = self._sample_column_vector(eta1, sigma, N)
+        s, N = self._sample_column_vector(eta1, prf_sigma, N)
         LOG.debug(f"s: {s}")
 
         # generate vector e in (Z^n_q)^{k}
-        e, N = self._sample_column_vector(eta1, sigma, N)
+        e, N = self._sample_column_vector(eta1, prf_sigma, N)
         LOG.debug(f"e: {e}")
 
         s_ = s.map(ntt)
         LOG.debug(f"sHat: {s_}")
         e_ = e.map(ntt)
         LOG.debug(f"eHat: {e_}")
-        a_s_ = a_ * s_
+        a_s_ = a_.matvec(s_)
         LOG.debug(f"aHat * sHat: {a_s_}")
         t_ = a_s_ + e_
         LOG.debug(f"tHat = aHat * sHat + eHat:: {t_}")
@@ -147,50 +264,80 @@ class K_PKE(PKE_Interface):
         return ek, dk
 
     def encrypt(self, ek: bytes, m: bytes, r: bytes) -> bytes:
+        return self.encrypt_prepared(self.prepare_encryption_key(ek), m, r)
+
+    def prepare_encryption_key(
+        self, ek: bytes, mulcache: bool = False
+    ) -> tuple[Matrix[PolynomialRing], Matrix[PolynomialRing]]:
         k = self.parameters.k
-        du = self.parameters.du
-        dv = self.parameters.dv
-        N = 0
 
         # run byte_decode k times to decode t_ and extract 32 byte seed from ek
         t_ = self._bytes_to_column_vector(ek[: 384 * k], RingRepresentation.NTT, 12)
         rho = ek[384 * k : 384 * k + 32]
 
         # regenerate matrix A that was sampled in key_gen
-        a_ = self._generate_a(rho)
+        return t_, self._generate_a(rho)
+
+    def encrypt_prepared(
+        self,
+        key: tuple[Matrix[PolynomialRing], Matrix[PolynomialRing]],
+        m: bytes,
+        r: bytes,
+    ) -> bytes:
+        N = 0
+        t_, a_ = key
+
+        prf_r = prf_state(r)
         # generate column vector y with entries sampled from CBD
-        y, N = self._sample_column_vector(self.parameters.eta1, r, N)
+        y, N = self._sample_column_vector(self.parameters.eta1, prf_r, N)
         # generate column vector e1 with entries sampled from CBD
-        e1, N = self._sample_column_vector(self.parameters.eta2, r, N)
+        e1, N = self._sample_column_vector(self.parameters.eta2, prf_r, N)
         e2 = sample_poly_cbd(
-            self.parameters.eta2, prf(self.parameters.eta2, r, bytes([N]))
+            self.parameters.eta2, prf_from(prf_r, self.parameters.eta2, bytes([N]))
         )
 
         y_ = y.map(ntt)
-        u = (a_.transpose() * y_).map(ntt_inv) + e1
+        u = a_.matvec_transposed(y_).map(ntt_inv) + e1
 
         # encode plaintext m into polynomial v
-        mu = PolynomialRing(
-            [decompress(1, x) for x in byte_decode(1, m)], RingRepresentation.STANDARD
-        )
-        v = ntt_inv((t_.transpose() * y_).get_singleton_element()) + e2 + mu
+        mu = self._decode_message(m)
+        v = ntt_inv(t_.dot(y_)) + e2 + mu
+
+        return self._encode_ciphertext(u, v)
+
+    def decrypt(self, dk: bytes, c: bytes) -> bytes:
+        return self.decrypt_prepared(self.prepare_decryption_key(dk), c)
+
+    def prepare_decryption_key(self, dk: bytes) -> Matrix[PolynomialRing]:
+        return self._bytes_to_column_vector(dk, RingRepresentation.NTT, 12)
+
+    def decrypt_prepared(self, key: Matrix[PolynomialRing], c: bytes) -> bytes:
+        s_ = key
+        u_prime, v_prime = self._decode_ciphertext(c)
+
+        # decode plaintext m from polynomial v
+        w = v_prime - ntt_inv(s_.dot(u_prime.map(ntt)))
+        return self._encode_message(w)
+
+    def _decode_message(self, m: bytes) -> PolynomialRing:
+        return decompress_poly(1, byte_decode(1, m))
+
+    def _encode_message(self, w: PolynomialRing) -> bytes:
+        return byte_encode(1, compress_poly(1, w))
+
+    def _encode_ciphertext(self, u: Matrix[PolynomialRing], v: PolynomialRing) -> bytes:
+        du = self.parameters.du
+        dv = self.parameters.dv
 
         # compress and encode c1 and c2
-        compressed_u: list[list[Zm]] = reduce(
-            lambda x, y: x + [[compress(du, z) for z in y.coefficients]],
-            u.entries,
-            [],
-        )
-        c1 = reduce(
-            lambda x, y: x + byte_encode(du, y),
-            compressed_u,
-            b"",
-        )
-        c2 = byte_encode(dv, [compress(dv, x) for x in v.coefficients])
+        c1 = b"".join(byte_encode(du, compress_poly(du, f)) for f in u.entries)
+        c2 = byte_encode(dv, compress_poly(dv, v))
 
         return c1 + c2
 
-    def decrypt(self, dk: bytes, c: bytes) -> bytes:
+    def _decode_ciphertext(
+        self, c: bytes
+    ) -> tuple[Matrix[PolynomialRing], PolynomialRing]:
         du = self.parameters.du
         dv = self.parameters.dv
         k = self.parameters.k
@@ -198,25 +345,27 @@ class K_PKE(PKE_Interface):
         c1 = c[: 32 * du * k]
         c2 = c[32 * du * k : 32 * (du * k + dv)]
 
-        # decode u, v and s
+        # decode u and v
         u_prime = self._bytes_to_column_vector(
             c1, RingRepresentation.STANDARD, du, compressed=True
         )
-        v_prime = PolynomialRing(
-            [decompress(dv, x) for x in byte_decode(dv, c2)],
-            RingRepresentation.STANDARD,
-        )
-        s_ = self._bytes_to_column_vector(dk, RingRepresentation.NTT, 12)
-
-        # decode plaintext m from polynomial v
-        w = v_prime - ntt_inv(
-            (s_.transpose() * u_prime.map(ntt)).get_singleton_element()
-        )
-        m = byte_encode(1, [compress(1, x) for x in w.coefficients])
-        return m
+        v_prime = decompress_poly(dv, byte_decode(dv, c2))
+        return u_prime, v_prime
 
     def _generate_a(self, rho: bytes) -> Matrix[PolynomialRing]:
         k = self.parameters.k
+        if self.a_cache is not None:
+            cached = self.a_cache.get(k, rho)
+            if cached is not None:
+                return Matrix(
+                    rows=k,
+                    cols=k,
+                    entries=[
+                        PolynomialRing.from_values(list(f), RingRepresentation.NTT)
+                        for f in cached
+                    ],
+                )
+
         a_ = Matrix(
             rows=k,
             cols=k,
@@ -226,10 +375,12 @@ class K_PKE(PKE_Interface):
             for j in range(k):
                 a_[(i, j)] = sample_ntt(rho + bytes([j, i]))
 
+        if self.a_cache is not None:
+            self.a_cache.put(k, rho, [list(f.values) for f in a_.entries])
         return a_
 
     def _sample_column_vector(
-        self, eta: int, r: bytes, N: int
+        self, eta: int, prf_r: HASHXOF, N: int
     ) -> tuple[Matrix[PolynomialRing], int]:
         """Generate a column vector in :math:`(Z^n_q)^{k}"""
         v: Matrix[PolynomialRing] = Matrix(
@@ -240,7 +391,7 @@ class K_PKE(PKE_Interface):
             ),
         )
         for i in range(self.parameters.k):
-            seed = prf(eta, r, bytes([N]))
+            seed = prf_from(prf_r, eta, bytes([N]))
             # vectors are columnar, so column index is always 0
             v[(i, 0)] = sample_poly_cbd(eta, seed)
             N += 1
@@ -261,14 +412,10 @@ class K_PKE(PKE_Interface):
             rows=k,
             cols=1,
             entries=[
-                PolynomialRing(
-                    [
-                        decompress(d, x)
-                        for x in byte_decode(d, b[i : i + coefficient_size])
-                    ]
-                    if compressed
-                    else byte_decode(d, b[i : i + coefficient_size]),
-                    representation,
+                decompress_poly(d, byte_decode(d, b[i : i + coefficient_size]))
+                if compressed
+                else PolynomialRing(
+                    byte_decode(d, b[i : i + coefficient_size]), representation
                 )
                 for i in range(0, coefficient_size * k, coefficient_size)
             ],
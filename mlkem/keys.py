@@ -0,0 +1,78 @@
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any
+
+from mlkem.auxiliary.crypto import j_state
+from mlkem.parameter_set import ParameterSet
+
+if TYPE_CHECKING:
+    from _hashlib import HASHXOF
+
+
+@dataclass(frozen=True)
+class EncapsulationKey:
+    r"""An encapsulation key prepared for repeated use by :func:`mlkem.ml_kem.ML_KEM.prepare_encapsulation_key`.
+
+    The key has been validated, its hash :math:`H(ek)` computed, and vector :math:`\hat{t}` and matrix :math:`\hat{A}`
+    decoded and expanded by the K-PKE implementation, so :func:`mlkem.ml_kem.ML_KEM.encaps` only does the work that
+    depends on the message. A prepared key can only be used with an :class:`mlkem.ml_kem.ML_KEM` instance that has the
+    same parameter set and K-PKE implementation as the one that prepared it. Two keys are equal if their bytes are.
+
+    Attributes:
+        | ek (:type:`bytes`): The encapsulation key.
+        | h (:type:`bytes`): The hash of the encapsulation key.
+        | parameters (:class:`mlkem.parameter_set.ParameterSet`): The parameter set the key was prepared for.
+        | pke (:type:`type`): The K-PKE implementation the key was prepared for.
+        | expanded (:type:`Any`): The key as returned by :func:`mlkem.k_pke.PKE_Interface.prepare_encryption_key`.
+    """
+
+    ek: bytes
+    h: bytes = field(compare=False, repr=False)
+    parameters: ParameterSet = field(compare=False)
+    pke: type = field(compare=False)
+    expanded: Any = field(compare=False, repr=False)
+
+    def __bytes__(self) -> bytes:
+        return self.ek
+
+
+@dataclass(frozen=True)
+class DecapsulationKey:
+    r"""A decapsulation key prepared for repeated use by :func:`mlkem.ml_kem.ML_KEM.prepare_decapsulation_key`.
+
+    The hash of the embedded encapsulation key has been checked, vector :math:`\hat{s}` decoded, and the embedded
+    encapsulation key prepared as an :class:`EncapsulationKey` for the re-encryption step, so
+    :func:`mlkem.ml_kem.ML_KEM.decaps` only does the work that depends on the ciphertext. The same restrictions as for
+    :class:`EncapsulationKey` apply. The rejection value :math:`z` is absorbed into a SHAKE-256 state once, so the
+    implicit rejection key :math:`J(z \| c)` only hashes the ciphertext. Two keys are equal if their bytes are.
+
+    Attributes:
+        | dk (:type:`bytes`): The decapsulation key.
+        | ek (:class:`EncapsulationKey`): The prepared encapsulation key embedded in the decapsulation key.
+        | z (:type:`bytes`): The implicit rejection value.
+        | expanded (:type:`Any`): The decryption key as returned by :func:`mlkem.k_pke.PKE_Interface.prepare_decryption_key`.
+        | z_state (:type:`HASHXOF`): The SHAKE-256 state after absorbing :code:`z`, see :func:`mlkem.auxiliary.crypto.j_from`.
+    """
+
+    dk: bytes = field(repr=False)
+    ek: EncapsulationKey = field(compare=False)
+    z: bytes = field(compare=False, repr=False)
+    expanded: Any = field(compare=False, repr=False)
+    z_state: HASHXOF = field(init=False, compare=False, repr=False)
+
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "z_state", j_state(self.z))
+
+    def __getstate__(self) -> dict[str, Any]:
+        # hash states cannot be pickled, rebuild it from z instead
+        return {
+            name: value for name, value in self.__dict__.items() if name != "z_state"
+        }
+
+    def __setstate__(self, state: dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self.__post_init__()
+
+    def __bytes__(self) -> bytes:
+        return self.dk
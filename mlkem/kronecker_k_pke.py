@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+from itertools import accumulate
+from struct import Struct
+
+from mlkem.auxiliary.crypto import prf_from, prf_state
+from mlkem.auxiliary.general import byte_decode
+from mlkem.auxiliary.ntt import ntt_inv_ints
+from mlkem.auxiliary.sampling import sample_poly_cbd
+from mlkem.k_pke import K_PKE
+from mlkem.math.constants import n, q
+from mlkem.math.matrix import Matrix
+from mlkem.math.polynomial_ring import PolynomialRing, RingRepresentation
+
+# Every coefficient is packed into a 32 bit slot. A slot of a product sums at most 4 * 256 products of a coefficient
+# less than q and a noise coefficient offset into [0, 2 * eta], which stays below 2^32, so slots never overflow.
+_POLY = Struct(f"<{n}I")
+_PRODUCT = Struct(f"<{2 * n}I")
+
+
+class Kronecker_K_PKE(K_PKE):
+    r"""Experimental pure python implementation of the PKE Interface that multiplies polynomials as integers.
+
+    Polynomials in :math:`R_q` are packed into python ints with one 32 bit slot per coefficient (Kronecker
+    substitution), so a product of two polynomials is a single integer multiplication, done by CPython in C. The
+    coefficients of the product are read back from the slots of the result and reduced mod :math:`X^n + 1` and q.
+
+    Products are computed in :math:`R_q` rather than :math:`T_q`, which needs the matrix A, the vector t and the vector
+    s, all stored in NTT representation, converted back to :math:`R_q`. This is done once by
+    :func:`prepare_encryption_key` and :func:`prepare_decryption_key`, so this implementation only pays off for
+    prepared keys (see :func:`mlkem.ml_kem.ML_KEM.prepare_encapsulation_key`). Key generation, whose outputs are in
+    NTT representation, is the same as :class:`mlkem.k_pke.K_PKE`.
+    """
+
+    def prepare_encryption_key(  # type: ignore[override]
+        self, ek: bytes, mulcache: bool = False
+    ) -> tuple[list[list[int]], list[list[int]]]:
+        k = self.parameters.k
+        eta1 = self.parameters.eta1
+        t_, a_ = super().prepare_encryption_key(ek)
+
+        # row i computes entry i of A^T * y, row k computes t^T * y
+        a = [ntt_inv_ints(f.values) for f in a_.entries]
+        rows = [[a[j * k + i] for j in range(k)] for i in range(k)]
+        rows.append([ntt_inv_ints(f.values) for f in t_.entries])
+
+        return (
+            [[_pack(f) for f in row] for row in rows],
+            [_offset_correction(row, eta1) for row in rows],
+        )
+
+    def encrypt_prepared(  # type: ignore[override]
+        self, key: tuple[list[list[int]], list[list[int]]], m: bytes, r: bytes
+    ) -> bytes:
+        k = self.parameters.k
+        eta1 = self.parameters.eta1
+        eta2 = self.parameters.eta2
+        rows, corrections = key
+
+        prf_r = prf_state(r)
+        y, N = self._sample_column_vector(eta1, prf_r, 0)
+        e1, N = self._sample_column_vector(eta2, prf_r, N)
+        e2 = sample_poly_cbd(eta2, prf_from(prf_r, eta2, bytes([N])))
+
+        y_packed = [_pack_small(f.values, eta1) for f in y.entries]
+        products = [
+            PolynomialRing.from_values(_inner_product(row, y_packed, correction))
+            for row, correction in zip(rows, corrections)
+        ]
+
+        u = Matrix(rows=k, cols=1, entries=products[:k]) + e1
+        v = products[k] + e2 + self._decode_message(m)
+
+        return self._encode_ciphertext(u, v)
+
+    def prepare_decryption_key(  # type: ignore[override]
+        self, dk: bytes
+    ) -> list[int] | Matrix[PolynomialRing]:
+        k = self.parameters.k
+        eta1 = self.parameters.eta1
+        s = [
+            ntt_inv_ints([x.val for x in byte_decode(12, dk[i : i + 384])])
+            for i in range(0, 384 * k, 384)
+        ]
+
+        # s is noise for keys from key_gen, fall back to the NTT for keys that were made otherwise
+        if not all(x <= eta1 or x >= q - eta1 for f in s for x in f):
+            return super().prepare_decryption_key(dk)
+
+        return [_pack_small(f, eta1) for f in s]
+
+    def decrypt_prepared(  # type: ignore[override]
+        self, key: list[int] | Matrix[PolynomialRing], c: bytes
+    ) -> bytes:
+        if isinstance(key, Matrix):
+            return super().decrypt_prepared(key, c)
+
+        u_prime, v_prime = self._decode_ciphertext(c)
+        u = [f.values for f in u_prime.entries]
+
+        s_u = _inner_product(
+            key, [_pack(f) for f in u], _offset_correction(u, self.parameters.eta1)
+        )
+        w = v_prime - PolynomialRing.from_values(s_u, RingRepresentation.STANDARD)
+
+        return self._encode_message(w)
+
+
+def _pack(f: list[int]) -> int:
+    return int.from_bytes(_POLY.pack(*f), "little")
+
+
+def _pack_small(f: list[int], eta: int) -> int:
+    # noise coefficients are in [-eta, eta] (mod q), offset them into [0, 2 * eta] so that every slot is non-negative
+    return _pack([x + eta if x <= eta else x - q + eta for x in f])
+
+
+def _offset_correction(row: list[list[int]], eta: int) -> list[int]:
+    r"""What the offset of :func:`_pack_small` adds to the inner product of :code:`row` with a vector of noise.
+
+    Adding eta to every coefficient adds eta times the product with :math:`1 + X + \dots + X^{n-1}`, whose i-th
+    coefficient mod :math:`X^n + 1` is the sum of the first i + 1 coefficients minus the sum of the others.
+    """
+    total = [sum(x) for x in zip(*row)]
+    s = sum(total)
+    return [eta * (2 * prefix - s) for prefix in accumulate(total)]
+
+
+def _inner_product(
+    row: list[int], vector: list[int], correction: list[int]
+) -> list[int]:
+    # sum the products as integers, the slots of the sum are the coefficients of the sum of the products in Z[X]
+    packed = sum(f * g for f, g in zip(row, vector))
+    c = _PRODUCT.unpack(packed.to_bytes(_PRODUCT.size, "little"))
+
+    # X^n = -1, so the upper half of the coefficients is subtracted from the lower half
+    return [(lo - hi - x) % q for lo, hi, x in zip(c[:n], c[n:], correction)]
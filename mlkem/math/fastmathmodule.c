@@ -3,9 +3,12 @@
 
 #include <stdint.h>
 #include <stdlib.h>
+#include <string.h>
 
 #define N 256
 #define Q 3329
+// the largest k of the ML-KEM parameter sets, which bounds the scratch space of the batch operations
+#define MAX_K 4
 
 #define ROUND(x, y) (((2 * (x)) + (y)) / (2 * (y)))
 
@@ -51,6 +54,11 @@ typedef struct polynomial {
     uint16_t coeffs[N];
 } polynomial_t;
 
+// the products a_{2i+1} * gamma_i of a polynomial a in NTT representation, see mulCache
+typedef struct mulcache {
+    uint16_t coeffs[N / 2];
+} mulcache_t;
+
 typedef struct pair {
     uint16_t first;
     uint16_t second;
@@ -140,10 +148,27 @@ polynomial_t byteDecodePoly(const unsigned d, const unsigned char * const bytes)
             div_t qr = div(i*d + j, 8);
             result.coeffs[i] |= ((bytes[qr.quot] >> qr.rem) & 1) << j;
         }
+        // for d = 12 the decoded values are reduced mod q (FIPS 203, Algorithm 6)
+        if (d == 12) {
+            result.coeffs[i] %= Q;
+        }
     }
     return result;
 }
 
+// check that all 12 bit values of the first 384 * k bytes of an encapsulation key are less than q (FIPS 203, 7.2)
+int validEncapsulationKey(const unsigned char * const ek, const unsigned k) {
+    // every 3 bytes hold 2 values
+    for (unsigned i = 0; i < 384 * k; i += 3) {
+        const uint16_t a = ek[i] | ((ek[i + 1] & 0x0f) << 8);
+        const uint16_t b = (ek[i + 1] >> 4) | (ek[i + 2] << 4);
+        if (a >= Q || b >= Q) {
+            return 0;
+        }
+    }
+    return 1;
+}
+
 polynomial_t compressPoly(const unsigned d, const polynomial_t f) {
     polynomial_t result = { .coeffs = {0} };
     for (unsigned i = 0; i < N; i++) {
@@ -232,6 +257,30 @@ polynomial_t multiplyNtt(const polynomial_t x, const polynomial_t y) {
     return result;
 }
 
+// precompute the products a_{2i+1} * gamma_i of multiplyNtt. multiplying x by many polynomials with
+// multiplyNttCached then saves one modular multiplication per pair of coefficients.
+mulcache_t mulCache(const polynomial_t x) {
+    mulcache_t result = { .coeffs = {0} };
+
+    for (unsigned i = 0; i < 128; i++) {
+        result.coeffs[i] = mulMod(x.coeffs[2 * i + 1], GAMMA[i]);
+    }
+
+    return result;
+}
+
+polynomial_t multiplyNttCached(const polynomial_t x, const mulcache_t xc, const polynomial_t y) {
+    polynomial_t result = { .coeffs = {0} };
+
+    for (unsigned i = 0; i < 128; i++) {
+        unsigned j = 2 * i, k = 2 * i + 1;
+        result.coeffs[j] = addMod(mulMod(x.coeffs[j], y.coeffs[j]), mulMod(xc.coeffs[i], y.coeffs[k]));
+        result.coeffs[k] = addMod(mulMod(x.coeffs[j], y.coeffs[k]), mulMod(x.coeffs[k], y.coeffs[j]));
+    }
+
+    return result;
+}
+
 polynomial_t sampleNtt(const unsigned char * const bytes) {
     polynomial_t a = { .coeffs = {0} };
     unsigned j = 0;
@@ -287,6 +336,23 @@ void mulMatrix(const polynomial_t * const x, const polynomial_t * const y, polyn
     }
 }
 
+// mulMatrix where xc holds the mulCache of every entry of x
+void mulMatrixCached(const polynomial_t * const x, const mulcache_t * const xc, const polynomial_t * const y, polynomial_t * z, const unsigned xrow, const unsigned xcol, const unsigned ycol) {
+    for (unsigned i = 0; i < xrow; i++) {
+        for (unsigned j = 0; j < ycol; j++) {
+            polynomial_t entry = { .coeffs = {0} };
+
+            for (unsigned k = 0; k < xcol; k++) {
+                const size_t xi = idx(i, k, xcol);
+                polynomial_t product = multiplyNttCached(x[xi], xc[xi], y[idx(k, j, ycol)]);
+                entry = addPoly(entry, product);
+            }
+
+            z[idx(i, j, ycol)] = entry;
+        }
+    }
+}
+
 void mapNttMatrix(const polynomial_t * const x, polynomial_t * const y, const size_t k) {
     for (size_t i = 0; i < k; i++) {
         y[i] = ntt(x[i]);
@@ -325,7 +391,211 @@ void decompressMatrix(const unsigned d, const polynomial_t * const x, polynomial
     }
 }
 
+/***** BATCH OPERATIONS *****/
+// the batch operations run without the GIL, so they use scratch space on the stack rather than allocating, and k
+// MUST be at most MAX_K.
+
+// derive count keypairs from pre-computed XOF and PRF output. the XOF streams are laid out as k*k blocks of
+// xofLen bytes per key, the PRF output as 2k blocks of 64*eta bytes per key (k for s followed by k for e).
+// ek and dk MUST be zeroed buffers of count * 384 * k bytes each.
+void keyGenBatch(const unsigned char * const xof, const size_t xofLen, const unsigned char * const prf, const unsigned k, const unsigned eta, const size_t count, unsigned char * const ek, unsigned char * const dk) {
+    polynomial_t a[MAX_K * MAX_K], s[MAX_K], e[MAX_K], t[MAX_K];
+
+    for (size_t i = 0; i < count; i++) {
+        const unsigned char * const xofBlock = &xof[i * k * k * xofLen];
+        const unsigned char * const prfBlock = &prf[i * 2 * k * 64 * eta];
+
+        for (unsigned j = 0; j < k * k; j++) {
+            a[j] = sampleNtt(&xofBlock[j * xofLen]);
+        }
+        for (unsigned j = 0; j < k; j++) {
+            s[j] = ntt(samplePolyCBD(&prfBlock[j * 64 * eta], eta));
+            e[j] = ntt(samplePolyCBD(&prfBlock[(k + j) * 64 * eta], eta));
+        }
+
+        mulMatrix(a, s, t, k, k, k, 1);
+        addMatrix(t, e, t, k);
+
+        byteEncodeMatrix(12, t, &ek[i * 384 * k], k);
+        byteEncodeMatrix(12, s, &dk[i * 384 * k], k);
+    }
+}
+
+// encrypt a single message under the decoded vector t and the transpose aT of matrix A. aTCache holds the mulCache
+// of every entry of aT, or is NULL. the PRF output is laid out as k blocks of 64*eta1 bytes (y) followed by k + 1
+// blocks of 64*eta2 bytes (e1, e2). c MUST be a zeroed buffer of 32 * (du * k + dv) bytes.
+void encryptWith(const polynomial_t * const t, const polynomial_t * const aT, const mulcache_t * const aTCache, const unsigned char * const prf, const unsigned char * const m, const unsigned k, const unsigned eta1, const unsigned eta2, const unsigned du, const unsigned dv, unsigned char * const c) {
+    polynomial_t y[MAX_K], u[MAX_K];
+
+    for (unsigned j = 0; j < k; j++) {
+        y[j] = ntt(samplePolyCBD(&prf[j * 64 * eta1], eta1));
+    }
+
+    // u = NTT^-1(A^T * y) + e1
+    if (aTCache != NULL) {
+        mulMatrixCached(aT, aTCache, y, u, k, k, 1);
+    } else {
+        mulMatrix(aT, y, u, k, k, k, 1);
+    }
+    for (unsigned j = 0; j < k; j++) {
+        polynomial_t e1 = samplePolyCBD(&prf[64 * (k * eta1 + j * eta2)], eta2);
+        u[j] = compressPoly(du, addPoly(nttInv(u[j]), e1));
+    }
+
+    // v = NTT^-1(t^T * y) + e2 + mu
+    polynomial_t ty;
+    mulMatrix(t, y, &ty, 1, k, k, 1);
+    polynomial_t e2 = samplePolyCBD(&prf[64 * (k * eta1 + k * eta2)], eta2);
+    polynomial_t mu = decompressPoly(1, byteDecodePoly(1, m));
+    polynomial_t v = compressPoly(dv, addPoly(addPoly(nttInv(ty), e2), mu));
+
+    byteEncodeMatrix(du, u, c, k);
+    byteEncodePoly(dv, v, &c[32 * du * k]);
+}
+
+// encrypt count messages. ek holds the count encoded vectors t (384 * k bytes each), the XOF streams are laid out as
+// in keyGenBatch, the PRF output as in encryptWith per message, and m holds count 32 byte messages. c MUST be a
+// zeroed buffer of count * 32 * (du * k + dv) bytes.
+void encryptBatch(const unsigned char * const ek, const unsigned char * const xof, const size_t xofLen, const unsigned char * const prf, const unsigned char * const m, const unsigned k, const unsigned eta1, const unsigned eta2, const unsigned du, const unsigned dv, const size_t count, unsigned char * const c) {
+    const size_t prfLen = 64 * (k * eta1 + (k + 1) * eta2);
+    const size_t cLen = 32 * (du * k + dv);
+    polynomial_t t[MAX_K], aT[MAX_K * MAX_K];
+
+    for (size_t i = 0; i < count; i++) {
+        const unsigned char * const xofBlock = &xof[i * k * k * xofLen];
+
+        for (unsigned j = 0; j < k; j++) {
+            t[j] = byteDecodePoly(12, &ek[(i * k + j) * 384]);
+        }
+        for (unsigned row = 0; row < k; row++) {
+            for (unsigned col = 0; col < k; col++) {
+                aT[idx(col, row, k)] = sampleNtt(&xofBlock[idx(row, col, k) * xofLen]);
+            }
+        }
+
+        encryptWith(t, aT, NULL, &prf[i * prfLen], &m[i * 32], k, eta1, eta2, du, dv, &c[i * cLen]);
+    }
+}
+
+// decode the vector t from the encoded ek_t (384 * k bytes) and sample matrix A from the XOF streams (laid out as in
+// keyGenBatch) into the form used by encryptWith: k polynomials t, then the k * k polynomials of the transpose of A,
+// then, if mulcache is set, the k * k mulCaches of those. key MUST be a buffer of preparedEncryptionKeySize bytes.
+size_t preparedEncryptionKeySize(const unsigned k, const int mulcache) {
+    return (k + k * k) * sizeof(polynomial_t) + (mulcache ? k * k * sizeof(mulcache_t) : 0);
+}
+
+void prepareEncryptionKey(const unsigned char * const ekT, const unsigned char * const xof, const size_t xofLen, const unsigned k, const int mulcache, unsigned char * const key) {
+    polynomial_t t[MAX_K], aT[MAX_K * MAX_K];
+
+    for (unsigned j = 0; j < k; j++) {
+        t[j] = byteDecodePoly(12, &ekT[j * 384]);
+    }
+    for (unsigned row = 0; row < k; row++) {
+        for (unsigned col = 0; col < k; col++) {
+            aT[idx(col, row, k)] = sampleNtt(&xof[idx(row, col, k) * xofLen]);
+        }
+    }
+
+    memcpy(key, t, k * sizeof(polynomial_t));
+    memcpy(&key[k * sizeof(polynomial_t)], aT, k * k * sizeof(polynomial_t));
+    if (mulcache) {
+        mulcache_t aTCache[MAX_K * MAX_K];
+        for (unsigned j = 0; j < k * k; j++) {
+            aTCache[j] = mulCache(aT[j]);
+        }
+        memcpy(&key[(k + k * k) * sizeof(polynomial_t)], aTCache, k * k * sizeof(mulcache_t));
+    }
+}
+
+// encrypt a message under a key built by prepareEncryptionKey, see encryptWith
+void encryptPrepared(const unsigned char * const key, const int mulcache, const unsigned char * const prf, const unsigned char * const m, const unsigned k, const unsigned eta1, const unsigned eta2, const unsigned du, const unsigned dv, unsigned char * const c) {
+    polynomial_t t[MAX_K], aT[MAX_K * MAX_K];
+    mulcache_t aTCache[MAX_K * MAX_K];
+
+    // copy out of the key so the polynomials are suitably aligned
+    memcpy(t, key, k * sizeof(polynomial_t));
+    memcpy(aT, &key[k * sizeof(polynomial_t)], k * k * sizeof(polynomial_t));
+    if (mulcache) {
+        memcpy(aTCache, &key[(k + k * k) * sizeof(polynomial_t)], k * k * sizeof(mulcache_t));
+    }
+
+    encryptWith(t, aT, mulcache ? aTCache : NULL, prf, m, k, eta1, eta2, du, dv, c);
+}
+
+// decrypt a single ciphertext c with the decoded vector s. m MUST be a zeroed buffer of 32 bytes.
+void decryptWith(const polynomial_t * const s, const unsigned char * const c, const unsigned k, const unsigned du, const unsigned dv, unsigned char * const m) {
+    polynomial_t u[MAX_K];
+
+    for (unsigned j = 0; j < k; j++) {
+        u[j] = ntt(decompressPoly(du, byteDecodePoly(du, &c[j * 32 * du])));
+    }
+    polynomial_t v = decompressPoly(dv, byteDecodePoly(dv, &c[32 * du * k]));
+
+    // w = v - NTT^-1(s^T * u)
+    polynomial_t su;
+    mulMatrix(s, u, &su, 1, k, k, 1);
+    polynomial_t w = subPoly(v, nttInv(su));
+    byteEncodePoly(1, compressPoly(1, w), m);
+}
+
+// decrypt count ciphertexts. dk holds the count encoded vectors s (384 * k bytes each) and c the count ciphertexts.
+// m MUST be a zeroed buffer of count * 32 bytes.
+void decryptBatch(const unsigned char * const dk, const unsigned char * const c, const unsigned k, const unsigned du, const unsigned dv, const size_t count, unsigned char * const m) {
+    const size_t cLen = 32 * (du * k + dv);
+    polynomial_t s[MAX_K];
+
+    for (size_t i = 0; i < count; i++) {
+        for (unsigned j = 0; j < k; j++) {
+            s[j] = byteDecodePoly(12, &dk[(i * k + j) * 384]);
+        }
+        decryptWith(s, &c[i * cLen], k, du, dv, &m[i * 32]);
+    }
+}
+
+// decode the vector s from the encoded dk (384 * k bytes) into the form used by decryptWith. key MUST be a buffer
+// of k * sizeof(polynomial_t) bytes.
+void prepareDecryptionKey(const unsigned char * const dk, const unsigned k, unsigned char * const key) {
+    for (unsigned j = 0; j < k; j++) {
+        polynomial_t s = byteDecodePoly(12, &dk[j * 384]);
+        memcpy(&key[j * sizeof(polynomial_t)], &s, sizeof(polynomial_t));
+    }
+}
+
+// decrypt a ciphertext with a key built by prepareDecryptionKey, see decryptWith
+void decryptPrepared(const unsigned char * const key, const unsigned char * const c, const unsigned k, const unsigned du, const unsigned dv, unsigned char * const m) {
+    // copy out of the key so the polynomials are suitably aligned
+    polynomial_t s[MAX_K];
+    memcpy(s, key, k * sizeof(polynomial_t));
+
+    decryptWith(s, c, k, du, dv, m);
+}
+
 /***** PYTHON BINDINGS *****/
+// check the parameters passed from python-land before any buffer is sized from them
+int checkK(const unsigned k) {
+    if (k < 2 || k > MAX_K) {
+        PyErr_Format(PyExc_ValueError, "k must be in 2..%d (got %u).", MAX_K, k);
+        return 0;
+    }
+    return 1;
+}
+
+int checkEta(const unsigned eta) {
+    if (eta != 2 && eta != 3) {
+        PyErr_Format(PyExc_ValueError, "eta must be 2 or 3 (got %u).", eta);
+        return 0;
+    }
+    return 1;
+}
+
+int checkD(const unsigned du, const unsigned dv) {
+    if (du < 1 || du > 11 || dv < 1 || dv > 11) {
+        PyErr_Format(PyExc_ValueError, "du and dv must be in 1..11 (got %u and %u).", du, dv);
+        return 0;
+    }
+    return 1;
+}
+
 // parse polynomial (array of N ints) passed from python-land
 polynomial_t parsePolynomial(PyObject * const data) {
     polynomial_t result = { .coeffs = {0} };
@@ -677,6 +947,343 @@ static PyObject * fastmath_decompress_matrix(PyObject * self, PyObject * args) {
     return result;
 }
 
+// keyGenBatch
+static PyObject * fastmath_key_gen_batch(PyObject * self, PyObject * args) {
+    // parse input
+    PyObject * xof, * prf;
+    unsigned xofLen, k, eta, count;
+    if (!PyArg_ParseTuple(args, "SISIII", &xof, &xofLen, &prf, &k, &eta, &count)) {
+        return NULL;
+    }
+    if (!checkK(k) || !checkEta(eta)) {
+        return NULL;
+    }
+    if (PyBytes_Size(xof) != (Py_ssize_t)xofLen * k * k * count) {
+        PyErr_SetString(PyExc_ValueError, "XOF output must hold k * k streams per key.");
+        return NULL;
+    }
+    if (PyBytes_Size(prf) != (Py_ssize_t)64 * eta * 2 * k * count) {
+        PyErr_SetString(PyExc_ValueError, "PRF output must hold 2 * k samples per key.");
+        return NULL;
+    }
+
+    // perform the call
+    const size_t numBytes = 384 * k * count;
+    unsigned char * ek = calloc(numBytes, sizeof(unsigned char));
+    unsigned char * dk = calloc(numBytes, sizeof(unsigned char));
+    // calloc may return NULL for an empty batch
+    if (numBytes > 0 && (ek == NULL || dk == NULL)) {
+        free(dk);
+        free(ek);
+        return PyErr_NoMemory();
+    }
+    const unsigned char * const xofBytes = (unsigned char *)PyBytes_AsString(xof);
+    const unsigned char * const prfBytes = (unsigned char *)PyBytes_AsString(prf);
+    // the inputs are immutable bytes objects owned by the caller, so other threads may run in the meantime
+    Py_BEGIN_ALLOW_THREADS
+    keyGenBatch(xofBytes, xofLen, prfBytes, k, eta, count, ek, dk);
+    Py_END_ALLOW_THREADS
+
+    // package output and cleanup
+    PyObject * result = Py_BuildValue("(y#y#)", (char *)ek, (Py_ssize_t)numBytes, (char *)dk, (Py_ssize_t)numBytes);
+    free(dk);
+    free(ek);
+    return result;
+}
+
+// encryptBatch
+static PyObject * fastmath_encrypt_batch(PyObject * self, PyObject * args) {
+    // parse input
+    PyObject * ek, * xof, * prf, * m;
+    unsigned xofLen, k, eta1, eta2, du, dv, count;
+    if (!PyArg_ParseTuple(args, "SSISSIIIIII", &ek, &xof, &xofLen, &prf, &m, &k, &eta1, &eta2, &du, &dv, &count)) {
+        return NULL;
+    }
+    if (!checkK(k) || !checkEta(eta1) || !checkEta(eta2) || !checkD(du, dv)) {
+        return NULL;
+    }
+    if (PyBytes_Size(ek) != (Py_ssize_t)384 * k * count) {
+        PyErr_SetString(PyExc_ValueError, "Encryption keys must hold 384 * k bytes per message.");
+        return NULL;
+    }
+    if (PyBytes_Size(xof) != (Py_ssize_t)xofLen * k * k * count) {
+        PyErr_SetString(PyExc_ValueError, "XOF output must hold k * k streams per message.");
+        return NULL;
+    }
+    if (PyBytes_Size(prf) != (Py_ssize_t)64 * (k * eta1 + (k + 1) * eta2) * count) {
+        PyErr_SetString(PyExc_ValueError, "PRF output must hold 2 * k + 1 samples per message.");
+        return NULL;
+    }
+    if (PyBytes_Size(m) != (Py_ssize_t)32 * count) {
+        PyErr_SetString(PyExc_ValueError, "Messages must be 32 bytes each.");
+        return NULL;
+    }
+
+    // perform the call
+    const size_t numBytes = 32 * (du * k + dv) * count;
+    unsigned char * c = calloc(numBytes, sizeof(unsigned char));
+    if (c == NULL && numBytes > 0) {
+        return PyErr_NoMemory();
+    }
+    const unsigned char * const ekBytes = (unsigned char *)PyBytes_AsString(ek);
+    const unsigned char * const xofBytes = (unsigned char *)PyBytes_AsString(xof);
+    const unsigned char * const prfBytes = (unsigned char *)PyBytes_AsString(prf);
+    const unsigned char * const mBytes = (unsigned char *)PyBytes_AsString(m);
+    Py_BEGIN_ALLOW_THREADS
+    encryptBatch(ekBytes, xofBytes, xofLen, prfBytes, mBytes, k, eta1, eta2, du, dv, count, c);
+    Py_END_ALLOW_THREADS
+
+    // package output and cleanup
+    PyObject * result = PyBytes_FromStringAndSize((char *)c, numBytes);
+    free(c);
+    return result;
+}
+
+// decryptBatch
+static PyObject * fastmath_decrypt_batch(PyObject * self, PyObject * args) {
+    // parse input
+    PyObject * dk, * c;
+    unsigned k, du, dv, count;
+    if (!PyArg_ParseTuple(args, "SSIIII", &dk, &c, &k, &du, &dv, &count)) {
+        return NULL;
+    }
+    if (!checkK(k) || !checkD(du, dv)) {
+        return NULL;
+    }
+    if (PyBytes_Size(dk) != (Py_ssize_t)384 * k * count) {
+        PyErr_SetString(PyExc_ValueError, "Decryption keys must hold 384 * k bytes per ciphertext.");
+        return NULL;
+    }
+    if (PyBytes_Size(c) != (Py_ssize_t)32 * (du * k + dv) * count) {
+        PyErr_SetString(PyExc_ValueError, "Ciphertexts must be 32 * (du * k + dv) bytes each.");
+        return NULL;
+    }
+
+    // perform the call
+    const size_t numBytes = 32 * count;
+    unsigned char * m = calloc(numBytes, sizeof(unsigned char));
+    if (m == NULL && numBytes > 0) {
+        return PyErr_NoMemory();
+    }
+    const unsigned char * const dkBytes = (unsigned char *)PyBytes_AsString(dk);
+    const unsigned char * const cBytes = (unsigned char *)PyBytes_AsString(c);
+    Py_BEGIN_ALLOW_THREADS
+    decryptBatch(dkBytes, cBytes, k, du, dv, count, m);
+    Py_END_ALLOW_THREADS
+
+    // package output and cleanup
+    PyObject * result = PyBytes_FromStringAndSize((char *)m, numBytes);
+    free(m);
+    return result;
+}
+
+// validEncapsulationKey
+static PyObject * fastmath_validate_ek(PyObject * self, PyObject * args) {
+    // parse input
+    PyObject * ek;
+    unsigned k;
+    if (!PyArg_ParseTuple(args, "SI", &ek, &k)) {
+        return NULL;
+    }
+    if (!checkK(k)) {
+        return NULL;
+    }
+    if (PyBytes_Size(ek) < (Py_ssize_t)384 * k) {
+        PyErr_SetString(PyExc_ValueError, "Encapsulation key must hold at least 384 * k bytes.");
+        return NULL;
+    }
+
+    // perform the call
+    return PyBool_FromLong(validEncapsulationKey((unsigned char *)PyBytes_AsString(ek), k));
+}
+
+static PyObject * fastmath_validate_eks(PyObject * self, PyObject * args) {
+    // parse input
+    PyObject * eks;
+    unsigned count, k;
+    if (!PyArg_ParseTuple(args, "SII", &eks, &count, &k)) {
+        return NULL;
+    }
+    if (!checkK(k)) {
+        return NULL;
+    }
+    const size_t size = 384 * k + 32;
+    if (PyBytes_Size(eks) != (Py_ssize_t)(size * count)) {
+        PyErr_SetString(PyExc_ValueError, "Encapsulation keys must be 384 * k + 32 bytes each.");
+        return NULL;
+    }
+
+    // perform the call
+    unsigned char * valid = calloc(count, sizeof(unsigned char));
+    if (valid == NULL && count > 0) {
+        return PyErr_NoMemory();
+    }
+    const unsigned char * const ekBytes = (unsigned char *)PyBytes_AsString(eks);
+    Py_BEGIN_ALLOW_THREADS
+    for (unsigned i = 0; i < count; i++) {
+        valid[i] = validEncapsulationKey(&ekBytes[i * size], k);
+    }
+    Py_END_ALLOW_THREADS
+
+    // package output and cleanup
+    PyObject * result = PyList_New(count);
+    for (unsigned i = 0; i < count; i++) {
+        PyList_SET_ITEM(result, i, PyBool_FromLong(valid[i]));
+    }
+    free(valid);
+    return result;
+}
+
+// prepareEncryptionKey
+static PyObject * fastmath_prepare_encryption_key(PyObject * self, PyObject * args) {
+    // parse input
+    PyObject * ekT, * xof;
+    unsigned xofLen, k;
+    int mulcache;
+    if (!PyArg_ParseTuple(args, "SSIIp", &ekT, &xof, &xofLen, &k, &mulcache)) {
+        return NULL;
+    }
+    if (!checkK(k)) {
+        return NULL;
+    }
+    if (PyBytes_Size(ekT) != (Py_ssize_t)384 * k) {
+        PyErr_SetString(PyExc_ValueError, "Encryption key must hold 384 * k bytes.");
+        return NULL;
+    }
+    if (PyBytes_Size(xof) != (Py_ssize_t)xofLen * k * k) {
+        PyErr_SetString(PyExc_ValueError, "XOF output must hold k * k streams.");
+        return NULL;
+    }
+
+    // perform the call
+    const size_t numBytes = preparedEncryptionKeySize(k, mulcache);
+    unsigned char * key = calloc(numBytes, sizeof(unsigned char));
+    if (key == NULL) {
+        return PyErr_NoMemory();
+    }
+    const unsigned char * const ekBytes = (unsigned char *)PyBytes_AsString(ekT);
+    const unsigned char * const xofBytes = (unsigned char *)PyBytes_AsString(xof);
+    Py_BEGIN_ALLOW_THREADS
+    prepareEncryptionKey(ekBytes, xofBytes, xofLen, k, mulcache, key);
+    Py_END_ALLOW_THREADS
+
+    // package output and cleanup
+    PyObject * result = PyBytes_FromStringAndSize((char *)key, numBytes);
+    free(key);
+    return result;
+}
+
+// encryptPrepared
+static PyObject * fastmath_encrypt_prepared(PyObject * self, PyObject * args) {
+    // parse input
+    PyObject * key, * prf, * m;
+    unsigned k, eta1, eta2, du, dv;
+    if (!PyArg_ParseTuple(args, "SSSIIIII", &key, &prf, &m, &k, &eta1, &eta2, &du, &dv)) {
+        return NULL;
+    }
+    if (!checkK(k) || !checkEta(eta1) || !checkEta(eta2) || !checkD(du, dv)) {
+        return NULL;
+    }
+    const Py_ssize_t keySize = PyBytes_Size(key);
+    int mulcache;
+    if (keySize == (Py_ssize_t)preparedEncryptionKeySize(k, 0)) {
+        mulcache = 0;
+    } else if (keySize == (Py_ssize_t)preparedEncryptionKeySize(k, 1)) {
+        mulcache = 1;
+    } else {
+        PyErr_SetString(PyExc_ValueError, "Key was not prepared for this value of k.");
+        return NULL;
+    }
+    if (PyBytes_Size(prf) != (Py_ssize_t)64 * (k * eta1 + (k + 1) * eta2)) {
+        PyErr_SetString(PyExc_ValueError, "PRF output must hold 2 * k + 1 samples.");
+        return NULL;
+    }
+    if (PyBytes_Size(m) != 32) {
+        PyErr_SetString(PyExc_ValueError, "Message must be 32 bytes.");
+        return NULL;
+    }
+
+    // perform the call
+    const size_t numBytes = 32 * (du * k + dv);
+    unsigned char * c = calloc(numBytes, sizeof(unsigned char));
+    if (c == NULL) {
+        return PyErr_NoMemory();
+    }
+    const unsigned char * const keyBytes = (unsigned char *)PyBytes_AsString(key);
+    const unsigned char * const prfBytes = (unsigned char *)PyBytes_AsString(prf);
+    const unsigned char * const mBytes = (unsigned char *)PyBytes_AsString(m);
+    Py_BEGIN_ALLOW_THREADS
+    encryptPrepared(keyBytes, mulcache, prfBytes, mBytes, k, eta1, eta2, du, dv, c);
+    Py_END_ALLOW_THREADS
+
+    // package output and cleanup
+    PyObject * result = PyBytes_FromStringAndSize((char *)c, numBytes);
+    free(c);
+    return result;
+}
+
+// prepareDecryptionKey
+static PyObject * fastmath_prepare_decryption_key(PyObject * self, PyObject * args) {
+    // parse input
+    PyObject * dk;
+    unsigned k;
+    if (!PyArg_ParseTuple(args, "SI", &dk, &k)) {
+        return NULL;
+    }
+    if (!checkK(k)) {
+        return NULL;
+    }
+    if (PyBytes_Size(dk) != (Py_ssize_t)384 * k) {
+        PyErr_SetString(PyExc_ValueError, "Decryption key must hold 384 * k bytes.");
+        return NULL;
+    }
+
+    // perform the call
+    const size_t numBytes = k * sizeof(polynomial_t);
+    unsigned char * key = calloc(numBytes, sizeof(unsigned char));
+    if (key == NULL) {
+        return PyErr_NoMemory();
+    }
+    prepareDecryptionKey((unsigned char *)PyBytes_AsString(dk), k, key);
+
+    // package output and cleanup
+    PyObject * result = PyBytes_FromStringAndSize((char *)key, numBytes);
+    free(key);
+    return result;
+}
+
+// decryptPrepared
+static PyObject * fastmath_decrypt_prepared(PyObject * self, PyObject * args) {
+    // parse input
+    PyObject * key, * c;
+    unsigned k, du, dv;
+    if (!PyArg_ParseTuple(args, "SSIII", &key, &c, &k, &du, &dv)) {
+        return NULL;
+    }
+    if (!checkK(k) || !checkD(du, dv)) {
+        return NULL;
+    }
+    if (PyBytes_Size(key) != (Py_ssize_t)(k * sizeof(polynomial_t))) {
+        PyErr_SetString(PyExc_ValueError, "Key was not prepared for this value of k.");
+        return NULL;
+    }
+    if (PyBytes_Size(c) != (Py_ssize_t)32 * (du * k + dv)) {
+        PyErr_SetString(PyExc_ValueError, "Ciphertext must be 32 * (du * k + dv) bytes.");
+        return NULL;
+    }
+
+    // perform the call
+    unsigned char m[32] = {0};
+    const unsigned char * const keyBytes = (unsigned char *)PyBytes_AsString(key);
+    const unsigned char * const cBytes = (unsigned char *)PyBytes_AsString(c);
+    Py_BEGIN_ALLOW_THREADS
+    decryptPrepared(keyBytes, cBytes, k, du, dv, m);
+    Py_END_ALLOW_THREADS
+
+    // package output
+    return PyBytes_FromStringAndSize((char *)m, 32);
+}
+
 // methods available to python-land
 static PyMethodDef FastMathMethods[] = {
     {"add_poly", fastmath_add_poly, METH_VARARGS, "Add two polynomials."},
@@ -696,18 +1303,36 @@ static PyMethodDef FastMathMethods[] = {
     {"byte_decode_matrix", fastmath_byte_decode_matrix, METH_VARARGS, "Deserialize a bytes to a matrix."},
     {"compress_matrix", fastmath_compress_matrix, METH_VARARGS, "Map the elements of each polynomial in a matrix from Z_q to Z_{2^d}."},
     {"decompress_matrix", fastmath_decompress_matrix, METH_VARARGS, "Map the elements of each polynomial in a matrix from Z_{2^d} to Z_q."},
+    {"key_gen_batch", fastmath_key_gen_batch, METH_VARARGS, "Derive several K-PKE keypairs from XOF and PRF output."},
+    {"encrypt_batch", fastmath_encrypt_batch, METH_VARARGS, "Encrypt several K-PKE messages from XOF and PRF output."},
+    {"decrypt_batch", fastmath_decrypt_batch, METH_VARARGS, "Decrypt several K-PKE ciphertexts."},
+    {"validate_ek", fastmath_validate_ek, METH_VARARGS, "Check that the values of an encapsulation key are less than q."},
+    {"validate_eks", fastmath_validate_eks, METH_VARARGS, "Check that the values of several encapsulation keys are less than q."},
+    {"prepare_encryption_key", fastmath_prepare_encryption_key, METH_VARARGS, "Decode and expand a K-PKE encryption key."},
+    {"encrypt_prepared", fastmath_encrypt_prepared, METH_VARARGS, "Encrypt a K-PKE message under a prepared key."},
+    {"prepare_decryption_key", fastmath_prepare_decryption_key, METH_VARARGS, "Decode a K-PKE decryption key."},
+    {"decrypt_prepared", fastmath_decrypt_prepared, METH_VARARGS, "Decrypt a K-PKE ciphertext with a prepared key."},
     {NULL, NULL, 0, NULL}
 };
 
+// the module holds no state, so it can be loaded into any number of (sub-)interpreters
+static PyModuleDef_Slot FastMathSlots[] = {
+#if PY_VERSION_HEX >= 0x030C0000
+    {Py_mod_multiple_interpreters, Py_MOD_PER_INTERPRETER_GIL_SUPPORTED},
+#endif
+    {0, NULL}
+};
+
 // definition of the fastmath module
 static struct PyModuleDef fastmathmodule = {
     PyModuleDef_HEAD_INIT,
     "fastmath",
     NULL,
-    -1,
-    FastMathMethods
+    0,
+    FastMathMethods,
+    FastMathSlots
 };
 
 PyMODINIT_FUNC PyInit_fastmath(void) {
-    return PyModule_Create(&fastmathmodule);
+    return PyModuleDef_Init(&fastmathmodule);
 }
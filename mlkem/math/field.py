@@ -1,22 +1,49 @@
 from __future__ import annotations
 
+from typing import Any
+
+# moduli up to 2^12 cover q and every 2^d used by compression and byte encoding
+MAX_INTERNED_MODULUS = 1 << 12
+
+_TABLES: dict[int, list[Zm]] = {}
+
 
 class Zm:
-    r"""Represents elements of the field :math:`\mathbb{Z}_m`."""
+    r"""Represents elements of the field :math:`\mathbb{Z}_m`.
+
+    Elements are immutable. For moduli up to :data:`MAX_INTERNED_MODULUS` every element is created once, the first
+    time an element of that modulus is needed, and shared from then on, so arithmetic does not allocate.
+    """
+
+    __slots__ = ("m", "val")
 
+    m: int
     val: int
 
-    def __init__(self, val: int, m: int):
-        r"""Initialize an element in the field :math:`\mathbb{Z}_m`.
+    def __new__(cls, val: int, m: int) -> Zm:
+        r"""Get the element of the field :math:`\mathbb{Z}_m` equal to :code:`val`.
 
         Args:
             | val (:type:`int`): The (unreduced) value of the field element.
             | m (:type:`int`): The modulus / order of the field.
         """
-        self.m = m
-        self.val = val % m
+        table = _TABLES.get(m)
+        if table is None:
+            if m > MAX_INTERNED_MODULUS:
+                return _new(cls, val % m, m)
+            table = _TABLES.setdefault(m, [_new(cls, x, m) for x in range(m)])
+
+        return table[val % m]
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"Zm is immutable, cannot set {name}.")
+
+    def __reduce__(self) -> tuple[type[Zm], tuple[int, int]]:
+        return Zm, (self.val, self.m)
 
     def __eq__(self, other: object) -> bool:
+        if self is other:
+            return True
         if not isinstance(other, Zm):
             return NotImplemented
 
@@ -71,3 +98,10 @@ class Zm:
                 f"Cannot add elements in different fields ({self.m} and {y.m})."
             )
         return Zm(self.val * y.val, self.m)
+
+
+def _new(cls: type[Zm], val: int, m: int) -> Zm:
+    element = object.__new__(cls)
+    object.__setattr__(element, "m", m)
+    object.__setattr__(element, "val", val)
+    return element
@@ -1,5 +1,5 @@
 from __future__ import annotations
-from typing import Callable, Generic, TypeVar
+from typing import Callable, Generic, TypeVar, cast
 
 from mlkem.data_types import Field
 
@@ -153,11 +153,9 @@ class Matrix(Generic[T]):
 
             entries: list[T] = []
             for i in range(self.rows):
+                row = self.entries[i * self.cols : (i + 1) * self.cols]
                 for j in range(g.cols):
-                    entry = self[(i, 0)] * g[(0, j)]
-                    for k in range(1, g.rows):
-                        entry += self[(i, k)] * g[(k, j)]
-                    entries.append(entry)
+                    entries.append(_sum_of_products(row, g.entries[j :: g.cols]))
 
             return Matrix(self.rows, g.cols, entries)
         else:
@@ -165,6 +163,77 @@ class Matrix(Generic[T]):
             entries = [u * g for u in self.entries]
             return Matrix(self.rows, self.cols, entries)
 
+    def matvec(self, v: Matrix[T]) -> Matrix[T]:
+        r"""Multiply a column vector by the matrix, computing :math:`A \cdot v`.
+
+        Same as :code:`self * v`. Entries that provide a :code:`sum_of_products` method, such as
+        :func:`mlkem.math.polynomial_ring.PolynomialRing.sum_of_products`, compute each row with a single call to it.
+
+        Args:
+            | v (:class:`Matrix`): A column vector with as many rows as the matrix has columns.
+
+        Returns:
+            :class:`Matrix`: The column vector :math:`A \cdot v`.
+        """
+        if v.cols != 1 or v.rows != self.cols:
+            raise ValueError(
+                f"matvec requires a column vector with {self.cols} rows (got {v.rows}x{v.cols})."
+            )
+
+        return Matrix(
+            self.rows,
+            1,
+            [
+                _sum_of_products(
+                    self.entries[i * self.cols : (i + 1) * self.cols], v.entries
+                )
+                for i in range(self.rows)
+            ],
+        )
+
+    def matvec_transposed(self, v: Matrix[T]) -> Matrix[T]:
+        r"""Multiply a column vector by the transpose of the matrix, computing :math:`A^T \cdot v`.
+
+        Same as :code:`self.transpose() * v`, without building the transpose.
+
+        Args:
+            | v (:class:`Matrix`): A column vector with as many rows as the matrix has rows.
+
+        Returns:
+            :class:`Matrix`: The column vector :math:`A^T \cdot v`.
+        """
+        if v.cols != 1 or v.rows != self.rows:
+            raise ValueError(
+                f"matvec_transposed requires a column vector with {self.rows} rows (got {v.rows}x{v.cols})."
+            )
+
+        return Matrix(
+            self.cols,
+            1,
+            [
+                _sum_of_products(self.entries[j :: self.cols], v.entries)
+                for j in range(self.cols)
+            ],
+        )
+
+    def dot(self, v: Matrix[T]) -> T:
+        r"""The dot product of two column vectors, :math:`u^T \cdot v`.
+
+        Same as :code:`(self.transpose() * v).get_singleton_element()`.
+
+        Args:
+            | v (:class:`Matrix`): A column vector with as many rows as this one.
+
+        Returns:
+            :type:`T`: The dot product.
+        """
+        if self.cols != 1 or v.cols != 1 or self.rows != v.rows:
+            raise ValueError(
+                f"dot requires two column vectors of the same size (got {self.rows}x{self.cols} and {v.rows}x{v.cols})."
+            )
+
+        return _sum_of_products(self.entries, v.entries)
+
     def map(self, f: Callable[[T], T]) -> Matrix[T]:
         return Matrix(self.rows, self.cols, [f(x) for x in self.entries])
 
@@ -184,3 +253,15 @@ class Matrix(Generic[T]):
         raise ValueError(
             f"Can only get singleton elements from 1x1 matrix (got {self.rows}x{self.cols})."
         )
+
+
+def _sum_of_products(xs: list[T], ys: list[T]) -> T:
+    # element types may provide a faster way to sum several products, e.g. with a single reduction at the end
+    sum_of_products = getattr(type(xs[0]), "sum_of_products", None)
+    if sum_of_products is not None:
+        return cast(T, sum_of_products(xs, ys))
+
+    entry = xs[0] * ys[0]
+    for x, y in zip(xs[1:], ys[1:]):
+        entry += x * y
+    return entry
@@ -1,5 +1,7 @@
 from __future__ import annotations
+from collections.abc import Iterable, Iterator, Sequence
 from enum import StrEnum
+from typing import cast, overload
 
 from mlkem.math.constants import n, q
 from mlkem.math.field import Zm
@@ -17,14 +19,26 @@ class RingRepresentation(StrEnum):
 
 
 class PolynomialRing:
-    r"""Represents elements of the ring :math:`\mathbb{Z}^n_q`."""
+    r"""Represents elements of the ring :math:`\mathbb{Z}^n_q`.
 
-    coefficients: list[Zm]
+    The coefficients are stored as a list of reduced integers in :attr:`values`. Indexing and :attr:`coefficients`
+    return :class:`mlkem.math.field.Zm` elements, which are created on access. Coefficients are elements of
+    :math:`\mathbb{Z}_q`, setting one from an element of another modulus raises a :type:`ValueError`.
+
+    A polynomial remembers its coefficients in the other representation once they have been computed by
+    :func:`to_ntt`, :func:`to_standard`, :func:`mlkem.auxiliary.ntt.ntt` or :func:`mlkem.auxiliary.ntt.ntt_inv`, and
+    arithmetic uses them where that avoids a conversion. Setting a coefficient with :code:`f[i] = x` discards them.
+    Modifying :attr:`values` directly does not, so a polynomial that has been converted must not be modified that way.
+    """
+
+    __slots__ = ("_other", "representation", "values")
+
+    values: list[int]
     representation: RingRepresentation
 
     def __init__(
         self,
-        coefficients: list[Zm] | None = None,
+        coefficients: Sequence[Zm] | None = None,
         representation: RingRepresentation = RingRepresentation.STANDARD,
     ):
         r"""Initialize a polynomial ring element.
@@ -35,17 +49,121 @@ class PolynomialRing:
         initialized to 0.
 
         Args:
-            | coefficients (:type:`list[mlkem.math.field.Zm] | None`): The coefficients of the polynomial.
+            | coefficients (:type:`Sequence[mlkem.math.field.Zm] | None`): The coefficients of the polynomial.
             | representation (:class:`RingRepresentation`): The mathematical representation of the polynomial.
         """
         if coefficients is None:
-            coefficients = [Zm(0, q) for _ in range(n)]
+            self.values = [0] * n
+        elif len(coefficients) != n:
+            raise ValueError(f"coefficients must have length {n}")
+        else:
+            self.values = [_value(c) for c in coefficients]
+
+        self.representation = representation
+        self._other: list[int] | None = None
+
+    @classmethod
+    def from_values(
+        cls,
+        values: list[int],
+        representation: RingRepresentation = RingRepresentation.STANDARD,
+    ) -> PolynomialRing:
+        r"""Initialize a polynomial ring element from integer coefficients, without creating any field elements.
+
+        The list is used as is, not copied.
 
+        Args:
+            | values (:type:`list[int]`): The coefficients of the polynomial, each in the range :code:`[0, q)`.
+            | representation (:class:`RingRepresentation`): The mathematical representation of the polynomial.
+
+        Returns:
+            :class:`PolynomialRing`: The polynomial.
+        """
+        if len(values) != n:
+            raise ValueError(f"coefficients must have length {n}")
+
+        f = cls.__new__(cls)
+        f.values = values
+        f.representation = representation
+        f._other = None
+        return f
+
+    def to_ntt(self) -> PolynomialRing:
+        r"""This polynomial in NTT representation.
+
+        Returns the polynomial itself if it is in NTT representation, otherwise a new polynomial. The NTT is computed
+        the first time and remembered by both polynomials.
+
+        Returns:
+            :class:`PolynomialRing`: The polynomial in NTT representation.
+        """
+        return self._to(RingRepresentation.NTT)
+
+    def to_standard(self) -> PolynomialRing:
+        r"""This polynomial in standard representation.
+
+        Returns the polynomial itself if it is in standard representation, otherwise a new polynomial. The inverse NTT
+        is computed the first time and remembered by both polynomials.
+
+        Returns:
+            :class:`PolynomialRing`: The polynomial in standard representation.
+        """
+        return self._to(RingRepresentation.STANDARD)
+
+    def _to(self, representation: RingRepresentation) -> PolynomialRing:
+        if self.representation == representation:
+            return self
+
+        if self._other is None:
+            from mlkem.auxiliary.ntt import ntt_ints, ntt_inv_ints
+
+            self._other = (
+                ntt_ints(self.values)
+                if representation == RingRepresentation.NTT
+                else ntt_inv_ints(self.values)
+            )
+
+        # copies, so that setting a coefficient of one polynomial does not change the other
+        f = PolynomialRing.from_values(list(self._other), representation)
+        f._other = list(self.values)
+        return f
+
+    def _values_in(self, representation: RingRepresentation) -> list[int] | None:
+        if self.representation == representation:
+            return self.values
+        return self._other
+
+    def _operands(
+        self, g: PolynomialRing
+    ) -> tuple[list[int], list[int], RingRepresentation]:
+        # the coefficients of both polynomials in a representation they are both available in
+        g_values = g._values_in(self.representation)
+        if g_values is not None:
+            return self.values, g_values, self.representation
+
+        f_values = self._values_in(g.representation)
+        if f_values is not None:
+            return f_values, g.values, g.representation
+
+        raise ValueError(
+            "PolynomialRing representation must be the same in order to perform arithmetic."
+        )
+
+    @property
+    def coefficients(self) -> _Coefficients:
+        r"""The coefficients of the polynomial as field elements.
+
+        This is a live view of :attr:`values`: :code:`f.coefficients[i] = x` is the same as :code:`f[i] = x`.
+        """
+        return _Coefficients(self)
+
+    @coefficients.setter
+    def coefficients(self, coefficients: Sequence[Zm]) -> None:
         if len(coefficients) != n:
             raise ValueError(f"coefficients must have length {n}")
 
-        self.coefficients = coefficients
-        self.representation = representation
+        self.values = [_value(c) for c in coefficients]
+        self._other = None
 
     def __eq__(self, other: object) -> bool:
         r"""Compare two polynomial rings for equality.
@@ -67,15 +185,10 @@ class PolynomialRing:
         if self.representation != other.representation:
             return False
 
-        if len(self.coefficients) != len(other.coefficients):
-            return False
-
-        return all(
-            [fi == gi for (fi, gi) in zip(self.coefficients, other.coefficients)]
-        )
+        return self.values == other.values
 
     def __repr__(self) -> str:
-        return "[ " + ", ".join([repr(x) for x in self.coefficients]) + " ]"
+        return "[ " + ", ".join([repr(x) for x in self.values]) + " ]"
 
     def __getitem__(self, index: int) -> Zm:
         r"""Get the coefficient at :code:`index`.
@@ -91,7 +204,7 @@ class PolynomialRing:
                 f"Index for Rq coefficient must be less than {n}. Got {index}."
             )
 
-        return self.coefficients[index]
+        return Zm(self.values[index], q)
 
     def __setitem__(self, index: int, value: Zm) -> None:
         r"""Set the coefficient at :code:`index` to :code:`value`.
@@ -105,7 +218,8 @@ class PolynomialRing:
                 f"Index for Rq coefficient must be less than {n}. Got {index}."
             )
 
-        self.coefficients[index] = value
+        self.values[index] = _value(value)
+        self._other = None
 
     def __add__(self, g: PolynomialRing) -> PolynomialRing:
         r"""Add two elements f and g where :math:`f, g \in \mathbb{Z}^n_m`.
@@ -118,13 +232,9 @@ class PolynomialRing:
         Returns:
             :class:`PolynomialRing`: An element equal to :math:`f + g`.
         """
-        if self.representation != g.representation:
-            raise ValueError(
-                "PolynomialRing representation must be the same in order to perform arithmetic."
-            )
-
-        coefficients = [fi + gi for (fi, gi) in zip(self.coefficients, g.coefficients)]
-        return PolynomialRing(coefficients, representation=self.representation)
+        f_values, g_values, representation = self._operands(g)
+        values = [(fi + gi) % q for (fi, gi) in zip(f_values, g_values)]
+        return PolynomialRing.from_values(values, representation)
 
     def __sub__(self, g: PolynomialRing) -> PolynomialRing:
         r"""Subtract two elements f and g where :math:`f, g \in \mathbb{Z}^n_m`.
@@ -137,13 +247,9 @@ class PolynomialRing:
         Returns:
             :class:`PolynomialRing`: An element equal to :math:`f - g`.
         """
-        if self.representation != g.representation:
-            raise ValueError(
-                "PolynomialRing representation must be the same in order to perform arithmetic."
-            )
-
-        coefficients = [fi - gi for (fi, gi) in zip(self.coefficients, g.coefficients)]
-        return PolynomialRing(coefficients, representation=self.representation)
+        f_values, g_values, representation = self._operands(g)
+        values = [(fi - gi) % q for (fi, gi) in zip(f_values, g_values)]
+        return PolynomialRing.from_values(values, representation)
 
     def __mul__(self, a: Zm | PolynomialRing) -> PolynomialRing:
         r"""Multiply by an element in :math:`\mathbb{Z}^m` or :math:`\mathbb{Z}^n_m`.
@@ -152,7 +258,7 @@ class PolynomialRing:
         :math:`a \cdot f \in \mathbb{Z}^n_m` is equal to :math:`a \cdot f_i \pmod{m}`.
 
         If :math:`a \in \mathbb{Z}^n_m` and :math:`f \in \mathbb{Z}^n_m` then both polynomials must be in NTT
-        representation. NTT multiplication is then used to multiply the two together.
+        representation, or have been converted to it. NTT multiplication is then used to multiply the two together.
 
         Args:
             | a (:class:`mlkem.math.field.Zm` | :class:`PolynomialRing`): The value to multiply by.
@@ -162,28 +268,127 @@ class PolynomialRing:
         """
         # scalar multiplication
         if isinstance(a, Zm):
-            coefficients = [a * fi for fi in self.coefficients]
-            return PolynomialRing(coefficients, representation=self.representation)
+            if a.m != q:
+                raise ValueError(
+                    f"Cannot multiply PolynomialRing by an element of Z_{a.m}."
+                )
+            values = [(a.val * fi) % q for fi in self.values]
+            return PolynomialRing.from_values(values, self.representation)
 
         # polynomial multiplication
         elif isinstance(a, PolynomialRing):
-            from mlkem.auxiliary.ntt import multiply_ntt
+            from mlkem.auxiliary.ntt import multiply_ntt_ints
 
-            if (
-                self.representation != RingRepresentation.NTT
-                or a.representation != RingRepresentation.NTT
-            ):
+            f_ = self._values_in(RingRepresentation.NTT)
+            g_ = a._values_in(RingRepresentation.NTT)
+            if f_ is None or g_ is None:
                 raise ValueError(
                     "Multiplying PolynomialRings is only possible if both are in NTT representation."
                 )
 
-            return multiply_ntt(self, a)
+            return PolynomialRing.from_values(
+                multiply_ntt_ints(f_, g_), RingRepresentation.NTT
+            )
 
         else:
             raise NotImplementedError(
                 f"Cannot multiply PolynomialRing by type {type(a)}."
             )
 
+    @staticmethod
+    def sum_of_products(
+        fs: list[PolynomialRing], gs: list[PolynomialRing]
+    ) -> PolynomialRing:
+        r"""Compute :math:`\sum_i f_i \cdot g_i` for polynomials in (or converted to) NTT representation.
+
+        The products are accumulated into a single list of coefficients and reduced once at the end, rather than
+        creating a polynomial for every product and every partial sum.
+
+        Args:
+            | fs (:type:`list[PolynomialRing]`): The left hand operands.
+            | gs (:type:`list[PolynomialRing]`): The right hand operands, as many as :code:`fs`.
+
+        Returns:
+            :class:`PolynomialRing`: The sum of the products.
+        """
+        from mlkem.auxiliary.ntt import sum_of_products_ntt_ints
+
+        fs_ = [f._values_in(RingRepresentation.NTT) for f in fs]
+        gs_ = [g._values_in(RingRepresentation.NTT) for g in gs]
+        if any(f_ is None for f_ in fs_ + gs_):
+            raise ValueError(
+                "Multiplying PolynomialRings is only possible if both are in NTT representation."
+            )
+
+        return PolynomialRing.from_values(
+            sum_of_products_ntt_ints(fs_, gs_),  # type: ignore[arg-type]
+            RingRepresentation.NTT,
+        )
+
     def __rmul__(self, a: Zm | PolynomialRing) -> PolynomialRing:
         r"""Equivalent to :code:`self.__mul__(a)`."""
         return self.__mul__(a)
+
+
+class _Coefficients(Sequence[Zm]):
+    """A live view of the coefficients of a :class:`PolynomialRing` as field elements.
+
+    Reads create :class:`mlkem.math.field.Zm` elements from :attr:`PolynomialRing.values` and writes go through to
+    them, so the view behaves like the list of coefficients except that its length cannot change.
+    """
+
+    __slots__ = ("_f",)
+
+    def __init__(self, f: PolynomialRing) -> None:
+        self._f = f
+
+    def __len__(self) -> int:
+        return n
+
+    @overload
+    def __getitem__(self, index: int) -> Zm: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Zm]: ...
+
+    def __getitem__(self, index: int | slice) -> Zm | list[Zm]:
+        if isinstance(index, slice):
+            return [Zm(x, q) for x in self._f.values[index]]
+        return Zm(self._f.values[index], q)
+
+    @overload
+    def __setitem__(self, index: int, value: Zm) -> None: ...
+
+    @overload
+    def __setitem__(self, index: slice, value: Iterable[Zm]) -> None: ...
+
+    def __setitem__(self, index: int | slice, value: Zm | Iterable[Zm]) -> None:
+        f = self._f
+        if isinstance(index, slice):
+            values = [_value(c) for c in cast(Iterable[Zm], value)]
+            if len(f.values[index]) != len(values):
+                raise ValueError(f"coefficients must have length {n}")
+            f.values[index] = values
+        else:
+            f.values[index] = _value(cast(Zm, value))
+        f._other = None
+
+    def __iter__(self) -> Iterator[Zm]:
+        return (Zm(x, q) for x in self._f.values)
+
+    def __reversed__(self) -> Iterator[Zm]:
+        return (Zm(x, q) for x in reversed(self._f.values))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, Sequence):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+def _value(c: Zm) -> int:
+    if c.m != q:
+        raise ValueError(f"Coefficients must be in Z_{q} (got Z_{c.m}).")
+    return c.val
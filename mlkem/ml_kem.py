@@ -1,13 +1,44 @@
+from concurrent.futures import Executor, ThreadPoolExecutor
+from itertools import repeat
+from os import cpu_count
 from secrets import token_bytes
-from typing import Callable
+from threading import Lock
+from typing import Callable, Sequence
 
-from mlkem.auxiliary.crypto import g, h, j
+from mlkem.auxiliary.crypto import g, h, j, j_from
 from mlkem.auxiliary.general import byte_decode, byte_encode
+from mlkem.data_types import DecapsulationCacheInterface, MatrixCacheInterface
 from mlkem.fast_k_pke import Fast_K_PKE
-from mlkem.fastmath import byte_decode_matrix, byte_encode_matrix  # type: ignore
+from mlkem.fastmath import validate_ek, validate_eks  # type: ignore
 from mlkem.k_pke import K_PKE, PKE_Interface
+from mlkem.keys import DecapsulationKey, EncapsulationKey
 from mlkem.parameter_set import ML_KEM_768, ParameterSet
 
+# upper bound on the operations handed to a single worker by the map_* methods
+MAX_CHUNK_SIZE = 256
+
+_default_executor: Executor | None = None
+_default_executor_lock = Lock()
+
+
+def default_executor() -> Executor:
+    r"""The executor used by the :code:`map_*` methods of :class:`ML_KEM` when none is given.
+
+    The executor is a thread pool with one worker per CPU. It is created on first use and shared by all
+    :class:`ML_KEM` instances.
+
+    Returns:
+        :type:`concurrent.futures.Executor`: The shared default executor.
+    """
+    global _default_executor
+
+    with _default_executor_lock:
+        if _default_executor is None:
+            _default_executor = ThreadPoolExecutor(
+                max_workers=cpu_count(), thread_name_prefix="mlkem"
+            )
+        return _default_executor
+
 
 class ML_KEM:
     """A CCA-secure module-lattice-based key encapsulation mechanism (KEM)."""
@@ -16,17 +47,24 @@ class ML_KEM:
     randomness: Callable[[int], bytes]
     fast: bool
     k_pke: PKE_Interface
+    decaps_cache: DecapsulationCacheInterface | None
 
     def __init__(
         self,
         parameters: ParameterSet = ML_KEM_768,
         randomness: Callable[[int], bytes] = token_bytes,
         fast: bool = True,
+        a_cache: MatrixCacheInterface | None = None,
+        decaps_cache: DecapsulationCacheInterface | None = None,
+        pke: type[PKE_Interface] | None = None,
     ):
         self.parameters = parameters
         self.randomness = randomness
         self.fast = fast
-        self.k_pke = Fast_K_PKE(parameters) if fast else K_PKE(parameters)
+        self.decaps_cache = decaps_cache
+        if pke is None:
+            pke = Fast_K_PKE if fast else K_PKE
+        self.k_pke = pke(parameters, a_cache)
 
     def key_gen(self) -> tuple[bytes, bytes]:
         r"""Generate a keypair (ek, dk) for use in the ML-KEM system.
@@ -43,7 +81,53 @@ class ML_KEM:
 
         return self._key_gen(d, z)
 
-    def encaps(self, ek: bytes) -> tuple[bytes, bytes]:
+    def key_gen_batch(self, n: int) -> list[tuple[bytes, bytes]]:
+        r"""Generate :code:`n` keypairs (ek, dk) for use in the ML-KEM system.
+
+        All of the randomness for the batch is drawn with a single call to :code:`randomness`, and the keypairs are
+        then derived together, which is considerably faster than calling :func:`key_gen` in a loop.
+
+        Args:
+            | n (:type:`int`): The number of keypairs to generate.
+
+        Returns:
+            :type:`list[tuple[bytes, bytes]]`: The (encapsulation key, decapsulation key) pairs.
+        """
+        if n < 0:
+            raise ValueError(f"Number of keypairs must be non-negative (got {n}).")
+
+        seeds = self.randomness(64 * n)
+        ds = [seeds[64 * i : 64 * i + 32] for i in range(n)]
+        zs = [seeds[64 * i + 32 : 64 * i + 64] for i in range(n)]
+
+        return self._key_gen_batch(ds, zs)
+
+    def prepare_encapsulation_key(
+        self, ek: bytes, mulcache: bool = False
+    ) -> EncapsulationKey:
+        r"""Validate, hash and expand an encapsulation key once, for use in many calls to :func:`encaps`.
+
+        Encapsulating under raw bytes repeats the validation of the key, the computation of :math:`H(ek)`, the decoding
+        of vector :math:`\hat{t}` and the expansion of matrix :math:`\hat{A}` on every call. A prepared key does all
+        of this once, which pays off for clients that encapsulate to the same key many times.
+
+        Args:
+            | ek (:type:`bytes`): The encapsulation key.
+            | mulcache (:type:`bool`): Whether to also precompute values that speed up multiplication by :math:`\hat{A}` (used by the C extensions only).
+
+        Returns:
+            :class:`mlkem.keys.EncapsulationKey`: The prepared key.
+        """
+        self._check_encaps_input(ek)
+        return EncapsulationKey(
+            ek=ek,
+            h=h(ek),
+            parameters=self.parameters,
+            pke=type(self.k_pke),
+            expanded=self.k_pke.prepare_encryption_key(ek, mulcache),
+        )
+
+    def encaps(self, ek: bytes | EncapsulationKey) -> tuple[bytes, bytes]:
         r"""Take an encapsulation key and produce a shared key and ciphertext.
 
         The shared key can be used as e.g. input to a KDF or as a key for a symmetric cipher between two parties.
@@ -51,43 +135,286 @@ class ML_KEM:
         encapsulation of the shared key).
 
         Args:
-            | ek (:type:`bytes`): The encapsulation key.
+            | ek (:type:`bytes | mlkem.keys.EncapsulationKey`): The encapsulation key, as bytes or prepared by :func:`prepare_encapsulation_key`.
 
         Returns:
             :type:`tuple[bytes, bytes]`: The (shared key, ciphertext) pair.
         """
+        if isinstance(ek, EncapsulationKey):
+            self._check_prepared_key(ek)
+            m = self.randomness(32)
+            return self._encaps_prepared(ek, m)
+
         self._check_encaps_input(ek)
         m = self.randomness(32)
         return self._encaps(ek, m)
 
-    def decaps(self, dk: bytes, c: bytes) -> bytes:
+    def prepare_decapsulation_key(
+        self, dk: bytes, mulcache: bool = False
+    ) -> DecapsulationKey:
+        r"""Check and decode a decapsulation key once, for use in many calls to :func:`decaps`.
+
+        Decapsulating with raw bytes recomputes the hash of the embedded encapsulation key, splits the key and decodes
+        vector :math:`\hat{s}`, then decodes :math:`\hat{t}` and expands :math:`\hat{A}` for the re-encryption on
+        every call. A prepared key does all of this once, which pays off for servers that decapsulate many
+        ciphertexts under the same key.
+
+        Args:
+            | dk (:type:`bytes`): The decapsulation key.
+            | mulcache (:type:`bool`): See :func:`prepare_encapsulation_key`.
+
+        Returns:
+            :class:`mlkem.keys.DecapsulationKey`: The prepared key.
+        """
+        self._check_decaps_key(dk)
+
+        k = self.parameters.k
+        ek = dk[384 * k : 768 * k + 32]
+        return DecapsulationKey(
+            dk=dk,
+            ek=EncapsulationKey(
+                ek=ek,
+                h=dk[768 * k + 32 : 768 * k + 64],
+                parameters=self.parameters,
+                pke=type(self.k_pke),
+                expanded=self.k_pke.prepare_encryption_key(ek, mulcache),
+            ),
+            z=dk[768 * k + 64 : 768 * k + 96],
+            expanded=self.k_pke.prepare_decryption_key(dk[: 384 * k]),
+        )
+
+    def decaps(self, dk: bytes | DecapsulationKey, c: bytes) -> bytes:
         r"""Takes a decapsulation key and ciphertext as input, does not use any randomness, and outputs a shared
         secret.
 
         The ciphertext should be produced by :func:`encaps` using the encapsulation key corresponding to the
         decapsulation key that was passed to this method. The result is the shared key, the same as the first value
-        in the tuple output by :func:`encaps`.
+        in the tuple output by :func:`encaps`. If this instance has a :code:`decaps_cache`, the shared key is looked
+        up there first (see :class:`mlkem.cache.DecapsulationCache`). The batch and :code:`map_*` methods do not use
+        the cache.
 
         Args:
-            | dk (:type:`bytes`): The decapsulation key.
+            | dk (:type:`bytes | mlkem.keys.DecapsulationKey`): The decapsulation key, as bytes or prepared by :func:`prepare_decapsulation_key`.
             | c (:type:`bytes`): The ciphertext.
 
         Returns:
             :type:`bytes`: The shared key.
         """
-        self._check_decaps_input(dk, c)
-        return self._decaps(dk, c)
+        k = self.parameters.k
+        if isinstance(dk, DecapsulationKey):
+            self._check_prepared_key(dk.ek)
+            self._check_ciphertext(c)
+            key_id = dk.ek.h + dk.z
+        else:
+            self._check_decaps_input(dk, c)
+            key_id = dk[768 * k + 32 : 768 * k + 96]
+
+        if self.decaps_cache is not None:
+            # the hash of the encapsulation key and the rejection value identify the decapsulation key
+            shared_key = self.decaps_cache.get(key_id, c)
+            if shared_key is not None:
+                return shared_key
+
+        if isinstance(dk, DecapsulationKey):
+            shared_key = self._decaps_prepared(dk, c)
+        else:
+            shared_key = self._decaps(dk, c)
+
+        if self.decaps_cache is not None:
+            self.decaps_cache.put(key_id, c, shared_key)
+        return shared_key
+
+    def encaps_batch(
+        self, eks: Sequence[bytes], validate: bool = True
+    ) -> list[tuple[bytes, bytes]]:
+        r"""Run :func:`encaps` on every encapsulation key in :code:`eks`.
+
+        All of the randomness for the batch is drawn with a single call to :code:`randomness`, and the ciphertexts
+        are then derived together.
+
+        Args:
+            | eks (:type:`Sequence[bytes]`): The encapsulation keys.
+            | validate (:type:`bool`): Whether to check the keys as :func:`encaps` does. Only pass :code:`False` for keys that were already checked, e.g. when they were queued.
+
+        Returns:
+            :type:`list[tuple[bytes, bytes]]`: The (shared key, ciphertext) pairs, in the same order as the keys.
+        """
+        eks = list(eks)
+        if validate:
+            for ek in eks:
+                self._check_encaps_input(ek)
+
+        seeds = self.randomness(32 * len(eks))
+        ms = [seeds[32 * i : 32 * i + 32] for i in range(len(eks))]
+        return self._encaps_batch(eks, ms)
+
+    def decaps_batch(
+        self, dks: Sequence[bytes], cs: Sequence[bytes], validate: bool = True
+    ) -> list[bytes]:
+        r"""Run :func:`decaps` on every pair of decapsulation key and ciphertext in :code:`dks` and :code:`cs`.
+
+        Args:
+            | dks (:type:`Sequence[bytes]`): The decapsulation keys.
+            | cs (:type:`Sequence[bytes]`): The ciphertexts, one per decapsulation key.
+            | validate (:type:`bool`): Whether to check the keys and ciphertexts as :func:`decaps` does, see :func:`encaps_batch`.
+
+        Returns:
+            :type:`list[bytes]`: The shared keys, in the same order as the inputs.
+        """
+        dks, cs = list(dks), list(cs)
+        if len(dks) != len(cs):
+            raise ValueError(
+                f"Expected one ciphertext per key, got {len(dks)} keys and {len(cs)} ciphertexts."
+            )
+        if validate:
+            for dk, c in zip(dks, cs):
+                self._check_decaps_input(dk, c)
+
+        return self._decaps_batch(dks, cs)
+
+    def validate_encapsulation_keys(self, eks: Sequence[bytes]) -> list[bool]:
+        r"""Check every encapsulation key in :code:`eks` the way :func:`encaps` does, without raising.
+
+        A key is valid if it has the size required by the parameter set and all of its coefficients are less than q
+        (the modulus check of FIPS 203, section 7.2). With the C extensions all keys are checked in a single native
+        call, which makes this suitable for validating large key directories when they are loaded.
+
+        Args:
+            | eks (:type:`Sequence[bytes]`): The encapsulation keys.
+
+        Returns:
+            :type:`list[bool]`: Whether each key is valid, in the same order as the keys.
+        """
+        k = self.parameters.k
+        size = 384 * k + 32
+        sized = [ek for ek in eks if len(ek) == size]
+        valid = iter(
+            validate_eks(b"".join(sized), len(sized), k)
+            if self.fast
+            else [self._check_modulus(ek) for ek in sized]
+        )
+        return [len(ek) == size and next(valid) for ek in eks]
+
+    def map_key_gen(
+        self,
+        n: int,
+        executor: Executor | None = None,
+        chunk_size: int | None = None,
+    ) -> list[tuple[bytes, bytes]]:
+        r"""Generate :code:`n` keypairs, spreading the work over the workers of an executor.
+
+        The work is split into chunks of at most :code:`chunk_size` keypairs, each of which is generated with
+        :func:`key_gen_batch` on a worker. Any :class:`concurrent.futures.Executor` can be used. For process (or
+        interpreter) pools this instance, including its :code:`randomness`, must be picklable.
+
+        Args:
+            | n (:type:`int`): The number of keypairs to generate.
+            | executor (:type:`concurrent.futures.Executor | None`): The executor to use, :func:`default_executor` if not given.
+            | chunk_size (:type:`int | None`): The number of keypairs per chunk, derived from the CPU count if not given.
+
+        Returns:
+            :type:`list[tuple[bytes, bytes]]`: The (encapsulation key, decapsulation key) pairs.
+        """
+        if n < 0:
+            raise ValueError(f"Number of keypairs must be non-negative (got {n}).")
+
+        size = self._chunk_size(n, chunk_size)
+        sizes = [min(size, n - i) for i in range(0, n, size)]
+        chunks = (executor or default_executor()).map(
+            _key_gen_chunk, repeat(self), sizes
+        )
+        return [keypair for chunk in chunks for keypair in chunk]
+
+    def map_encaps(
+        self,
+        eks: Sequence[bytes],
+        executor: Executor | None = None,
+        chunk_size: int | None = None,
+    ) -> list[tuple[bytes, bytes]]:
+        r"""Run :func:`encaps` on every encapsulation key in :code:`eks`, spreading the work over an executor.
+
+        The keys are split into chunks of at most :code:`chunk_size` keys, each of which is processed with
+        :func:`encaps_batch` on a worker. See :func:`map_key_gen` for the requirements on :code:`executor`.
+
+        Args:
+            | eks (:type:`Sequence[bytes]`): The encapsulation keys.
+            | executor (:type:`concurrent.futures.Executor | None`): The executor to use, :func:`default_executor` if not given.
+            | chunk_size (:type:`int | None`): The number of keys per chunk, derived from the CPU count if not given.
+
+        Returns:
+            :type:`list[tuple[bytes, bytes]]`: The (shared key, ciphertext) pairs, in the same order as the keys.
+        """
+        size = self._chunk_size(len(eks), chunk_size)
+        chunks = (executor or default_executor()).map(
+            _encaps_chunk,
+            repeat(self),
+            [eks[i : i + size] for i in range(0, len(eks), size)],
+        )
+        return [result for chunk in chunks for result in chunk]
+
+    def map_decaps(
+        self,
+        dks: Sequence[bytes],
+        cs: Sequence[bytes],
+        executor: Executor | None = None,
+        chunk_size: int | None = None,
+    ) -> list[bytes]:
+        r"""Run :func:`decaps` on every pair in :code:`dks` and :code:`cs`, spreading the work over an executor.
+
+        The pairs are split into chunks of at most :code:`chunk_size` pairs, each of which is processed with
+        :func:`decaps_batch` on a worker. See :func:`map_key_gen` for the requirements on :code:`executor`.
+
+        Args:
+            | dks (:type:`Sequence[bytes]`): The decapsulation keys.
+            | cs (:type:`Sequence[bytes]`): The ciphertexts, one per decapsulation key.
+            | executor (:type:`concurrent.futures.Executor | None`): The executor to use, :func:`default_executor` if not given.
+            | chunk_size (:type:`int | None`): The number of pairs per chunk, derived from the CPU count if not given.
+
+        Returns:
+            :type:`list[bytes]`: The shared keys, in the same order as the inputs.
+        """
+        if len(dks) != len(cs):
+            raise ValueError(
+                f"Expected one ciphertext per key, got {len(dks)} keys and {len(cs)} ciphertexts."
+            )
+
+        size = self._chunk_size(len(dks), chunk_size)
+        chunks = (executor or default_executor()).map(
+            _decaps_chunk,
+            repeat(self),
+            [dks[i : i + size] for i in range(0, len(dks), size)],
+            [cs[i : i + size] for i in range(0, len(cs), size)],
+        )
+        return [result for chunk in chunks for result in chunk]
 
     def _key_gen(self, d: bytes, z: bytes) -> tuple[bytes, bytes]:
         ek, dk_pke = self.k_pke.key_gen(d)
         dk = dk_pke + ek + h(ek) + z
         return ek, dk
 
+    def _key_gen_batch(
+        self, ds: list[bytes], zs: list[bytes]
+    ) -> list[tuple[bytes, bytes]]:
+        keypairs = self.k_pke.key_gen_batch(ds)
+        return [(ek, dk_pke + ek + h(ek) + z) for (ek, dk_pke), z in zip(keypairs, zs)]
+
     def _encaps(self, ek: bytes, m: bytes) -> tuple[bytes, bytes]:
         k, r = g(m + h(ek))
         c = self.k_pke.encrypt(ek, m, r)
         return k, c
 
+    def _encaps_prepared(self, ek: EncapsulationKey, m: bytes) -> tuple[bytes, bytes]:
+        k, r = g(m + ek.h)
+        c = self.k_pke.encrypt_prepared(ek.expanded, m, r)
+        return k, c
+
+    def _encaps_batch(
+        self, eks: list[bytes], ms: list[bytes]
+    ) -> list[tuple[bytes, bytes]]:
+        krs = [g(m + h(ek)) for ek, m in zip(eks, ms)]
+        cs = self.k_pke.encrypt_batch(eks, ms, [r for _, r in krs])
+        return [(k, c) for (k, _), c in zip(krs, cs)]
+
     def _decaps(self, dk: bytes, c: bytes) -> bytes:
         k = self.parameters.k
         # extract encryption and decryption keys, hash of encryption key, and rejection value
@@ -109,29 +436,80 @@ class ML_KEM:
 
         return k_prime
 
+    def _decaps_prepared(self, dk: DecapsulationKey, c: bytes) -> bytes:
+        m_prime = self.k_pke.decrypt_prepared(dk.expanded, c)
+        k_prime, r_prime = g(m_prime + dk.ek.h)
+        k_bar = j_from(dk.z_state, c)
+
+        c_prime = self.k_pke.encrypt_prepared(dk.ek.expanded, m_prime, r_prime)
+        if c != c_prime:
+            # if ciphertexts do not match, then implicitly reject
+            k_prime = k_bar
+
+        return k_prime
+
+    def _decaps_batch(self, dks: list[bytes], cs: list[bytes]) -> list[bytes]:
+        k = self.parameters.k
+
+        # decrypt all ciphertexts, then re-encrypt all of them using the derived randomness
+        m_primes = self.k_pke.decrypt_batch([dk[: 384 * k] for dk in dks], cs)
+        krs = [
+            g(m_prime + dk[768 * k + 32 : 768 * k + 64])
+            for dk, m_prime in zip(dks, m_primes)
+        ]
+        c_primes = self.k_pke.encrypt_batch(
+            [dk[384 * k : 768 * k + 32] for dk in dks], m_primes, [r for _, r in krs]
+        )
+
+        result: list[bytes] = []
+        for dk, c, c_prime, (k_prime, _) in zip(dks, cs, c_primes, krs):
+            k_bar = j(dk[768 * k + 64 : 768 * k + 96] + c)
+            # if ciphertexts do not match, then implicitly reject
+            result.append(k_prime if c == c_prime else k_bar)
+
+        return result
+
+    def _chunk_size(self, total: int, chunk_size: int | None) -> int:
+        if chunk_size is not None:
+            if chunk_size < 1:
+                raise ValueError(f"Chunk size must be positive (got {chunk_size}).")
+            return chunk_size
+
+        # a few chunks per worker keeps the workers busy when chunks finish at different times
+        chunks = 4 * (cpu_count() or 1)
+        return max(1, min(MAX_CHUNK_SIZE, -(-total // chunks)))
+
     def _check_encaps_input(self, ek: bytes) -> None:
         k = self.parameters.k
 
         if len(ek) != 384 * k + 32:
             raise ValueError(f"Expected key of size {384 * k + 32}, got {len(ek)}.")
 
-        if self.fast:
-            expected = ek[: 384 * k]
-            test = byte_encode_matrix(byte_decode_matrix(ek, 12, k), 12)
-            if expected != test:
-                raise ValueError(
-                    "Encapsulation key contains bytes greater than or equal to q."
-                )
-        else:
-            for i in range(k):
-                expected = ek[i * 384 : i * 384 + 384]
-                test = byte_encode(12, byte_decode(12, expected))
-                if expected != test:
-                    raise ValueError(
-                        "Encapsulation key contains bytes greater than or equal to q."
-                    )
+        if not (validate_ek(ek, k) if self.fast else self._check_modulus(ek)):
+            raise ValueError(
+                "Encapsulation key contains bytes greater than or equal to q."
+            )
+
+    def _check_modulus(self, ek: bytes) -> bool:
+        # decoding reduces mod q, so the key only encodes to itself again if every value is less than q
+        for i in range(self.parameters.k):
+            expected = ek[i * 384 : i * 384 + 384]
+            if byte_encode(12, byte_decode(12, expected)) != expected:
+                return False
+        return True
+
+    def _check_prepared_key(self, key: EncapsulationKey) -> None:
+        if key.parameters != self.parameters or key.pke is not type(self.k_pke):
+            raise ValueError(
+                f"Key was prepared for {key.parameters} with {key.pke.__name__}, "
+                f"expected {self.parameters} with {type(self.k_pke).__name__}."
+            )
 
     def _check_decaps_input(self, dk: bytes, c: bytes) -> None:
+        self._check_ciphertext(c)
+        self._check_decaps_key(dk)
+
+    def _check_ciphertext(self, c: bytes) -> None:
         k = self.parameters.k
 
         expected_ciphertext_size = 32 * (self.parameters.du * k + self.parameters.dv)
@@ -140,6 +518,9 @@ class ML_KEM:
                 f"Expected ciphertext of size {expected_ciphertext_size}, got {len(c)}."
             )
 
+    def _check_decaps_key(self, dk: bytes) -> None:
+        k = self.parameters.k
+
         expected_key_size = 768 * k + 96
         if len(dk) != expected_key_size:
             raise ValueError(
@@ -149,3 +530,18 @@ class ML_KEM:
         expected_hash = dk[768 * k + 32 : 768 * k + 64]
         if h(dk[384 * k : 768 * k + 32]) != expected_hash:
             raise ValueError("Encapsulation key hash did not match expected hash.")
+
+
+# module level functions so that work can be handed to process pools
+def _key_gen_chunk(ml_kem: ML_KEM, n: int) -> list[tuple[bytes, bytes]]:
+    return ml_kem.key_gen_batch(n)
+
+
+def _encaps_chunk(ml_kem: ML_KEM, eks: Sequence[bytes]) -> list[tuple[bytes, bytes]]:
+    return ml_kem.encaps_batch(eks)
+
+
+def _decaps_chunk(
+    ml_kem: ML_KEM, dks: Sequence[bytes], cs: Sequence[bytes]
+) -> list[bytes]:
+    return ml_kem.decaps_batch(dks, cs)
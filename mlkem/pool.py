@@ -0,0 +1,398 @@
+from __future__ import annotations
+
+from collections import deque
+from dataclasses import dataclass
+from itertools import count
+from threading import Condition, Thread
+from time import perf_counter
+from typing import Any, Hashable
+
+from mlkem.keys import EncapsulationKey
+from mlkem.ml_kem import ML_KEM
+from mlkem.parameter_set import ML_KEM_768, ParameterSet
+
+
+@dataclass(frozen=True)
+class PoolMetrics:
+    r"""A snapshot of the state of a :class:`KeyPairPool` or :class:`EncapsulationPool`.
+
+    Attributes:
+        | depth (:type:`int`): The number of items ready to be taken.
+        | taken (:type:`int`): The number of items handed out.
+        | generated (:type:`int`): The number of items generated by the background thread.
+        | stalls (:type:`int`): The number of times the pool was empty and an item was generated on the caller's thread.
+        | refill_rate (:type:`float`): The throughput of the background thread while generating, in items per second.
+    """
+
+    depth: int
+    taken: int
+    generated: int
+    stalls: int
+    refill_rate: float
+
+
+class KeyPairPool:
+    """A pool of keypairs generated ahead of time, for taking key generation off the latency path.
+
+    A background thread tops the pool up to :code:`high_watermark` keypairs whenever it drops to
+    :code:`low_watermark`, generating :code:`batch_size` keypairs at a time with
+    :func:`mlkem.ml_kem.ML_KEM.key_gen_batch`. With the C extensions the batch runs without holding the GIL, so other
+    threads keep running while the pool refills. :func:`take` hands out every keypair exactly once. If the pool is
+    empty it generates a keypair on the caller's thread instead of waiting, which is counted as a stall.
+
+    If key generation fails in the background thread, the thread stops and :func:`take` and :func:`close` raise a
+    :class:`RuntimeError` caused by the failure.
+    """
+
+    parameters: ParameterSet
+    low_watermark: int
+    high_watermark: int
+    batch_size: int
+
+    def __init__(
+        self,
+        parameters: ParameterSet = ML_KEM_768,
+        low_watermark: int = 64,
+        high_watermark: int = 256,
+        batch_size: int = 64,
+        fast: bool = True,
+    ):
+        r"""Start the background thread, which fills the pool right away.
+
+        Args:
+            | parameters (:class:`mlkem.parameter_set.ParameterSet`): The ML-KEM parameter set.
+            | low_watermark (:type:`int`): The depth at or below which the pool is refilled.
+            | high_watermark (:type:`int`): The depth the pool is refilled to.
+            | batch_size (:type:`int`): The largest number of keypairs generated in one call.
+            | fast (:type:`bool`): Whether to use the C extensions, see :class:`mlkem.ml_kem.ML_KEM`.
+        """
+        if low_watermark < 0:
+            raise ValueError(
+                f"low_watermark must be non-negative (got {low_watermark})."
+            )
+        if high_watermark <= low_watermark:
+            raise ValueError(
+                f"high_watermark must be greater than low_watermark (got {high_watermark} <= {low_watermark})."
+            )
+        if batch_size < 1:
+            raise ValueError(f"batch_size must be positive (got {batch_size}).")
+
+        self.parameters = parameters
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self.batch_size = batch_size
+        self._ml_kem = ML_KEM(parameters, fast=fast)
+        self._keypairs: deque[tuple[bytes, bytes]] = deque()
+        self._condition = Condition()
+        self._closed = False
+        self._error: Exception | None = None
+        self._taken = 0
+        self._generated = 0
+        self._stalls = 0
+        self._refill_time = 0.0
+        self._thread = Thread(target=self._refill, name="mlkem-pool", daemon=True)
+        self._thread.start()
+
+    def __enter__(self) -> KeyPairPool:
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self._keypairs)
+
+    @property
+    def metrics(self) -> PoolMetrics:
+        r"""The current depth and counters of the pool."""
+        with self._condition:
+            return PoolMetrics(
+                depth=len(self._keypairs),
+                taken=self._taken,
+                generated=self._generated,
+                stalls=self._stalls,
+                refill_rate=(
+                    self._generated / self._refill_time if self._refill_time else 0.0
+                ),
+            )
+
+    def take(self) -> tuple[bytes, bytes]:
+        r"""Remove a keypair from the pool.
+
+        Returns:
+            :type:`tuple[bytes, bytes]`: The (encapsulation key, decapsulation key) pair.
+        """
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Cannot take a keypair from a closed pool.")
+            _raise_refill_error(self._error)
+
+            self._taken += 1
+            keypair = self._keypairs.popleft() if self._keypairs else None
+            if len(self._keypairs) <= self.low_watermark:
+                self._condition.notify()
+            if keypair is not None:
+                return keypair
+
+            self._stalls += 1
+
+        return self._ml_kem.key_gen()
+
+    def close(self) -> None:
+        r"""Stop the background thread and discard the remaining keypairs."""
+        with self._condition:
+            self._closed = True
+            self._keypairs.clear()
+            self._condition.notify()
+        self._thread.join()
+        _raise_refill_error(self._error)
+
+    def _refill(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._closed or len(self._keypairs) <= self.low_watermark
+                )
+                if self._closed:
+                    return
+
+            # generate outside of the lock so take() is never blocked by a batch
+            while True:
+                with self._condition:
+                    missing = self.high_watermark - len(self._keypairs)
+                    if self._closed or missing <= 0:
+                        break
+
+                start = perf_counter()
+                try:
+                    keypairs = self._ml_kem.key_gen_batch(min(missing, self.batch_size))
+                except Exception as error:
+                    with self._condition:
+                        self._error = error
+                    return
+                elapsed = perf_counter() - start
+
+                with self._condition:
+                    if self._closed:
+                        return
+                    self._keypairs.extend(keypairs)
+                    self._generated += len(keypairs)
+                    self._refill_time += elapsed
+
+
+def _raise_refill_error(error: Exception | None) -> None:
+    if error is not None:
+        raise RuntimeError("The background thread of the pool failed.") from error
+
+
+@dataclass
+class _Peer:
+    key: EncapsulationKey
+    generation: int
+    pairs: deque[tuple[bytes, bytes]]
+
+
+class EncapsulationPool:
+    """Pools of encapsulations computed ahead of time, one per registered peer encapsulation key.
+
+    Each peer's key is prepared once with :func:`mlkem.ml_kem.ML_KEM.prepare_encapsulation_key`. A background thread
+    tops every peer's pool up to :code:`high_watermark` (shared key, ciphertext) pairs whenever it drops to
+    :code:`low_watermark`. :func:`take` hands out every pair exactly once, and encapsulates on the caller's thread if
+    the peer's pool is empty, which is counted as a stall.
+
+    Registering a new key for a peer, e.g. after the peer rotated its key, discards the pairs computed for the old
+    key. Every registration gets a new generation number, and pairs that were being computed for an older generation
+    are dropped when they are done.
+
+    If encapsulation fails in the background thread, the thread stops and :func:`take` and :func:`close` raise a
+    :class:`RuntimeError` caused by the failure.
+    """
+
+    parameters: ParameterSet
+    low_watermark: int
+    high_watermark: int
+
+    def __init__(
+        self,
+        parameters: ParameterSet = ML_KEM_768,
+        low_watermark: int = 4,
+        high_watermark: int = 16,
+        fast: bool = True,
+    ):
+        r"""Start the background thread. Pairs are computed once peers are registered.
+
+        Args:
+            | parameters (:class:`mlkem.parameter_set.ParameterSet`): The ML-KEM parameter set.
+            | low_watermark (:type:`int`): The depth at or below which a peer's pool is refilled.
+            | high_watermark (:type:`int`): The depth a peer's pool is refilled to.
+            | fast (:type:`bool`): Whether to use the C extensions, see :class:`mlkem.ml_kem.ML_KEM`.
+        """
+        if low_watermark < 0:
+            raise ValueError(
+                f"low_watermark must be non-negative (got {low_watermark})."
+            )
+        if high_watermark <= low_watermark:
+            raise ValueError(
+                f"high_watermark must be greater than low_watermark (got {high_watermark} <= {low_watermark})."
+            )
+
+        self.parameters = parameters
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self._ml_kem = ML_KEM(parameters, fast=fast)
+        self._peers: dict[Hashable, _Peer] = {}
+        self._generations = count(1)
+        self._condition = Condition()
+        self._closed = False
+        self._error: Exception | None = None
+        self._taken = 0
+        self._generated = 0
+        self._stalls = 0
+        self._refill_time = 0.0
+        self._thread = Thread(
+            target=self._refill, name="mlkem-encaps-pool", daemon=True
+        )
+        self._thread.start()
+
+    def __enter__(self) -> EncapsulationPool:
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+    def __contains__(self, peer: Hashable) -> bool:
+        return peer in self._peers
+
+    @property
+    def metrics(self) -> PoolMetrics:
+        r"""The current depth, summed over all peers, and counters of the pool."""
+        with self._condition:
+            return PoolMetrics(
+                depth=sum(len(state.pairs) for state in self._peers.values()),
+                taken=self._taken,
+                generated=self._generated,
+                stalls=self._stalls,
+                refill_rate=(
+                    self._generated / self._refill_time if self._refill_time else 0.0
+                ),
+            )
+
+    def register(self, peer: Hashable, ek: bytes) -> int:
+        r"""Start computing encapsulations for a peer, replacing the peer's previous key if it has one.
+
+        Args:
+            | peer (:type:`Hashable`): An identifier of the peer.
+            | ek (:type:`bytes`): The peer's encapsulation key.
+
+        Returns:
+            :type:`int`: The generation number of the registration.
+        """
+        key = self._ml_kem.prepare_encapsulation_key(ek)
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Cannot register a peer with a closed pool.")
+
+            generation = next(self._generations)
+            self._peers[peer] = _Peer(key, generation, deque())
+            self._condition.notify()
+            return generation
+
+    def invalidate(self, peer: Hashable) -> None:
+        r"""Stop computing encapsulations for a peer and discard the ones not taken yet.
+
+        Args:
+            | peer (:type:`Hashable`): An identifier of the peer.
+        """
+        with self._condition:
+            self._peers.pop(peer, None)
+
+    def depth(self, peer: Hashable) -> int:
+        r"""The number of pairs ready to be taken for a peer.
+
+        Args:
+            | peer (:type:`Hashable`): An identifier of a registered peer.
+
+        Returns:
+            :type:`int`: The number of pairs.
+        """
+        with self._condition:
+            return len(self._state(peer).pairs)
+
+    def take(self, peer: Hashable) -> tuple[bytes, bytes]:
+        r"""Remove an encapsulation for a peer from the pool.
+
+        Args:
+            | peer (:type:`Hashable`): An identifier of a registered peer.
+
+        Returns:
+            :type:`tuple[bytes, bytes]`: The (shared key, ciphertext) pair.
+        """
+        with self._condition:
+            if self._closed:
+                raise RuntimeError("Cannot take an encapsulation from a closed pool.")
+            _raise_refill_error(self._error)
+
+            state = self._state(peer)
+            self._taken += 1
+            pair = state.pairs.popleft() if state.pairs else None
+            if len(state.pairs) <= self.low_watermark:
+                self._condition.notify()
+            if pair is not None:
+                return pair
+
+            self._stalls += 1
+
+        return self._ml_kem.encaps(state.key)
+
+    def close(self) -> None:
+        r"""Stop the background thread and discard the remaining encapsulations."""
+        with self._condition:
+            self._closed = True
+            self._peers.clear()
+            self._condition.notify()
+        self._thread.join()
+        _raise_refill_error(self._error)
+
+    def _state(self, peer: Hashable) -> _Peer:
+        state = self._peers.get(peer)
+        if state is None:
+            raise KeyError(f"Peer {peer!r} is not registered.")
+        return state
+
+    def _low(self) -> list[tuple[Hashable, _Peer, int]]:
+        # the number of missing pairs is taken under the lock, as take() pops pairs concurrently
+        return [
+            (peer, state, self.high_watermark - len(state.pairs))
+            for peer, state in self._peers.items()
+            if len(state.pairs) <= self.low_watermark
+        ]
+
+    def _refill(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: self._closed or bool(self._low()))
+                if self._closed:
+                    return
+                low = self._low()
+
+            # encapsulate outside of the lock so take() is never blocked by a refill
+            for peer, state, missing in low:
+                start = perf_counter()
+                try:
+                    pairs = [self._ml_kem.encaps(state.key) for _ in range(missing)]
+                except Exception as error:
+                    with self._condition:
+                        self._error = error
+                    return
+                elapsed = perf_counter() - start
+
+                with self._condition:
+                    if self._closed:
+                        return
+                    current = self._peers.get(peer)
+                    # the peer was invalidated or registered again in the meantime
+                    if current is None or current.generation != state.generation:
+                        continue
+                    current.pairs.extend(pairs)
+                    self._generated += len(pairs)
+                    self._refill_time += elapsed
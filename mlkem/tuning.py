@@ -0,0 +1,402 @@
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from enum import Enum
+from os import cpu_count
+from threading import Condition, Lock, RLock
+from time import perf_counter
+from typing import Any, Callable, Sequence
+
+from mlkem.ml_kem import MAX_CHUNK_SIZE, ML_KEM
+
+# the number of recent per-chunk latencies kept for each combination of settings
+LATENCY_WINDOW = 32
+
+
+class Operation(Enum):
+    KEY_GEN = "key_gen"
+    ENCAPS = "encaps"
+    DECAPS = "decaps"
+
+
+@dataclass(frozen=True)
+class Tuning:
+    r"""The settings an :class:`AutoTuner` uses for one operation.
+
+    Attributes:
+        | chunk_size (:type:`int`): The number of operations handed to a worker at a time.
+        | workers (:type:`int`): The number of worker threads.
+        | throughput (:type:`float`): The estimated throughput with these settings, in operations per second.
+        | latency (:type:`float`): The 95th percentile of the recent times a worker took for one chunk with these settings, in seconds.
+    """
+
+    chunk_size: int
+    workers: int
+    throughput: float
+    latency: float
+
+
+class _Estimate:
+    """A moving average of the throughput and the recent per-chunk latencies of one combination of settings."""
+
+    __slots__ = ("throughput", "latencies")
+
+    def __init__(self, throughput: float, latency: float) -> None:
+        self.throughput = throughput
+        self.latencies: deque[float] = deque([latency], maxlen=LATENCY_WINDOW)
+
+    @property
+    def latency(self) -> float:
+        # the 95th percentile of the recent latencies
+        latencies = sorted(self.latencies)
+        return latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))]
+
+    def add(self, throughput: float, latency: float, smoothing: float) -> None:
+        self.throughput = (1 - smoothing) * self.throughput + smoothing * throughput
+        self.latencies.append(latency)
+
+
+class _OperationTuner:
+    """Tracks estimates per worker count and chunk size for one operation and picks the best combination.
+
+    Every worker count in use has its own thread pool. Pools other than the one of the current choice are shut down
+    once no call is using them, so a change of choice never affects calls that are still running.
+    """
+
+    def __init__(
+        self,
+        workers: Sequence[int],
+        chunk_sizes: Sequence[int],
+        explore_every: int,
+        smoothing: float,
+        max_latency: float | None,
+    ) -> None:
+        self.worker_counts = list(workers)
+        self.chunk_sizes = list(chunk_sizes)
+        self.explore_every = explore_every
+        self.smoothing = smoothing
+        self.max_latency = max_latency
+        self.workers = self.worker_counts[0]
+        self.estimates: dict[tuple[int, int], _Estimate] = {}
+        self.executors: dict[int, ThreadPoolExecutor] = {}
+        self.users: dict[int, int] = {}
+        self.calls = 0
+        self.closed = False
+        self.lock = Lock()
+        self.released = Condition(self.lock)
+
+    @property
+    def tuning(self) -> Tuning:
+        with self.lock:
+            workers, chunk_size = self._best()
+            estimate = self.estimates[(workers, chunk_size)]
+            return Tuning(chunk_size, workers, estimate.throughput, estimate.latency)
+
+    def update(self, estimates: dict[tuple[int, int], _Estimate]) -> None:
+        with self.lock:
+            self.estimates = estimates
+            self.workers = self._best()[0]
+            self._retire_idle()
+
+    def next_settings(self) -> tuple[int, int]:
+        with self.lock:
+            self.calls += 1
+            best = self._best()
+            if self.calls % self.explore_every:
+                return best
+
+            # every so often try a neighbouring chunk size or worker count to follow changes in the load
+            workers, chunk_size = best
+            neighbours = [
+                (workers, size) for size in _neighbours(self.chunk_sizes, chunk_size)
+            ] + [
+                (count, chunk_size)
+                for count in _neighbours(self.worker_counts, workers)
+            ]
+            return (
+                neighbours[(self.calls // self.explore_every) % len(neighbours)]
+                if neighbours
+                else best
+            )
+
+    def observe(
+        self, workers: int, chunk_size: int, throughput: float, latency: float
+    ) -> None:
+        with self.lock:
+            estimate = self.estimates.get((workers, chunk_size))
+            if estimate is None:
+                self.estimates[(workers, chunk_size)] = _Estimate(throughput, latency)
+            else:
+                estimate.add(throughput, latency, self.smoothing)
+            self.workers = self._best()[0]
+            self._retire_idle()
+
+    def acquire(self, workers: int) -> ThreadPoolExecutor:
+        with self.lock:
+            if self.closed:
+                raise RuntimeError("Cannot run operations on a closed AutoTuner.")
+
+            executor = self.executors.get(workers)
+            if executor is None:
+                executor = self.executors[workers] = ThreadPoolExecutor(
+                    max_workers=workers, thread_name_prefix="mlkem"
+                )
+                self.users[workers] = 0
+            self.users[workers] += 1
+            return executor
+
+    def release(self, workers: int) -> None:
+        with self.lock:
+            self.users[workers] -= 1
+            if self.closed:
+                self.released.notify_all()
+            else:
+                self._retire_idle()
+
+    def close(self) -> None:
+        with self.lock:
+            self.closed = True
+            # let running calls finish on their pools, then shut every pool down
+            self.released.wait_for(lambda: not any(self.users.values()))
+            executors = list(self.executors.values())
+            self.executors.clear()
+            self.users.clear()
+        for executor in executors:
+            executor.shutdown()
+
+    def _best(self) -> tuple[int, int]:
+        settings = list(self.estimates)
+        if self.max_latency is not None:
+            max_latency = self.max_latency
+            within = [s for s in settings if self.estimates[s].latency <= max_latency]
+            if not within:
+                # nothing meets the latency budget, get as close to it as possible
+                return min(settings, key=lambda s: self.estimates[s].latency)
+            settings = within
+        return max(settings, key=lambda s: self.estimates[s].throughput)
+
+    def _retire_idle(self) -> None:
+        idle = [
+            workers
+            for workers, users in self.users.items()
+            if not users and workers != self.workers
+        ]
+        for workers in idle:
+            del self.users[workers]
+            # nothing is queued on an idle pool, so there is nothing to wait for
+            self.executors.pop(workers).shutdown(wait=False)
+
+
+class AutoTuner:
+    """Picks the chunk size and worker count for the bulk methods of an :class:`mlkem.ml_kem.ML_KEM` instance.
+
+    :func:`tune` measures the throughput of :func:`mlkem.ml_kem.ML_KEM.map_key_gen`,
+    :func:`mlkem.ml_kem.ML_KEM.map_encaps` and :func:`mlkem.ml_kem.ML_KEM.map_decaps` for every combination of
+    candidate chunk size and worker count, and keeps the fastest for each operation, or the fastest whose 95th
+    percentile time per chunk stays within :code:`max_latency` when given. The best settings depend on the
+    parameter set, the implementation (C extensions or pure python) and the host, which are all fixed by the
+    :class:`mlkem.ml_kem.ML_KEM` instance being tuned.
+
+    The :code:`map_*` methods of the tuner run the operations with the chosen settings, tuning first if needed. Each
+    call updates a moving average of the observed throughput and a window of the times a worker takes for one chunk, and every
+    :code:`explore_every` calls a neighbouring chunk size or worker count is tried instead, so both follow the live
+    load. Calls that are running keep their thread pool when the choice changes, and a pool that is no longer chosen
+    is shut down once its last call returns.
+    """
+
+    ml_kem: ML_KEM
+
+    def __init__(
+        self,
+        ml_kem: ML_KEM | None = None,
+        chunk_sizes: Sequence[int] = (1, 4, 16, 64, MAX_CHUNK_SIZE),
+        workers: Sequence[int] | None = None,
+        sample_size: int = 256,
+        explore_every: int = 16,
+        smoothing: float = 0.2,
+        max_latency: float | None = None,
+    ):
+        r"""Initialize the tuner. No measurements are taken until :func:`tune` or a :code:`map_*` method is called.
+
+        Args:
+            | ml_kem (:class:`mlkem.ml_kem.ML_KEM | None`): The instance to tune, :code:`ML_KEM()` if not given.
+            | chunk_sizes (:type:`Sequence[int]`): The candidate chunk sizes.
+            | workers (:type:`Sequence[int] | None`): The candidate worker counts, powers of two up to the CPU count if not given.
+            | sample_size (:type:`int`): The number of operations run per candidate while tuning.
+            | explore_every (:type:`int`): How often a neighbouring chunk size is tried, in calls.
+            | smoothing (:type:`float`): The weight of the latest observation in the throughput moving average.
+            | max_latency (:type:`float | None`): The largest acceptable 95th percentile time per chunk, in seconds. The fastest settings within it are chosen, or the ones closest to it if none are. Unbounded if not given.
+        """
+        cpus = cpu_count() or 1
+        if workers is None:
+            workers = sorted({min(1 << i, cpus) for i in range(cpus.bit_length() + 1)})
+
+        if not chunk_sizes or min(chunk_sizes) < 1:
+            raise ValueError(f"Chunk sizes must be positive (got {chunk_sizes}).")
+        if not workers or min(workers) < 1:
+            raise ValueError(f"Worker counts must be positive (got {workers}).")
+        if sample_size < 1:
+            raise ValueError(f"sample_size must be positive (got {sample_size}).")
+        if explore_every < 1:
+            raise ValueError(f"explore_every must be positive (got {explore_every}).")
+        if not 0 < smoothing <= 1:
+            raise ValueError(f"smoothing must be in (0, 1] (got {smoothing}).")
+        if max_latency is not None and max_latency <= 0:
+            raise ValueError(f"max_latency must be positive (got {max_latency}).")
+
+        self.ml_kem = ml_kem or ML_KEM()
+        self.workers = sorted(set(workers))
+        self.sample_size = sample_size
+        self._operations = {
+            op: _OperationTuner(
+                self.workers,
+                sorted(set(chunk_sizes)),
+                explore_every,
+                smoothing,
+                max_latency,
+            )
+            for op in Operation
+        }
+        self._tune_lock = RLock()
+
+    def __enter__(self) -> AutoTuner:
+        return self
+
+    def __exit__(self, *_: Any) -> None:
+        self.close()
+
+    @property
+    def choices(self) -> dict[Operation, Tuning]:
+        r"""The settings currently used for each operation that has been tuned."""
+        return {
+            op: tuner.tuning
+            for op, tuner in self._operations.items()
+            if tuner.estimates
+        }
+
+    def tune(
+        self, operations: Sequence[Operation] = tuple(Operation)
+    ) -> dict[Operation, Tuning]:
+        r"""Measure every candidate chunk size and worker count and choose the fastest for each operation.
+
+        Operations that were tuned before are measured again.
+
+        Args:
+            | operations (:type:`Sequence[Operation]`): The operations to tune, all of them if not given.
+
+        Returns:
+            :type:`dict[Operation, Tuning]`: The chosen settings for each operation.
+        """
+        with self._tune_lock:
+            runs = self._sample_runs()
+            for op in operations:
+                self._tune(op, runs[op])
+
+        return {op: self._operations[op].tuning for op in operations}
+
+    def map_key_gen(self, n: int) -> list[tuple[bytes, bytes]]:
+        r"""Run :func:`mlkem.ml_kem.ML_KEM.map_key_gen` with the tuned settings."""
+        return self._run(
+            Operation.KEY_GEN, n, lambda e, size: self.ml_kem.map_key_gen(n, e, size)
+        )
+
+    def map_encaps(self, eks: Sequence[bytes]) -> list[tuple[bytes, bytes]]:
+        r"""Run :func:`mlkem.ml_kem.ML_KEM.map_encaps` with the tuned settings."""
+        return self._run(
+            Operation.ENCAPS,
+            len(eks),
+            lambda e, size: self.ml_kem.map_encaps(eks, e, size),
+        )
+
+    def map_decaps(self, dks: Sequence[bytes], cs: Sequence[bytes]) -> list[bytes]:
+        r"""Run :func:`mlkem.ml_kem.ML_KEM.map_decaps` with the tuned settings."""
+        return self._run(
+            Operation.DECAPS,
+            len(dks),
+            lambda e, size: self.ml_kem.map_decaps(dks, cs, e, size),
+        )
+
+    def close(self) -> None:
+        r"""Wait for running calls to finish and shut down the worker threads."""
+        for tuner in self._operations.values():
+            tuner.close()
+
+    def _sample_runs(
+        self,
+    ) -> dict[Operation, Callable[[ThreadPoolExecutor, int], object]]:
+        n = self.sample_size
+        keypairs = self.ml_kem.key_gen_batch(n)
+        eks = [ek for ek, _ in keypairs]
+        dks = [dk for _, dk in keypairs]
+        cs = [c for _, c in self.ml_kem.encaps_batch(eks)]
+
+        return {
+            Operation.KEY_GEN: lambda e, size: self.ml_kem.map_key_gen(n, e, size),
+            Operation.ENCAPS: lambda e, size: self.ml_kem.map_encaps(eks, e, size),
+            Operation.DECAPS: lambda e, size: self.ml_kem.map_decaps(dks, cs, e, size),
+        }
+
+    def _tune(
+        self, op: Operation, run: Callable[[ThreadPoolExecutor, int], object]
+    ) -> None:
+        tuner = self._operations[op]
+        chunk_sizes = [
+            size for size in tuner.chunk_sizes if size <= self.sample_size
+        ] or tuner.chunk_sizes[:1]
+
+        measured: dict[tuple[int, int], _Estimate] = {}
+        for workers in self.workers:
+            with ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="mlkem-tuning"
+            ) as executor:
+                for size in chunk_sizes:
+                    start = perf_counter()
+                    run(executor, size)
+                    elapsed = perf_counter() - start
+                    measured[(workers, size)] = _Estimate(
+                        *_estimate(self.sample_size, workers, size, elapsed)
+                    )
+
+        tuner.update(measured)
+
+    def _run(
+        self, op: Operation, n: int, run: Callable[[ThreadPoolExecutor, int], Any]
+    ) -> Any:
+        tuner = self._operations[op]
+        with self._tune_lock:
+            if not tuner.estimates:
+                self._tune(op, self._sample_runs()[op])
+
+        workers, chunk_size = tuner.next_settings()
+        # the pool stays up until released, even if a concurrent tune() changes the choice
+        executor = tuner.acquire(workers)
+        try:
+            start = perf_counter()
+            result = run(executor, chunk_size)
+            elapsed = perf_counter() - start
+        finally:
+            tuner.release(workers)
+
+        # calls too small to give every worker a full chunk say little about the settings
+        if n >= chunk_size * workers and elapsed > 0:
+            tuner.observe(
+                workers, chunk_size, *_estimate(n, workers, chunk_size, elapsed)
+            )
+        return result
+
+
+def _neighbours(candidates: list[int], current: int) -> list[int]:
+    i = candidates.index(current)
+    return candidates[max(0, i - 1) : i] + candidates[i + 1 : i + 2]
+
+
+def _estimate(
+    n: int, workers: int, chunk_size: int, elapsed: float
+) -> tuple[float, float]:
+    """The throughput and the time per chunk of :code:`n` operations that took :code:`elapsed` seconds."""
+    chunks = -(-n // chunk_size)
+    # every worker runs its share of the chunks one after the other
+    rounds = -(-chunks // workers)
+    return n / elapsed, elapsed / rounds
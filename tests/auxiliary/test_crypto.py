@@ -0,0 +1,63 @@
+from hashlib import shake_128
+from os import urandom
+from unittest import TestCase
+
+from mlkem.auxiliary.crypto import (
+    XOF,
+    j,
+    j_from,
+    j_state,
+    prf,
+    prf_from,
+    prf_state,
+)
+
+from parameterized import parameterized  # type: ignore
+
+
+class TestCrypto(TestCase):
+    @parameterized.expand([2, 3])
+    def test_prf_from(self, eta: int) -> None:
+        s = urandom(32)
+        state = prf_state(s)
+
+        for N in range(8):
+            self.assertEqual(prf(eta, s, bytes([N])), prf_from(state, eta, bytes([N])))
+
+    def test_prf_from_invalid(self) -> None:
+        with self.assertRaises(ValueError):
+            prf_state(urandom(31))
+
+        state = prf_state(urandom(32))
+        with self.assertRaises(ValueError):
+            prf_from(state, 4, b"\x00")
+        with self.assertRaises(ValueError):
+            prf_from(state, 2, b"\x00\x00")
+
+    def test_j_from(self) -> None:
+        z = urandom(32)
+        state = j_state(z)
+
+        for _ in range(4):
+            c = urandom(768)
+            self.assertEqual(j(z + c), j_from(state, c))
+
+    @parameterized.expand([1, 3, 168, 839, 840, 1000])
+    def test_xof(self, length: int) -> None:
+        seed = urandom(34)
+        xof = XOF()
+        xof.absorb(seed[:32])
+        xof.absorb(seed[32:])
+
+        # squeeze well past the first chunk of 840 bytes
+        actual = b"".join(xof.squeeze(length) for _ in range(4000 // length + 1))
+
+        self.assertEqual(shake_128(seed).digest(len(actual)), actual)
+
+    def test_xof_absorb_after_squeeze(self) -> None:
+        xof = XOF()
+        xof.absorb(urandom(34))
+        xof.squeeze(3)
+
+        with self.assertRaises(ValueError):
+            xof.absorb(b"\x00")
@@ -1,3 +1,4 @@
+from os import urandom
 from random import randint
 from unittest import TestCase
 from unittest.mock import patch
@@ -8,10 +9,13 @@ from mlkem.auxiliary.general import (
     byte_encode,
     bytes_to_bits,
     compress,
+    compress_poly,
     decompress,
+    decompress_poly,
 )
 from mlkem.math.constants import n, q
 from mlkem.math.field import Zm
+from mlkem.math.polynomial_ring import PolynomialRing
 
 from parameterized import parameterized  # type: ignore
 
@@ -68,6 +72,43 @@ class TestGeneral(TestCase):
             actual = compress(d, decompress(d, y))
             self.assertEqual(y, actual)
 
+    @parameterized.expand([(d,) for d in range(1, 12)])
+    def test_compress_decompress(self, d: int) -> None:
+        m = 1 << d
+
+        for x in range(q):
+            # round(m * x / q) mod m, as in FIPS-203
+            expected = Zm((2 * m * x + q) // (2 * q), m)
+            self.assertEqual(expected, compress(d, Zm(x, q)))
+        for y in range(m):
+            expected = Zm((2 * q * y + m) // (2 * m), q)
+            self.assertEqual(expected, decompress(d, Zm(y, m)))
+
+    @parameterized.expand([(d,) for d in range(1, 12)])
+    def test_compress_poly(self, d: int) -> None:
+        f = PolynomialRing([Zm(randint(0, q - 1), q) for _ in range(n)])
+
+        compressed = compress_poly(d, f)
+        decompressed = decompress_poly(d, compressed)
+
+        self.assertEqual([compress(d, x) for x in f.coefficients], compressed)
+        self.assertEqual(
+            PolynomialRing([decompress(d, y) for y in compressed]), decompressed
+        )
+
+    def test_compress_poly_invalid(self) -> None:
+        f = PolynomialRing()
+
+        for d in (-1, 0, 12):
+            with self.assertRaises(ValueError):
+                compress_poly(d, f)
+            with self.assertRaises(ValueError):
+                decompress_poly(d, [Zm(0, 2)] * n)
+        with self.assertRaises(ValueError):
+            decompress_poly(12, [Zm(0, q)] * n)
+        with self.assertRaises(ValueError):
+            decompress_poly(4, [Zm(0, 1 << 5)] * n)
+
     @patch(
         "mlkem.auxiliary.general.n", 4
     )  # patch n to a smaller, more manageable, size
@@ -110,3 +151,25 @@ class TestGeneral(TestCase):
             actual = byte_decode(12, encoded)
 
             self.assertEqual(f, actual)
+
+    @parameterized.expand([(d,) for d in range(1, 13)])
+    def test_byte_encode_matches_bits(self, d: int) -> None:
+        # bits above the lowest d are ignored, so use values up to q for every d
+        f = [Zm(randint(0, q - 1), q) for _ in range(n)]
+        bits = [(x.val >> j) & 1 for x in f for j in range(d)]
+
+        self.assertEqual(bytes(bits_to_bytes(bits)), byte_encode(d, f))
+
+    @parameterized.expand([(d,) for d in range(1, 13)])
+    def test_byte_decode_matches_bits(self, d: int) -> None:
+        m = q if d == 12 else 1 << d
+        # trailing bytes are ignored
+        b = urandom(32 * d + 1)
+        bits = bytes_to_bits(list(b))
+        expected = [
+            Zm(sum(bits[i * d + j] << j for j in range(d)), m) for i in range(n)
+        ]
+
+        self.assertEqual(expected, byte_decode(d, b))
+        with self.assertRaises(ValueError):
+            byte_decode(d, b[: 32 * d - 1])
@@ -1,7 +1,18 @@
+from random import randrange
 from unittest import TestCase
 
-from mlkem.auxiliary.ntt import ntt, ntt_inv
-from mlkem.math.constants import q
+from mlkem.auxiliary.ntt import (
+    GAMMA_LOOKUP,
+    multiply_ntt,
+    multiply_ntt_ints,
+    ntt,
+    ntt_ints,
+    ntt_ints_inplace,
+    ntt_inv,
+    ntt_inv_ints,
+    ntt_inv_ints_inplace,
+)
+from mlkem.math.constants import n, q
 from mlkem.math.field import Zm
 from mlkem.math.polynomial_ring import PolynomialRing, RingRepresentation
 
@@ -87,3 +98,52 @@ class TestNTT(TestCase):
         actual = ntt_inv(f_)
 
         self.assertEqual(expected, actual)
+
+    def test_ntt_does_not_modify_input(self) -> None:
+        values = [randrange(q) for _ in range(n)]
+        f = PolynomialRing.from_values(list(values))
+
+        f_ = ntt(f)
+        self.assertEqual(values, f.values)
+
+        ntt_inv(f_)
+        self.assertEqual(ntt(f), f_)
+
+    def test_ntt_ints(self) -> None:
+        f = [randrange(q) for _ in range(n)]
+
+        f_ = ntt_ints(f)
+        in_place = list(f)
+        ntt_ints_inplace(in_place)
+
+        self.assertEqual(ntt(PolynomialRing.from_values(list(f))).values, f_)
+        self.assertEqual(f_, in_place)
+        self.assertEqual(f, ntt_inv_ints(f_))
+        ntt_inv_ints_inplace(in_place)
+        self.assertEqual(f, in_place)
+
+    def test_ntt_ints_wrong_size(self) -> None:
+        with self.assertRaises(ValueError):
+            ntt_ints([0] * (n - 1))
+        with self.assertRaises(ValueError):
+            ntt_inv_ints([0] * (n + 1))
+        with self.assertRaises(ValueError):
+            multiply_ntt_ints([0] * n, [0])
+
+    def test_multiply_ntt(self) -> None:
+        f = [Zm(randrange(q), q) for _ in range(n)]
+        g = [Zm(randrange(q), q) for _ in range(n)]
+        expected = []
+        for i in range(n // 2):
+            a0, a1, b0, b1 = f[2 * i], f[2 * i + 1], g[2 * i], g[2 * i + 1]
+            expected += [a0 * b0 + a1 * b1 * GAMMA_LOOKUP[i], a0 * b1 + a1 * b0]
+
+        actual = multiply_ntt(
+            PolynomialRing(f, RingRepresentation.NTT),
+            PolynomialRing(g, RingRepresentation.NTT),
+        )
+
+        self.assertEqual(PolynomialRing(expected, RingRepresentation.NTT), actual)
+        self.assertEqual(
+            actual.values, multiply_ntt_ints([x.val for x in f], [x.val for x in g])
+        )
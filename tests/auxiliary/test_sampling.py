@@ -0,0 +1,34 @@
+from os import urandom
+from unittest import TestCase
+
+from mlkem.auxiliary.general import bytes_to_bits
+from mlkem.auxiliary.sampling import sample_poly_cbd
+from mlkem.math.constants import n, q
+from mlkem.math.polynomial_ring import RingRepresentation
+
+from parameterized import parameterized  # type: ignore
+
+
+class TestSampling(TestCase):
+    @parameterized.expand([(1,), (2,), (3,), (4,)])
+    def test_sample_poly_cbd(self, eta: int) -> None:
+        b = urandom(64 * eta)
+        # the coefficients as defined by FIPS-203 (Algorithm 8)
+        bits = bytes_to_bits(list(b))
+        expected = [
+            (
+                sum(bits[2 * i * eta + j] for j in range(eta))
+                - sum(bits[2 * i * eta + eta + j] for j in range(eta))
+            )
+            % q
+            for i in range(n)
+        ]
+
+        actual = sample_poly_cbd(eta, b)
+
+        self.assertEqual(expected, actual.values)
+        self.assertEqual(RingRepresentation.STANDARD, actual.representation)
+
+    def test_sample_poly_cbd_wrong_size(self) -> None:
+        with self.assertRaises(ValueError):
+            sample_poly_cbd(2, urandom(64 * 3))
@@ -3,7 +3,21 @@ from random import randint
 from unittest import TestCase
 
 from mlkem.auxiliary.sampling import sample_ntt
-from mlkem.fastmath import byte_decode_matrix, byte_encode_matrix, mul_matrix, ntt_inv  # type: ignore
+from mlkem.fastmath import (  # type: ignore
+    byte_decode_matrix,
+    byte_encode_matrix,
+    decrypt_batch,
+    decrypt_prepared,
+    encrypt_batch,
+    key_gen_batch,
+    mul_matrix,
+    encrypt_prepared,
+    ntt_inv,
+    prepare_decryption_key,
+    prepare_encryption_key,
+    validate_ek,
+    validate_eks,
+)
 from mlkem.math.constants import n, q
 from mlkem.math.matrix import Matrix
 from mlkem.math.polynomial_ring import PolynomialRing
@@ -68,3 +82,47 @@ class TestFastMath(TestCase):
         actual = byte_decode_matrix(encoded, d, k)
 
         self.assertEqual(expected, actual)
+
+    def test_batch_parameters_out_of_range(self) -> None:
+        # the buffer sizes are consistent with the parameters, only the parameters themselves are out of range
+        for k, eta, message in [(1, 2, "k"), (5, 2, "k"), (2, 1, "eta"), (2, 4, "eta")]:
+            with self.assertRaisesRegex(ValueError, f"^{message} must"):
+                key_gen_batch(bytes(k * k), 1, bytes(128 * eta * k), k, eta, 1)
+
+        for du, dv in [(0, 4), (12, 4), (10, 0), (10, 12)]:
+            c = bytes(32 * (2 * du + dv))
+            with self.assertRaisesRegex(ValueError, "^du and dv must"):
+                encrypt_batch(
+                    bytes(768), bytes(4), 1, bytes(640), bytes(32), 2, 2, 2, du, dv, 1
+                )
+            with self.assertRaisesRegex(ValueError, "^du and dv must"):
+                decrypt_batch(bytes(768), c, 2, du, dv, 1)
+
+    def test_validate_k_out_of_range(self) -> None:
+        for k in (0, 1, 5):
+            with self.assertRaisesRegex(ValueError, "^k must"):
+                validate_ek(bytes(384 * k + 32), k)
+            with self.assertRaisesRegex(ValueError, "^k must"):
+                validate_eks(bytes(384 * k + 32), 1, k)
+
+    def test_prepared_encryption_parameters_out_of_range(self) -> None:
+        for k in (1, 5):
+            with self.assertRaisesRegex(ValueError, "^k must"):
+                prepare_encryption_key(bytes(384 * k), bytes(k * k), 1, k, False)
+
+        key = prepare_encryption_key(bytes(768), bytes(4), 1, 2, False)
+        for eta, du in [(1, 10), (4, 10), (2, 0), (2, 12)]:
+            with self.assertRaisesRegex(ValueError, "^(eta|du and dv) must"):
+                encrypt_prepared(
+                    key, bytes(64 * 5 * eta), bytes(32), 2, eta, eta, du, 4
+                )
+
+    def test_prepared_decryption_parameters_out_of_range(self) -> None:
+        for k in (1, 5):
+            with self.assertRaisesRegex(ValueError, "^k must"):
+                prepare_decryption_key(bytes(384 * k), k)
+
+        key = prepare_decryption_key(bytes(768), 2)
+        for du, dv in [(0, 4), (12, 4), (10, 0), (10, 12)]:
+            with self.assertRaisesRegex(ValueError, "^du and dv must"):
+                decrypt_prepared(key, bytes(32 * (2 * du + dv)), 2, du, dv)
@@ -0,0 +1,42 @@
+from copy import copy
+from pickle import dumps, loads
+from unittest import TestCase
+
+from mlkem.math.constants import q
+from mlkem.math.field import MAX_INTERNED_MODULUS, Zm
+
+from parameterized import parameterized  # type: ignore
+
+
+class TestZm(TestCase):
+    @parameterized.expand([(q,), (1 << 10,), (MAX_INTERNED_MODULUS,)])
+    def test_interned(self, m: int) -> None:
+        a = Zm(m - 1, m)
+        b = Zm(2, m)
+
+        self.assertIs(Zm(1, m), a + b)
+        self.assertIs(Zm(-3, m), a - b)
+        self.assertIs(Zm(m - 2, m), a * b)
+        self.assertIs(a, loads(dumps(a)))
+        self.assertIs(a, copy(a))
+
+    def test_not_interned(self) -> None:
+        m = MAX_INTERNED_MODULUS + 1
+        a = Zm(m + 5, m)
+
+        self.assertEqual(5, a.val)
+        self.assertEqual(Zm(5, m), a)
+        self.assertEqual(a, loads(dumps(a)))
+
+    def test_eq(self) -> None:
+        self.assertEqual(Zm(q + 1, q), Zm(1, q))
+        self.assertNotEqual(Zm(1, q), Zm(1, 1 << 10))
+        self.assertNotEqual(Zm(1, q), 1)
+
+    def test_immutable(self) -> None:
+        a = Zm(1, q)
+
+        with self.assertRaises(AttributeError):
+            a.val = 2
+        self.assertEqual(1, Zm(1, q).val)
+        self.assertFalse(hasattr(a, "__dict__"))
@@ -1,5 +1,8 @@
+from os import urandom
 from unittest import TestCase
 
+from mlkem.auxiliary.ntt import multiply_ntt
+from mlkem.auxiliary.sampling import sample_ntt
 from mlkem.math.matrix import Matrix
 
 
@@ -50,3 +53,43 @@ class TestMatrix(TestCase):
 
         self.assertEqual(expected, actual)
         self.assertEqual(a, actual.transpose())
+
+    def test_matvec(self) -> None:
+        a = Matrix(rows=3, cols=2, entries=[1, 2, 3, 4, 5, 6])
+        v = Matrix(rows=2, cols=1, entries=[7, 8])
+        w = Matrix(rows=3, cols=1, entries=[9, 10, 11])
+
+        self.assertEqual(a * v, a.matvec(v))
+        self.assertEqual(a.transpose() * w, a.matvec_transposed(w))
+        self.assertEqual(9 * 7 + 10 * 8 + 11 * 9, w.dot(Matrix(3, 1, [7, 8, 9])))
+
+        with self.assertRaises(ValueError):
+            a.matvec(w)
+        with self.assertRaises(ValueError):
+            a.matvec_transposed(v)
+        with self.assertRaises(ValueError):
+            v.dot(w)
+
+    def test_matvec_ntt(self) -> None:
+        a = Matrix(rows=2, cols=3, entries=[sample_ntt(urandom(34)) for _ in range(6)])
+        v = Matrix(rows=3, cols=1, entries=[sample_ntt(urandom(34)) for _ in range(3)])
+        w = Matrix(rows=2, cols=1, entries=[sample_ntt(urandom(34)) for _ in range(2)])
+
+        expected = Matrix(
+            rows=2,
+            cols=1,
+            entries=[
+                multiply_ntt(a[(i, 0)], v[(0, 0)])
+                + multiply_ntt(a[(i, 1)], v[(1, 0)])
+                + multiply_ntt(a[(i, 2)], v[(2, 0)])
+                for i in range(2)
+            ],
+        )
+
+        self.assertEqual(expected, a.matvec(v))
+        self.assertEqual(expected, a * v)
+        self.assertEqual(a.transpose().matvec(w), a.matvec_transposed(w))
+        self.assertEqual(
+            multiply_ntt(w[(0, 0)], w[(0, 0)]) + multiply_ntt(w[(1, 0)], w[(1, 0)]),
+            w.dot(w),
+        )
@@ -1,8 +1,9 @@
 import unittest
 
+from mlkem.auxiliary.ntt import ntt, ntt_ints
 from mlkem.math.constants import n, q
 from mlkem.math.field import Zm
-from mlkem.math.polynomial_ring import PolynomialRing
+from mlkem.math.polynomial_ring import PolynomialRing, RingRepresentation
 
 
 class TestRingZnq(unittest.TestCase):
@@ -44,3 +45,102 @@ class TestRingZnq(unittest.TestCase):
         for i in range(n):
             expected = Zm(i, q) * a
             self.assertEqual(expected, h[i])
+
+    def test_sub(self) -> None:
+        f = PolynomialRing([Zm(i, q) for i in range(n)])
+        g = PolynomialRing([Zm(2 * i, q) for i in range(n)])
+
+        h = f - g
+
+        for i in range(n):
+            self.assertEqual(Zm(-i, q), h[i])
+
+    def test_setitem(self) -> None:
+        f = PolynomialRing()
+        f[3] = Zm(q + 5, q)
+
+        self.assertEqual(Zm(5, q), f[3])
+        self.assertEqual(5, f.values[3])
+
+    def test_from_values(self) -> None:
+        values = [i % q for i in range(n)]
+
+        f = PolynomialRing.from_values(values)
+
+        self.assertEqual(PolynomialRing([Zm(i, q) for i in range(n)]), f)
+        with self.assertRaises(ValueError):
+            PolynomialRing.from_values([0])
+
+    def test_coefficients_view(self) -> None:
+        f = PolynomialRing([Zm(i, q) for i in range(n)])
+        f_ = f.to_ntt()
+
+        f.coefficients[0] = Zm(1, q)
+        f.coefficients[2:4] = [Zm(5, q), Zm(6, q)]
+
+        self.assertEqual([1, 1, 5, 6, 4], f.values[:5])
+        self.assertEqual([Zm(i, q) for i in (1, 1, 5, 6)], f.coefficients[:4])
+        self.assertEqual(f.coefficients, [f[i] for i in range(n)])
+        self.assertEqual(n, len(f.coefficients))
+        # the write discarded the cached NTT
+        self.assertNotEqual(f_, f.to_ntt())
+        self.assertFalse(hasattr(f, "__dict__"))
+        with self.assertRaises(ValueError):
+            f.coefficients[0:2] = [Zm(0, q)]
+
+    def test_coefficients_other_modulus(self) -> None:
+        f = PolynomialRing()
+
+        with self.assertRaises(ValueError):
+            PolynomialRing([Zm(1, 17)] * n)
+        with self.assertRaises(ValueError):
+            f[0] = Zm(1, 17)
+        with self.assertRaises(ValueError):
+            f.coefficients[0] = Zm(1, 17)
+        with self.assertRaises(ValueError):
+            f.coefficients = [Zm(1, 17)] * n
+
+    def test_to_ntt_is_cached(self) -> None:
+        f = PolynomialRing([Zm(i, q) for i in range(n)])
+
+        f_ = f.to_ntt()
+
+        self.assertEqual(RingRepresentation.NTT, f_.representation)
+        self.assertEqual(ntt_ints(f.values), f_.values)
+        self.assertIs(f_, f_.to_ntt())
+        self.assertEqual(f, f_.to_standard())
+        # the second conversion reuses the first one, but returns a copy
+        self.assertEqual(f_, f.to_ntt())
+        self.assertIsNot(f_.values, f.to_ntt().values)
+
+    def test_setitem_invalidates_cache(self) -> None:
+        f = PolynomialRing([Zm(i, q) for i in range(n)])
+        f_ = f.to_ntt()
+
+        f[0] = Zm(1, q)
+        f_[0] = Zm(1, q)
+
+        self.assertEqual(ntt_ints(f.values), f.to_ntt().values)
+        self.assertEqual(f_, f_.to_standard().to_ntt())
+
+    def test_add_mixed_representations(self) -> None:
+        f = PolynomialRing([Zm(i, q) for i in range(n)])
+        g = PolynomialRing([Zm(2 * i, q) for i in range(n)])
+
+        self.assertEqual(f + g, f + ntt(g))
+        self.assertEqual(ntt(f) - ntt(g), f.to_ntt() - g)
+        # neither has been converted
+        with self.assertRaises(ValueError):
+            PolynomialRing(g.coefficients) + PolynomialRing(
+                g.coefficients, RingRepresentation.NTT
+            )
+
+    def test_mul_uses_cached_ntt(self) -> None:
+        f = PolynomialRing([Zm(i, q) for i in range(n)])
+        g = PolynomialRing([Zm(2 * i, q) for i in range(n)])
+
+        expected = ntt(f) * ntt(g)
+
+        self.assertEqual(expected, ntt(f).to_standard() * ntt(g))
+        with self.assertRaises(ValueError):
+            PolynomialRing(f.coefficients) * ntt(g)
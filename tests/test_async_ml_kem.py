@@ -0,0 +1,77 @@
+import asyncio
+from unittest import IsolatedAsyncioTestCase
+from unittest.mock import patch
+
+from mlkem.async_ml_kem import AsyncML_KEM
+from mlkem.ml_kem import ML_KEM
+
+
+class TestAsyncML_KEM(IsolatedAsyncioTestCase):
+    async def test_encaps_decaps(self) -> None:
+        async with AsyncML_KEM(max_batch_size=8, max_wait_us=10_000) as kem:
+            ek, dk = kem.ml_kem.key_gen()
+
+            with patch.object(
+                ML_KEM, "encaps_batch", autospec=True, side_effect=ML_KEM.encaps_batch
+            ) as encaps_batch:
+                encapsulations = await asyncio.gather(
+                    *[kem.encaps(ek) for _ in range(20)]
+                )
+
+            shared_keys = await asyncio.gather(
+                *[kem.decaps(dk, c) for _, c in encapsulations]
+            )
+
+        self.assertEqual([k for k, _ in encapsulations], shared_keys)
+        self.assertEqual(20, len({c for _, c in encapsulations}))
+        # 20 concurrent requests with at most 8 per batch
+        self.assertEqual(3, encaps_batch.call_count)
+
+    async def test_requests_arriving_while_waiting(self) -> None:
+        async with AsyncML_KEM(max_batch_size=64, max_wait_us=1_000) as kem:
+            ek, _ = kem.ml_kem.key_gen()
+
+            async def encaps(delay: float) -> tuple[bytes, bytes]:
+                await asyncio.sleep(delay)
+                return await kem.encaps(ek)
+
+            # requests trickle in around the end of the wait for a batch, none of them may be lost
+            results = await asyncio.wait_for(
+                asyncio.gather(*[encaps(i / 20_000) for i in range(200)]), 30
+            )
+
+        self.assertEqual(200, len({c for _, c in results}))
+
+    async def test_invalid_input(self) -> None:
+        async with AsyncML_KEM() as kem:
+            ek, dk = kem.ml_kem.key_gen()
+            _, c = kem.ml_kem.encaps(ek)
+
+            with self.assertRaises(ValueError):
+                await kem.encaps(ek[:-1])
+            with self.assertRaises(ValueError):
+                await kem.decaps(dk, c[:-1])
+
+    async def test_closed(self) -> None:
+        kem = AsyncML_KEM()
+        ek, dk = kem.ml_kem.key_gen()
+        _, c = await kem.encaps(ek)
+        await kem.aclose()
+
+        with self.assertRaises(RuntimeError):
+            await kem.encaps(ek)
+        with self.assertRaises(RuntimeError):
+            await kem.decaps(dk, c)
+        self.assertIsNone(kem._encaps.task)
+
+    async def test_backpressure(self) -> None:
+        async with AsyncML_KEM(max_batch_size=1, max_wait_us=0, max_pending=1) as kem:
+            ek, _ = kem.ml_kem.key_gen()
+            tasks = [asyncio.create_task(kem.encaps(ek)) for _ in range(4)]
+            await asyncio.sleep(0)
+
+            # one request is being processed and one is queued, the rest wait for room in the queue
+            self.assertLessEqual(kem._encaps.queue.qsize(), 1)
+            results = await asyncio.gather(*tasks)
+
+        self.assertEqual(4, len(results))
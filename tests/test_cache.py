@@ -0,0 +1,286 @@
+import pickle
+from multiprocessing import get_context
+from multiprocessing.synchronize import Lock as LockType
+from os import urandom
+from random import randrange
+from unittest import TestCase
+
+from mlkem.cache import DecapsulationCache, MatrixCache, SharedMatrixCache
+from mlkem.fast_k_pke import Fast_K_PKE
+from mlkem.math.constants import n, q
+from mlkem.ml_kem import ML_KEM
+from mlkem.parameter_set import ML_KEM_512
+
+
+def random_matrix(k: int) -> list[list[int]]:
+    return [[randrange(q) for _ in range(n)] for _ in range(k * k)]
+
+
+def put_in_child(
+    name: str, lock: LockType | None, rho: bytes, a: list[list[int]]
+) -> None:
+    cache = SharedMatrixCache.attach(name, lock)
+    cache.put(3, rho, a)
+    cache.close()
+
+
+def put_inherited(cache: SharedMatrixCache, rho: bytes, a: list[list[int]]) -> None:
+    cache.put(3, rho, a)
+    cache.close()
+
+
+class TestMatrixCache(TestCase):
+    def test_get_put(self) -> None:
+        cache = MatrixCache()
+        a = random_matrix(3)
+
+        self.assertIsNone(cache.get(3, b"\x00" * 32))
+        cache.put(3, b"\x00" * 32, a)
+        self.assertEqual(a, cache.get(3, b"\x00" * 32))
+        # the seed is only valid for the same dimension
+        self.assertIsNone(cache.get(2, b"\x00" * 32))
+
+        self.assertEqual(1, cache.hits)
+        self.assertEqual(2, cache.misses)
+        self.assertEqual(1, len(cache))
+
+    def test_lru_eviction(self) -> None:
+        cache = MatrixCache(max_entries=2)
+        a, b, c = random_matrix(2), random_matrix(2), random_matrix(2)
+
+        cache.put(2, b"a", a)
+        cache.put(2, b"b", b)
+        cache.get(2, b"a")
+        cache.put(2, b"c", c)
+
+        self.assertEqual(a, cache.get(2, b"a"))
+        self.assertIsNone(cache.get(2, b"b"))
+        self.assertEqual(c, cache.get(2, b"c"))
+
+    def test_max_bytes(self) -> None:
+        cache = MatrixCache(compact=True, max_bytes=2 * 4 * 384)
+        for i in range(4):
+            cache.put(2, bytes([i]), random_matrix(2))
+
+        self.assertEqual(2, len(cache))
+        self.assertEqual(2 * 4 * 384, cache.size)
+
+        # matrices larger than the budget are not cached at all
+        cache.put(3, b"large", random_matrix(3))
+        self.assertIsNone(cache.get(3, b"large"))
+        self.assertEqual(2, len(cache))
+
+    def test_compact(self) -> None:
+        cache = MatrixCache(compact=True)
+        a = random_matrix(4)
+        cache.put(4, b"rho", a)
+
+        self.assertEqual(a, cache.get(4, b"rho"))
+        self.assertEqual(16 * 384, cache.size)
+
+    def test_generate_a_copies(self) -> None:
+        cache = MatrixCache()
+        pke = Fast_K_PKE(ML_KEM_512, a_cache=cache)
+        rho = urandom(32)
+        a = pke._generate_a(rho)
+        expected = [list(f) for f in a]
+
+        # modifying the returned matrix, whether from a miss or a hit, leaves the cache intact
+        a[0][0] += 1
+        pke._generate_a(rho)[0][0] += 1
+        self.assertEqual(expected, pke._generate_a(rho))
+
+    def test_clear(self) -> None:
+        cache = MatrixCache()
+        cache.put(2, b"rho", random_matrix(2))
+        cache.get(2, b"rho")
+        cache.clear()
+
+        self.assertEqual(
+            (0, 0, 0, 0), (len(cache), cache.size, cache.hits, cache.misses)
+        )
+
+    def test_pickle(self) -> None:
+        cache = MatrixCache(max_entries=4, max_bytes=1 << 20, compact=True)
+        cache.put(2, b"rho", random_matrix(2))
+        copy = pickle.loads(pickle.dumps(cache))
+
+        self.assertEqual(
+            (4, 1 << 20, True), (copy.max_entries, copy.max_bytes, copy.compact)
+        )
+        self.assertEqual(0, len(copy))
+
+    def test_invalid_arguments(self) -> None:
+        with self.assertRaises(ValueError):
+            MatrixCache(max_entries=0)
+        with self.assertRaises(ValueError):
+            MatrixCache(max_bytes=0)
+
+
+class TestSharedMatrixCache(TestCase):
+    def test_get_put(self) -> None:
+        with SharedMatrixCache(slots=8) as cache:
+            rho = urandom(32)
+            a = random_matrix(3)
+
+            self.assertIsNone(cache.get(3, rho))
+            cache.put(3, rho, a)
+            self.assertEqual(a, cache.get(3, rho))
+            self.assertIsNone(cache.get(2, rho))
+
+            self.assertEqual((1, 2, 1), (cache.hits, cache.misses, len(cache)))
+
+    def test_replaces_oldest(self) -> None:
+        with SharedMatrixCache(slots=2) as cache:
+            rhos = [urandom(32) for _ in range(3)]
+            for rho in rhos:
+                cache.put(2, rho, random_matrix(2))
+
+            self.assertEqual(2, len(cache))
+            self.assertIsNone(cache.get(2, rhos[0]))
+            self.assertIsNotNone(cache.get(2, rhos[2]))
+
+    def test_attach(self) -> None:
+        with SharedMatrixCache(slots=8) as cache:
+            rho = urandom(32)
+            a = random_matrix(2)
+            reader = SharedMatrixCache.attach(cache.name)
+
+            self.assertTrue(reader.read_only)
+            reader.put(2, rho, a)
+            self.assertIsNone(cache.get(2, rho))
+
+            cache.put(2, rho, a)
+            self.assertEqual(a, reader.get(2, rho))
+            reader.close()
+
+    def test_other_process(self) -> None:
+        for method in ("fork", "spawn"):
+            context = get_context(method)
+            with (
+                self.subTest(method=method),
+                SharedMatrixCache(slots=8, mp_context=context) as cache,
+            ):
+                rho = urandom(32)
+                a = random_matrix(3)
+                process = context.Process(  # type: ignore[attr-defined]
+                    target=put_in_child, args=(cache.name, cache.lock, rho, a)
+                )
+                process.start()
+                process.join()
+
+                self.assertEqual(0, process.exitcode)
+                self.assertEqual(a, cache.get(3, rho))
+
+    def test_fork_inherits_lock(self) -> None:
+        context = get_context("fork")
+        with SharedMatrixCache(slots=8, mp_context=context) as cache:
+            rho = urandom(32)
+            a = random_matrix(3)
+            process = context.Process(target=put_inherited, args=(cache, rho, a))
+            process.start()
+            process.join()
+
+            self.assertEqual(0, process.exitcode)
+            self.assertEqual(a, cache.get(3, rho))
+
+    def test_spawn_copy_read_only(self) -> None:
+        context = get_context("spawn")
+        with SharedMatrixCache(slots=8, mp_context=context) as cache:
+            rho = urandom(32)
+            process = context.Process(
+                target=put_inherited, args=(cache, rho, random_matrix(3))
+            )
+            process.start()
+            process.join()
+
+            self.assertEqual(0, process.exitcode)
+            self.assertIsNone(cache.get(3, rho))
+
+    def test_pickle_read_only(self) -> None:
+        with SharedMatrixCache(slots=8) as cache:
+            copy = pickle.loads(pickle.dumps(cache))
+
+            self.assertTrue(copy.read_only)
+            self.assertEqual(cache.name, copy.name)
+            copy.close()
+
+    def test_ml_kem(self) -> None:
+        with SharedMatrixCache() as cache:
+            ml_kem = ML_KEM(a_cache=cache)
+            ek, dk = ml_kem.key_gen()
+            k, c = ml_kem.encaps(ek)
+
+            self.assertEqual(k, ml_kem.decaps(dk, c))
+            self.assertEqual(1, len(cache))
+            self.assertEqual(2, cache.hits)
+
+    def test_invalid_arguments(self) -> None:
+        with self.assertRaises(ValueError):
+            SharedMatrixCache(slots=0)
+
+
+class TestDecapsulationCache(TestCase):
+    def test_get_put(self) -> None:
+        cache = DecapsulationCache()
+        key_id, c, shared_key = urandom(64), urandom(768), urandom(32)
+
+        self.assertIsNone(cache.get(key_id, c))
+        cache.put(key_id, c, shared_key)
+        self.assertEqual(shared_key, cache.get(key_id, c))
+        self.assertIsNone(cache.get(urandom(64), c))
+
+        self.assertEqual((1, 2, 1), (cache.hits, cache.misses, len(cache)))
+
+    def test_ttl(self) -> None:
+        now = [0.0]
+        cache = DecapsulationCache(ttl=5, clock=lambda: now[0])
+        cache.put(b"id", b"a", b"k")
+        now[0] = 3
+        cache.put(b"id", b"b", b"k")
+        now[0] = 6
+
+        self.assertIsNone(cache.get(b"id", b"a"))
+        self.assertEqual(b"k", cache.get(b"id", b"b"))
+        self.assertEqual(1, len(cache))
+
+    def test_max_entries(self) -> None:
+        cache = DecapsulationCache(max_entries=2)
+        for c in (b"a", b"b", b"c"):
+            cache.put(b"id", c, c)
+
+        self.assertIsNone(cache.get(b"id", b"a"))
+        self.assertEqual(b"c", cache.get(b"id", b"c"))
+        self.assertEqual(2, len(cache))
+
+    def test_ml_kem(self) -> None:
+        cache = DecapsulationCache()
+        ml_kem = ML_KEM(decaps_cache=cache)
+        ek, dk = ml_kem.key_gen()
+        k, c = ml_kem.encaps(ek)
+        tampered = bytes([c[0] ^ 1]) + c[1:]
+        rejected = ML_KEM().decaps(dk, tampered)
+
+        for _ in range(2):
+            self.assertEqual(k, ml_kem.decaps(dk, c))
+            self.assertEqual(rejected, ml_kem.decaps(dk, tampered))
+        # prepared keys share the entries of their bytes
+        prepared = ml_kem.prepare_decapsulation_key(dk)
+        self.assertEqual(k, ml_kem.decaps(prepared, c))
+        self.assertEqual(rejected, ml_kem.decaps(prepared, tampered))
+
+        self.assertEqual((4, 2), (cache.hits, cache.misses))
+
+    def test_pickle(self) -> None:
+        cache = DecapsulationCache(max_entries=4, ttl=1.5)
+        cache.put(b"id", b"c", b"k")
+        copy = pickle.loads(pickle.dumps(cache))
+
+        self.assertEqual((4, 1.5), (copy.max_entries, copy.ttl))
+        self.assertEqual(0, len(copy))
+
+    def test_invalid_arguments(self) -> None:
+        with self.assertRaises(ValueError):
+            DecapsulationCache(max_entries=0)
+        with self.assertRaises(ValueError):
+            DecapsulationCache(ttl=0)
@@ -0,0 +1,110 @@
+from concurrent.futures import wait
+from concurrent.futures.process import BrokenProcessPool
+from unittest import TestCase
+
+from parameterized import parameterized  # type: ignore
+
+from mlkem import _shm
+from mlkem.engine import ProcessEngine, SlotLayout
+from mlkem.ml_kem import ML_KEM
+from mlkem.parameter_set import ML_KEM_512, ML_KEM_768, ML_KEM_1024, ParameterSet
+
+
+class TestProcessEngine(TestCase):
+    @parameterized.expand(
+        [
+            ("ML_KEM_512", ML_KEM_512),
+            ("ML_KEM_768", ML_KEM_768),
+            ("ML_KEM_1024", ML_KEM_1024),
+        ]
+    )
+    def test_slot_layout(self, _: str, params: ParameterSet) -> None:
+        ml_kem = ML_KEM(params)
+        ek, dk = ml_kem.key_gen()
+        c = ml_kem.encaps(ek)[1]
+        layout = SlotLayout.from_parameters(params)
+
+        self.assertEqual(len(ek), layout.ek_size)
+        self.assertEqual(len(dk), layout.dk_size)
+        self.assertEqual(len(c), layout.c_size)
+        self.assertEqual(len(dk) + len(c), layout.request_size)
+        self.assertEqual(len(ek) + len(dk), layout.response_size)
+
+    def test_engine(self) -> None:
+        with ProcessEngine(workers=2, slots_per_worker=4, pin_cpus=True) as engine:
+            keypairs = [
+                f.result() for f in [engine.submit_key_gen() for _ in range(10)]
+            ]
+            encapsulations = [
+                f.result() for f in [engine.submit_encaps(ek) for ek, _ in keypairs]
+            ]
+            shared_keys = [
+                f.result()
+                for f in [
+                    engine.submit_decaps(dk, c)
+                    for (_, dk), (_, c) in zip(keypairs, encapsulations)
+                ]
+            ]
+
+        self.assertEqual(10, len({ek for ek, _ in keypairs}))
+        self.assertEqual([k for k, _ in encapsulations], shared_keys)
+
+        ml_kem = ML_KEM()
+        for (ek, dk), (k, c) in zip(keypairs, encapsulations):
+            self.assertEqual(k, ml_kem.decaps(dk, c))
+
+    def test_invalid_arguments(self) -> None:
+        with self.assertRaises(ValueError):
+            ProcessEngine(workers=0)
+        with self.assertRaises(ValueError):
+            ProcessEngine(workers=1, slots_per_worker=0)
+
+    def test_broken_worker(self) -> None:
+        with ProcessEngine(ML_KEM_512, workers=1, slots_per_worker=2) as engine:
+            engine.key_gen()
+            worker = engine._workers[0]
+            worker.process.kill()
+            worker.reader.join()
+
+            # more submissions than slots, none of them blocks
+            for _ in range(4):
+                with self.assertRaises(BrokenProcessPool):
+                    engine.submit_key_gen().result()
+
+    def test_invalid_input(self) -> None:
+        with ProcessEngine(ML_KEM_512, workers=1) as engine:
+            ek, dk = engine.key_gen()
+            _, c = engine.encaps(ek)
+
+            with self.assertRaises(ValueError):
+                engine.submit_encaps(ek[:-1])
+            with self.assertRaises(ValueError):
+                engine.submit_decaps(dk, c[:-1])
+
+    def test_slots_zeroed(self) -> None:
+        engine = ProcessEngine(ML_KEM_512, workers=1, slots_per_worker=4)
+        worker = engine._workers[0]
+        ek, dk = engine.key_gen()
+        _, c = engine.encaps(ek)
+        engine.decaps(dk, c)
+
+        # no key or shared secret is left behind once the results are out
+        self.assertEqual(bytes(len(worker.buf)), bytes(worker.buf))
+
+        # a slot the engine did not clear, e.g. a request in flight, is zeroed on close
+        view = _shm.attach(worker.shm.name)
+        worker.buf[:32] = b"\xff" * 32
+        engine.close()
+        self.assertEqual(bytes(view.size), bytes(_shm.buffer(view)))
+        view.close()
+
+    def test_close_finishes_pending_work(self) -> None:
+        engine = ProcessEngine(workers=1, slots_per_worker=8)
+        futures = [engine.submit_key_gen() for _ in range(8)]
+        engine.close()
+
+        done, not_done = wait(futures, timeout=0)
+        self.assertEqual(8, len(done))
+        self.assertFalse(not_done)
+        with self.assertRaises(RuntimeError):
+            engine.submit_key_gen()
@@ -0,0 +1,83 @@
+from os import urandom
+from random import randrange
+from unittest import TestCase
+
+from mlkem.auxiliary.general import byte_encode
+from mlkem.auxiliary.ntt import multiply_ntt_ints, ntt_ints, ntt_inv_ints
+from mlkem.k_pke import K_PKE
+from mlkem.kronecker_k_pke import (
+    Kronecker_K_PKE,
+    _inner_product,
+    _offset_correction,
+    _pack,
+    _pack_small,
+)
+from mlkem.math.constants import n, q
+from mlkem.math.field import Zm
+from mlkem.ml_kem import ML_KEM
+from mlkem.parameter_set import ML_KEM_512, ML_KEM_768, ML_KEM_1024, ParameterSet
+
+from parameterized import parameterized  # type: ignore
+
+
+class TestKronecker_K_PKE(TestCase):
+    @parameterized.expand([(2,), (3,)])
+    def test_inner_product(self, eta: int) -> None:
+        k = 4
+        row = [[randrange(q) for _ in range(n)] for _ in range(k)]
+        small = [[randrange(-eta, eta + 1) % q for _ in range(n)] for _ in range(k)]
+        # the largest possible slots
+        row[0] = [q - 1] * n
+        small[0] = [eta] * n
+
+        actual = _inner_product(
+            [_pack(f) for f in row],
+            [_pack_small(f, eta) for f in small],
+            _offset_correction(row, eta),
+        )
+
+        expected = [0] * n
+        for f, g in zip(row, small):
+            h = multiply_ntt_ints(ntt_ints(f), ntt_ints(g))
+            expected = [(x + y) % q for x, y in zip(expected, h)]
+        self.assertEqual(ntt_inv_ints(expected), actual)
+
+    @parameterized.expand([(ML_KEM_512,), (ML_KEM_768,), (ML_KEM_1024,)])
+    def test_matches_k_pke(self, params: ParameterSet) -> None:
+        k_pke = K_PKE(params)
+        kronecker = Kronecker_K_PKE(params)
+        ek, dk = k_pke.key_gen(urandom(32))
+        m, r = urandom(32), urandom(32)
+
+        c = k_pke.encrypt(ek, m, r)
+        self.assertEqual(c, kronecker.encrypt(ek, m, r))
+        self.assertEqual(m, kronecker.decrypt(dk, c))
+
+        tampered = bytes([c[0] ^ 1]) + c[1:]
+        self.assertEqual(k_pke.decrypt(dk, tampered), kronecker.decrypt(dk, tampered))
+
+    def test_decryption_key_not_from_key_gen(self) -> None:
+        k_pke = K_PKE(ML_KEM_512)
+        kronecker = Kronecker_K_PKE(ML_KEM_512)
+        dk = b"".join(
+            byte_encode(12, [Zm(randrange(q), q) for _ in range(n)]) for _ in range(2)
+        )
+        c = urandom(768)
+
+        self.assertEqual(k_pke.decrypt(dk, c), kronecker.decrypt(dk, c))
+
+    @parameterized.expand([(ML_KEM_512,), (ML_KEM_768,), (ML_KEM_1024,)])
+    def test_ml_kem(self, params: ParameterSet) -> None:
+        ml_kem = ML_KEM(params, fast=False, pke=Kronecker_K_PKE)
+        ek, dk = ml_kem.key_gen()
+        prepared = ml_kem.prepare_decapsulation_key(dk)
+
+        k, c = ml_kem.encaps(ml_kem.prepare_encapsulation_key(ek))
+        tampered = bytes([c[0] ^ 1]) + c[1:]
+
+        self.assertIsInstance(ml_kem.k_pke, Kronecker_K_PKE)
+        self.assertEqual(k, ml_kem.decaps(prepared, c))
+        self.assertEqual(
+            ML_KEM(params, fast=False).decaps(dk, tampered),
+            ml_kem.decaps(prepared, tampered),
+        )
@@ -1,5 +1,9 @@
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from os import urandom
+from pickle import dumps, loads
 from unittest import TestCase
 
+from mlkem.cache import MatrixCache
 from mlkem.ml_kem import ML_KEM
 from mlkem.parameter_set import ML_KEM_512, ML_KEM_768, ML_KEM_1024, ParameterSet
 
@@ -16,3 +20,223 @@ class TestML_KEM(TestCase):
         k_ = ml_kem.decaps(dk, c)
 
         self.assertEqual(k, k_)
+
+    @parameterized.expand(
+        [
+            (params, fast)
+            for params in (ML_KEM_512, ML_KEM_768, ML_KEM_1024)
+            for fast in (True, False)
+        ]
+    )
+    def test_key_gen_batch(self, params: ParameterSet, fast: bool) -> None:
+        seeds = urandom(64 * 3)
+        ml_kem = ML_KEM(params, randomness=lambda n: seeds[:n], fast=fast)
+
+        actual = ml_kem.key_gen_batch(3)
+
+        expected = [
+            ml_kem._key_gen(seeds[i : i + 32], seeds[i + 32 : i + 64])
+            for i in range(0, 64 * 3, 64)
+        ]
+        self.assertEqual(expected, actual)
+
+    @parameterized.expand(
+        [
+            (params, fast, compact)
+            for params in (ML_KEM_512, ML_KEM_768, ML_KEM_1024)
+            for fast in (True, False)
+            for compact in (True, False)
+        ]
+    )
+    def test_a_cache(self, params: ParameterSet, fast: bool, compact: bool) -> None:
+        seeds = urandom(96)
+        cache = MatrixCache(compact=compact)
+        cached = ML_KEM(params, fast=fast, a_cache=cache)
+        uncached = ML_KEM(params, fast=fast)
+
+        ek, dk = cached._key_gen(seeds[:32], seeds[32:64])
+        k, c = cached._encaps(ek, seeds[64:])
+        tampered = bytes([c[0] ^ 1]) + c[1:]
+
+        self.assertEqual(uncached._key_gen(seeds[:32], seeds[32:64]), (ek, dk))
+        self.assertEqual(uncached._encaps(ek, seeds[64:]), (k, c))
+        self.assertEqual(k, cached.decaps(dk, c))
+        self.assertEqual(uncached.decaps(dk, tampered), cached.decaps(dk, tampered))
+        # key_gen expands the matrix, encaps and both decaps reuse it
+        self.assertEqual((3, 1), (cache.hits, cache.misses))
+
+    @parameterized.expand(
+        [
+            (params, fast, mulcache)
+            for params in (ML_KEM_512, ML_KEM_768, ML_KEM_1024)
+            for fast in (True, False)
+            for mulcache in (True, False)
+        ]
+    )
+    def test_prepare_encapsulation_key(
+        self, params: ParameterSet, fast: bool, mulcache: bool
+    ) -> None:
+        ml_kem = ML_KEM(params, fast=fast)
+        ek, dk = ml_kem.key_gen()
+        prepared = ml_kem.prepare_encapsulation_key(ek, mulcache)
+        m = urandom(32)
+
+        self.assertEqual(ek, bytes(prepared))
+        self.assertEqual(ml_kem._encaps(ek, m), ml_kem._encaps_prepared(prepared, m))
+        k, c = ml_kem.encaps(prepared)
+        self.assertEqual(k, ml_kem.decaps(dk, c))
+
+    @parameterized.expand(
+        [
+            (params, fast)
+            for params in (ML_KEM_512, ML_KEM_768, ML_KEM_1024)
+            for fast in (True, False)
+        ]
+    )
+    def test_prepare_decapsulation_key(self, params: ParameterSet, fast: bool) -> None:
+        ml_kem = ML_KEM(params, fast=fast)
+        ek, dk = ml_kem.key_gen()
+        prepared = ml_kem.prepare_decapsulation_key(dk, mulcache=fast)
+        k, c = ml_kem.encaps(ek)
+        tampered = bytes([c[0] ^ 1]) + c[1:]
+
+        self.assertEqual(dk, bytes(prepared))
+        self.assertEqual(ek, bytes(prepared.ek))
+        self.assertEqual(k, ml_kem.decaps(prepared, c))
+        # implicit rejection matches the unprepared key
+        self.assertEqual(ml_kem.decaps(dk, tampered), ml_kem.decaps(prepared, tampered))
+        # the embedded encapsulation key can be used for encapsulation
+        k, c = ml_kem.encaps(prepared.ek)
+        self.assertEqual(k, ml_kem.decaps(prepared, c))
+
+    def test_prepare_decapsulation_key_pickle(self) -> None:
+        ml_kem = ML_KEM()
+        ek, dk = ml_kem.key_gen()
+        _, c = ml_kem.encaps(ek)
+        tampered = bytes([c[0] ^ 1]) + c[1:]
+        prepared = loads(dumps(ml_kem.prepare_decapsulation_key(dk)))
+
+        self.assertEqual(dk, bytes(prepared))
+        self.assertEqual(ml_kem.decaps(dk, c), ml_kem.decaps(prepared, c))
+        self.assertEqual(ml_kem.decaps(dk, tampered), ml_kem.decaps(prepared, tampered))
+
+    def test_prepare_decapsulation_key_invalid(self) -> None:
+        ml_kem = ML_KEM()
+        ek, dk = ml_kem.key_gen()
+        _, c = ml_kem.encaps(ek)
+
+        with self.assertRaises(ValueError):
+            ml_kem.prepare_decapsulation_key(dk[:-1])
+        with self.assertRaises(ValueError):
+            ml_kem.prepare_decapsulation_key(dk[:-64] + bytes(32) + dk[-32:])
+
+        prepared = ml_kem.prepare_decapsulation_key(dk)
+        with self.assertRaises(ValueError):
+            ml_kem.decaps(prepared, c[:-1])
+        with self.assertRaises(ValueError):
+            ML_KEM(fast=False).decaps(prepared, c)
+
+    def test_prepare_encapsulation_key_invalid(self) -> None:
+        ml_kem = ML_KEM()
+        ek, _ = ml_kem.key_gen()
+
+        with self.assertRaises(ValueError):
+            ml_kem.prepare_encapsulation_key(ek[:-1])
+
+        # prepared keys are tied to the parameter set and implementation
+        prepared = ml_kem.prepare_encapsulation_key(ek)
+        with self.assertRaises(ValueError):
+            ML_KEM(fast=False).encaps(prepared)
+        with self.assertRaises(ValueError):
+            ML_KEM(ML_KEM_1024).encaps(prepared)
+
+    @parameterized.expand([(True,), (False,)])
+    def test_encaps_invalid_modulus(self, fast: bool) -> None:
+        ml_kem = ML_KEM(ML_KEM_512, fast=fast)
+        ek, _ = ml_kem.key_gen()
+        # 0xfff is greater than q in every position
+        invalid = ek[:384] + b"\xff" * 384 + ek[768:]
+
+        with self.assertRaises(ValueError):
+            ml_kem.encaps(invalid)
+        with self.assertRaises(ValueError):
+            ml_kem.prepare_encapsulation_key(invalid)
+
+    @parameterized.expand([(True,), (False,)])
+    def test_validate_encapsulation_keys(self, fast: bool) -> None:
+        ml_kem = ML_KEM(ML_KEM_512, fast=fast)
+        eks = [ek for ek, _ in ml_kem.key_gen_batch(3)]
+        # q itself is the smallest invalid value, encoded in the first 12 bits
+        out_of_range = bytes([0x01, 0x0D]) + eks[1][2:]
+
+        self.assertEqual(
+            [True, False, True, False, True],
+            ml_kem.validate_encapsulation_keys(
+                [eks[0], out_of_range, eks[1], eks[2][:-1], eks[2]]
+            ),
+        )
+        self.assertEqual([], ml_kem.validate_encapsulation_keys([]))
+
+    def test_key_gen_batch_empty(self) -> None:
+        ml_kem = ML_KEM()
+        self.assertEqual([], ml_kem.key_gen_batch(0))
+
+    @parameterized.expand(
+        [
+            (params, fast)
+            for params in (ML_KEM_512, ML_KEM_768, ML_KEM_1024)
+            for fast in (True, False)
+        ]
+    )
+    def test_encaps_decaps_batch(self, params: ParameterSet, fast: bool) -> None:
+        ml_kem = ML_KEM(params, fast=fast)
+        keypairs = ml_kem.key_gen_batch(3)
+        eks = [ek for ek, _ in keypairs]
+        dks = [dk for _, dk in keypairs]
+        ms = [urandom(32) for _ in range(3)]
+
+        actual = ml_kem._encaps_batch(eks, ms)
+
+        expected = [ml_kem._encaps(ek, m) for ek, m in zip(eks, ms)]
+        self.assertEqual(expected, actual)
+
+        # tamper with the last ciphertext to exercise implicit rejection
+        cs = [c for _, c in actual]
+        cs[-1] = bytes([cs[-1][0] ^ 1]) + cs[-1][1:]
+        shared_keys = ml_kem.decaps_batch(dks, cs)
+
+        self.assertEqual([ml_kem._decaps(dk, c) for dk, c in zip(dks, cs)], shared_keys)
+        self.assertEqual([k for k, _ in actual[:-1]], shared_keys[:-1])
+        self.assertNotEqual(actual[-1][0], shared_keys[-1])
+
+    def test_decaps_batch_length_mismatch(self) -> None:
+        ml_kem = ML_KEM()
+        _, dk = ml_kem.key_gen()
+
+        with self.assertRaises(ValueError):
+            ml_kem.decaps_batch([dk, dk], [])
+
+    def test_map_default_executor(self) -> None:
+        self._test_map(None)
+
+    @parameterized.expand([(ThreadPoolExecutor,), (ProcessPoolExecutor,)])
+    def test_map(self, executor_type: type[Executor]) -> None:
+        with executor_type(2) as executor:
+            self._test_map(executor)
+
+    def _test_map(self, executor: Executor | None) -> None:
+        ml_kem = ML_KEM()
+
+        keypairs = ml_kem.map_key_gen(5, executor=executor, chunk_size=2)
+        encapsulations = ml_kem.map_encaps(
+            [ek for ek, _ in keypairs], executor=executor, chunk_size=2
+        )
+        shared_keys = ml_kem.map_decaps(
+            [dk for _, dk in keypairs],
+            [c for _, c in encapsulations],
+            executor=executor,
+            chunk_size=2,
+        )
+
+        self.assertEqual(5, len(set(keypairs)))
+        self.assertEqual([k for k, _ in encapsulations], shared_keys)
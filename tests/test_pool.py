@@ -0,0 +1,196 @@
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+from time import sleep
+from unittest import TestCase
+
+from mlkem.ml_kem import ML_KEM
+from mlkem.parameter_set import ML_KEM_512
+from mlkem.pool import EncapsulationPool, KeyPairPool
+
+
+def wait_for_depth(pool: KeyPairPool, depth: int) -> None:
+    for _ in range(500):
+        if len(pool) >= depth:
+            return
+        sleep(0.01)
+
+
+def wait_for_peer_depth(pool: EncapsulationPool, peer: str, depth: int) -> None:
+    for _ in range(500):
+        if pool.depth(peer) >= depth:
+            return
+        sleep(0.01)
+
+
+class TestKeyPairPool(TestCase):
+    def test_take(self) -> None:
+        ml_kem = ML_KEM(ML_KEM_512)
+        with KeyPairPool(ML_KEM_512, low_watermark=2, high_watermark=8) as pool:
+            wait_for_depth(pool, 8)
+            ek, dk = pool.take()
+            k, c = ml_kem.encaps(ek)
+
+            self.assertEqual(k, ml_kem.decaps(dk, c))
+            metrics = pool.metrics
+            self.assertEqual(
+                (7, 1, 8, 0),
+                (metrics.depth, metrics.taken, metrics.generated, metrics.stalls),
+            )
+            self.assertGreater(metrics.refill_rate, 0)
+
+    def test_refill(self) -> None:
+        with KeyPairPool(
+            ML_KEM_512, low_watermark=4, high_watermark=8, batch_size=2
+        ) as pool:
+            wait_for_depth(pool, 8)
+            for _ in range(4):
+                pool.take()
+
+            wait_for_depth(pool, 8)
+            self.assertEqual(8, len(pool))
+            self.assertEqual(12, pool.metrics.generated)
+
+    def test_taken_once(self) -> None:
+        with KeyPairPool(ML_KEM_512, low_watermark=16, high_watermark=64) as pool:
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                keypairs = list(executor.map(lambda _: pool.take(), range(256)))
+
+            self.assertEqual(256, len(set(keypairs)))
+            self.assertEqual(256, pool.metrics.taken)
+
+    def test_stall(self) -> None:
+        with KeyPairPool(ML_KEM_512, low_watermark=0, high_watermark=1) as pool:
+            wait_for_depth(pool, 1)
+            # keep the background thread from refilling until both keypairs are taken
+            gate = Event()
+            key_gen_batch = pool._ml_kem.key_gen_batch
+
+            def gated(n: int) -> list[tuple[bytes, bytes]]:
+                gate.wait()
+                return key_gen_batch(n)
+
+            pool._ml_kem.key_gen_batch = gated  # type: ignore[method-assign]
+
+            first = pool.take()
+            second = pool.take()
+            gate.set()
+
+            self.assertNotEqual(first, second)
+            self.assertEqual((2, 1), (pool.metrics.taken, pool.metrics.stalls))
+
+    def test_refill_error(self) -> None:
+        pool = KeyPairPool(ML_KEM_512, low_watermark=0, high_watermark=1)
+        wait_for_depth(pool, 1)
+
+        def fail(n: int) -> list[tuple[bytes, bytes]]:
+            raise MemoryError
+
+        pool._ml_kem.key_gen_batch = fail  # type: ignore[method-assign]
+        pool.take()
+        pool._thread.join()
+
+        with self.assertRaises(RuntimeError) as take:
+            pool.take()
+        self.assertIsInstance(take.exception.__cause__, MemoryError)
+        with self.assertRaises(RuntimeError) as close:
+            pool.close()
+        self.assertIsInstance(close.exception.__cause__, MemoryError)
+
+    def test_closed(self) -> None:
+        pool = KeyPairPool(ML_KEM_512, low_watermark=1, high_watermark=2)
+        pool.close()
+
+        with self.assertRaises(RuntimeError):
+            pool.take()
+        self.assertEqual(0, len(pool))
+
+    def test_invalid_arguments(self) -> None:
+        with self.assertRaises(ValueError):
+            KeyPairPool(low_watermark=-1)
+        with self.assertRaises(ValueError):
+            KeyPairPool(low_watermark=8, high_watermark=8)
+        with self.assertRaises(ValueError):
+            KeyPairPool(batch_size=0)
+
+
+class TestEncapsulationPool(TestCase):
+    def test_take(self) -> None:
+        ml_kem = ML_KEM(ML_KEM_512)
+        ek, dk = ml_kem.key_gen()
+        with EncapsulationPool(ML_KEM_512, low_watermark=1, high_watermark=4) as pool:
+            pool.register("server", ek)
+            wait_for_peer_depth(pool, "server", 4)
+
+            pairs = [pool.take("server") for _ in range(8)]
+            for k, c in pairs:
+                self.assertEqual(k, ml_kem.decaps(dk, c))
+            self.assertEqual(8, len(set(pairs)))
+            self.assertEqual(8, pool.metrics.taken)
+
+    def test_rotation(self) -> None:
+        ml_kem = ML_KEM(ML_KEM_512)
+        (old_ek, _), (new_ek, new_dk) = ml_kem.key_gen_batch(2)
+        with EncapsulationPool(ML_KEM_512, low_watermark=1, high_watermark=4) as pool:
+            first = pool.register("server", old_ek)
+            wait_for_peer_depth(pool, "server", 4)
+            second = pool.register("server", new_ek)
+
+            self.assertGreater(second, first)
+            # pairs for the old key are discarded
+            for _ in range(6):
+                k, c = pool.take("server")
+                self.assertEqual(k, ml_kem.decaps(new_dk, c))
+
+    def test_invalidate(self) -> None:
+        ek, _ = ML_KEM(ML_KEM_512).key_gen()
+        with EncapsulationPool(ML_KEM_512) as pool:
+            pool.register("server", ek)
+            self.assertIn("server", pool)
+            pool.invalidate("server")
+
+            self.assertNotIn("server", pool)
+            with self.assertRaises(KeyError):
+                pool.take("server")
+            # invalidating an unknown peer is a no-op
+            pool.invalidate("server")
+
+    def test_invalid_key(self) -> None:
+        with EncapsulationPool(ML_KEM_512) as pool:
+            with self.assertRaises(ValueError):
+                pool.register("server", b"\x00" * 10)
+            self.assertNotIn("server", pool)
+
+    def test_refill_error(self) -> None:
+        ek, _ = ML_KEM(ML_KEM_512).key_gen()
+        pool = EncapsulationPool(ML_KEM_512, low_watermark=0, high_watermark=1)
+
+        def fail(key: object) -> tuple[bytes, bytes]:
+            raise MemoryError
+
+        pool._ml_kem.encaps = fail  # type: ignore[method-assign,assignment]
+        pool.register("server", ek)
+        pool._thread.join()
+
+        with self.assertRaises(RuntimeError) as take:
+            pool.take("server")
+        self.assertIsInstance(take.exception.__cause__, MemoryError)
+        with self.assertRaises(RuntimeError) as close:
+            pool.close()
+        self.assertIsInstance(close.exception.__cause__, MemoryError)
+
+    def test_closed(self) -> None:
+        ek, _ = ML_KEM(ML_KEM_512).key_gen()
+        pool = EncapsulationPool(ML_KEM_512)
+        pool.register("server", ek)
+        pool.close()
+
+        with self.assertRaises(RuntimeError):
+            pool.take("server")
+        with self.assertRaises(RuntimeError):
+            pool.register("server", ek)
+
+    def test_invalid_arguments(self) -> None:
+        with self.assertRaises(ValueError):
+            EncapsulationPool(low_watermark=-1)
+        with self.assertRaises(ValueError):
+            EncapsulationPool(low_watermark=4, high_watermark=4)
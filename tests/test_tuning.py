@@ -0,0 +1,126 @@
+from threading import Thread
+from unittest import TestCase
+
+from mlkem.ml_kem import ML_KEM
+from mlkem.parameter_set import ML_KEM_512
+from mlkem.tuning import AutoTuner, Operation, _Estimate
+
+
+class TestAutoTuner(TestCase):
+    def test_tune(self) -> None:
+        with AutoTuner(
+            ML_KEM(ML_KEM_512), chunk_sizes=(1, 8, 32), workers=(1, 2), sample_size=32
+        ) as tuner:
+            self.assertEqual({}, tuner.choices)
+            choices = tuner.tune()
+
+            self.assertEqual(set(Operation), set(choices))
+            for tuning in choices.values():
+                self.assertIn(tuning.chunk_size, (1, 8, 32))
+                self.assertIn(tuning.workers, (1, 2))
+                self.assertGreater(tuning.throughput, 0)
+            self.assertEqual(choices, tuner.choices)
+
+    def test_map(self) -> None:
+        with AutoTuner(
+            ML_KEM(ML_KEM_512),
+            chunk_sizes=(1, 4, 16),
+            workers=(1,),
+            sample_size=16,
+            explore_every=2,
+        ) as tuner:
+            # the first call tunes the operation it runs
+            keypairs = tuner.map_key_gen(16)
+            self.assertEqual([Operation.KEY_GEN], list(tuner.choices))
+
+            for _ in range(4):
+                encapsulations = tuner.map_encaps([ek for ek, _ in keypairs])
+                shared_keys = tuner.map_decaps(
+                    [dk for _, dk in keypairs], [c for _, c in encapsulations]
+                )
+                self.assertEqual([k for k, _ in encapsulations], shared_keys)
+
+            self.assertEqual(set(Operation), set(tuner.choices))
+
+    def test_retune_keeps_pool_in_use(self) -> None:
+        with AutoTuner(
+            ML_KEM(ML_KEM_512), chunk_sizes=(1,), workers=(1, 2), sample_size=4
+        ) as tuner:
+            tuner.tune([Operation.ENCAPS])
+            operation = tuner._operations[Operation.ENCAPS]
+            workers = operation.workers
+            other = 1 if workers == 2 else 2
+            executor = operation.acquire(workers)
+
+            # a concurrent tune() chooses the other worker count while the pool is in use
+            operation.update(
+                {(workers, 1): _Estimate(1.0, 1.0), (other, 1): _Estimate(2.0, 1.0)}
+            )
+
+            self.assertEqual(other, tuner.choices[Operation.ENCAPS].workers)
+            self.assertEqual(1, executor.submit(int, 1).result())
+            # the pool is shut down once its last user is done
+            operation.release(workers)
+            with self.assertRaises(RuntimeError):
+                executor.submit(int, 1)
+
+    def test_workers_follow_live_stats(self) -> None:
+        with AutoTuner(
+            ML_KEM(ML_KEM_512), chunk_sizes=(1, 4), workers=(1, 2), sample_size=8
+        ) as tuner:
+            tuner.tune([Operation.KEY_GEN])
+            tuning = tuner.choices[Operation.KEY_GEN]
+            other = 1 if tuning.workers == 2 else 2
+
+            # the other worker count becomes much faster under the live load
+            tuner._operations[Operation.KEY_GEN].observe(
+                other, tuning.chunk_size, 1000 * tuning.throughput, tuning.latency
+            )
+
+            self.assertEqual(other, tuner.choices[Operation.KEY_GEN].workers)
+            tuner.map_key_gen(8)
+
+    def test_latency_budget(self) -> None:
+        with AutoTuner(
+            ML_KEM(ML_KEM_512), chunk_sizes=(1, 4), workers=(1,), max_latency=0.5
+        ) as tuner:
+            operation = tuner._operations[Operation.KEY_GEN]
+            operation.update({(1, 1): _Estimate(1.0, 0.1), (1, 4): _Estimate(2.0, 0.6)})
+            # the faster chunk size takes too long per chunk
+            self.assertEqual(1, tuner.choices[Operation.KEY_GEN].chunk_size)
+
+            # once both are over the budget, the one closest to it is chosen
+            for _ in range(3):
+                operation.observe(1, 1, 1.0, 0.9)
+            self.assertEqual(4, tuner.choices[Operation.KEY_GEN].chunk_size)
+
+    def test_close_waits_for_running_calls(self) -> None:
+        tuner = AutoTuner(ML_KEM(ML_KEM_512), chunk_sizes=(1,), workers=(1,))
+        operation = tuner._operations[Operation.DECAPS]
+        executor = operation.acquire(1)
+        closer = Thread(target=tuner.close)
+        closer.start()
+        closer.join(0.1)
+
+        # close() waits for the running call instead of pulling its pool away
+        self.assertTrue(closer.is_alive())
+        self.assertEqual(1, executor.submit(int, 1).result())
+        operation.release(1)
+        closer.join()
+
+        with self.assertRaises(RuntimeError):
+            operation.acquire(1)
+
+    def test_invalid_arguments(self) -> None:
+        for kwargs in [
+            {"chunk_sizes": ()},
+            {"chunk_sizes": (0, 1)},
+            {"workers": (0,)},
+            {"sample_size": 0},
+            {"explore_every": 0},
+            {"smoothing": 0},
+            {"smoothing": 1.5},
+            {"max_latency": 0},
+        ]:
+            with self.assertRaises(ValueError):
+                AutoTuner(**kwargs)  # type: ignore[arg-type]